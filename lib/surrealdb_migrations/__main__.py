@@ -23,6 +23,7 @@ Install this package, then execute the following to run this module::
 
 from logging import getLogger
 from asyncio import get_event_loop
+from signal import SIGTERM, SIGUSR1, SIGUSR2
 
 from .migrations import MigrationsManager
 
@@ -45,42 +46,117 @@ def main():
     from .config import load_config
     config = load_config(args.conf)
 
-    mgr = MigrationsManager(config)
+    reporter = None
+    if args.output == 'json':
+        from .output import JsonReporter
+        reporter = JsonReporter()
+
+    mgr = MigrationsManager(config, reporter=reporter)
     log.debug(f'Configuration:\n{config}')
     log.debug(f'Arguments:\n{args}')
 
     # Synchronous operations
     if args.command == 'create':
         mgr.do_create(args.name)
+    elif args.command == 'bundle':
+        mgr.do_bundle(legacy=args.legacy)
     elif args.command == 'list':
         mgr.do_list()
 
     # Asynchronous operations
-    elif args.command in ['status', 'migrate', 'rollback']:
+    elif args.command in [
+        'status', 'archive', 'plan', 'rehearse', 'migrate', 'rollback',
+        'worker', 'drift', 'benchmark',
+    ]:
 
         loop = get_event_loop()
 
+        # Stop at a safe point on termination, for example when a
+        # Kubernetes job reaches its deadline
+        loop.add_signal_handler(SIGTERM, mgr.stop)
+
+        # Pause and resume throttled data migrations on signals
+        if mgr.throttle is not None:
+            loop.add_signal_handler(SIGUSR1, mgr.throttle.pause)
+            loop.add_signal_handler(SIGUSR2, mgr.throttle.resume)
+
         if args.command == 'status':
             async def command():
                 async with mgr:
                     await mgr.do_status()
 
+        elif args.command == 'archive':
+            async def command():
+                async with mgr:
+                    await mgr.do_archive(args.before)
+
+        elif args.command == 'plan':
+            async def command():
+                async with mgr:
+                    await mgr.do_plan(
+                        to_datetime=args.datetime, explain=args.explain,
+                        count_limit=args.count_limit,
+                    )
+
+        elif args.command == 'rehearse':
+            async def command():
+                async with mgr:
+                    await mgr.do_rehearse(
+                        to_datetime=args.datetime, url=args.url,
+                    )
+
+        elif args.command == 'migrate' and args.render is not None:
+            async def command():
+                async with mgr:
+                    await mgr.do_render(args.render, to_datetime=args.datetime)
+
         elif args.command == 'migrate':
             async def command():
                 async with mgr:
-                    await mgr.do_migrate(to_datetime=args.datetime)
+                    await mgr.do_migrate(
+                        to_datetime=args.datetime, phase=args.phase,
+                    )
 
         elif args.command == 'rollback':
             async def command():
                 async with mgr:
-                    await mgr.do_rollback(to_datetime=args.datetime)
+                    await mgr.do_rollback(
+                        to_datetime=args.datetime, last_batch=args.last_batch,
+                    )
+
+        elif args.command == 'worker':
+            async def command():
+                async with mgr:
+                    await mgr.do_worker(drain=args.drain)
+
+        elif args.command == 'drift':
+            async def command():
+                async with mgr:
+                    return await mgr.do_drift(update=args.update)
+
+        elif args.command == 'benchmark':
+            from .benchmark import run_benchmark
+
+            # The benchmarked database is not the configured one
+            async def command():
+                await run_benchmark(
+                    config, url=args.url, directory=args.migrations,
+                    records=args.records, clients=args.clients,
+                    write_ratio=args.write_ratio,
+                    warmup=args.warmup, cooldown=args.cooldown,
+                    reporter=reporter,
+                )
 
         else:
             raise RuntimeError(f'Unknown command {args.command}')
 
-        loop.run_until_complete(command())
+        result = loop.run_until_complete(command())
         loop.close()
 
+        # Fail when the schema drifted, for example in a CI check
+        if args.command == 'drift' and result:
+            return 1
+
     else:
         raise RuntimeError(f'Unknown command {args.command}')
 
@@ -0,0 +1,114 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to archive old migrations into a single compressed file.
+
+Archived migrations are removed from the migrations directory, so routine
+commands do not list them, and are stored in a ZIP archive next to the
+migrations. The central directory of the archive indexes them, so a single
+migration is read without decompressing the others.
+"""
+
+from importlib import util
+from logging import getLogger
+from zipimport import zipimporter
+from zipfile import ZipFile, ZIP_DEFLATED
+
+
+log = getLogger(__name__)
+
+
+ARCHIVE = 'archive.zip'
+
+
+def archive_migrations(directory, migrations):
+    """
+    Move migrations of a directory into its archive.
+
+    The migrations are added to the archive, created if needed, and their
+    files are removed once the archive is written.
+
+    :param Path directory: The migrations directory.
+    :param list migrations: The names of the migrations to archive.
+
+    :return: The path to the archive.
+    :rtype: Path
+
+    :raises RuntimeError: If a migration is already archived.
+    """
+    path = directory / ARCHIVE
+
+    with ZipFile(
+        path, 'a', compression=ZIP_DEFLATED, compresslevel=9,
+    ) as archive:
+        archived = set(archive.namelist())
+
+        for migration in migrations:
+            if migration in archived:
+                raise RuntimeError(
+                    f'Migration {migration} is already archived in {path}'
+                )
+            archive.write(directory / migration, migration)
+
+    for migration in migrations:
+        (directory / migration).unlink()
+
+    log.info(f'Archived {len(migrations)} migrations into {path}')
+    return path
+
+
+def list_archive(path):
+    """
+    List the migrations of an archive.
+
+    Only the central directory of the archive is read.
+
+    :param Path path: The path to the archive.
+
+    :return: The names of the archived migrations, sorted by name (older
+     first).
+    :rtype: list[str]
+    """
+    with ZipFile(path) as archive:
+        return sorted(archive.namelist())
+
+
+def import_archived(path, migration):
+    """
+    Import an archived migration, without extracting it.
+
+    :param Path path: The path to the archive.
+    :param str migration: The name of the migration file.
+
+    :return: The imported module.
+
+    :raises RuntimeError: If the migration is not in the archive.
+    """
+    spec = zipimporter(str(path)).find_spec(migration[:-len('.py')])
+    if spec is None:
+        raise RuntimeError(f'Migration {migration} is not archived in {path}')
+
+    module = util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+__all__ = [
+    'ARCHIVE',
+    'archive_migrations',
+    'list_archive',
+    'import_archived',
+]
@@ -27,6 +27,8 @@ from logging import (
 from colorlog import ColoredFormatter
 
 from . import __version__
+from .output import OUTPUTS
+from .scheduler import PHASES
 
 
 log = getLogger(__name__)
@@ -95,10 +97,38 @@ def validate_args(args):
             )
 
     # Check input datetime
-    if args.command in ['migrate', 'rollback']:
+    if args.command in ['plan', 'rehearse', 'migrate', 'rollback']:
         if args.datetime:
             args.datetime = datetime.fromisoformat(args.datetime)
 
+    # Check archive datetime
+    if args.command == 'archive':
+        args.before = datetime.fromisoformat(args.before)
+
+    # Check rollback target
+    if args.command == 'rollback' and args.last_batch and args.datetime:
+        raise InvalidArguments(
+            'Options --datetime and --last-batch are mutually exclusive'
+        )
+
+    # Check render output directory exists
+    if args.command == 'migrate' and args.render is not None:
+        args.render = Path(args.render).resolve()
+
+        if not args.render.parent.is_dir():
+            raise InvalidArguments(
+                'No such directory {}'.format(args.render.parent)
+            )
+
+    # Check benchmark migrations directory exists
+    if args.command == 'benchmark' and args.migrations is not None:
+        args.migrations = Path(args.migrations).resolve()
+
+        if not args.migrations.is_dir():
+            raise InvalidArguments(
+                'No such directory {}'.format(args.migrations)
+            )
+
     return args
 
 
@@ -144,11 +174,27 @@ def parse_args(argv=None):
         '-c', '--conf',
         help='Path to configuration file',
     )
+    parser.add_argument(
+        '--output',
+        choices=OUTPUTS,
+        default='text',
+        help=(
+            'Format of the results, human-readable tables in the log or '
+            'newline delimited JSON events on the standard output'
+        ),
+    )
 
     # Subcommands:
     # surrealdb_migrations -c config.toml create
+    # surrealdb_migrations -c config.toml bundle
+    # surrealdb_migrations -c config.toml archive
+    # surrealdb_migrations -c config.toml plan
+    # surrealdb_migrations -c config.toml rehearse
     # surrealdb_migrations -c config.toml migrate
     # surrealdb_migrations -c config.toml rollback
+    # surrealdb_migrations -c config.toml worker
+    # surrealdb_migrations -c config.toml drift
+    # surrealdb_migrations -c config.toml benchmark
     subcommands = parser.add_subparsers(
         required=True,
         dest='command',
@@ -160,20 +206,170 @@ def parse_args(argv=None):
         help='Name of the migration file',
     )
 
+    bundle = subcommands.add_parser('bundle')
+    bundle.add_argument(
+        '--legacy',
+        action='store_true',
+        help=(
+            'Write the bytecode next to the migrations, as required to '
+            'import it from zipapps'
+        ),
+    )
+
+    archive = subcommands.add_parser('archive')
+    archive.add_argument(
+        '--before',
+        required=True,
+        help=(
+            'Archive the applied migrations older than the given datetime '
+            '(ISO8601)'
+        ),
+    )
+
     subcommands.add_parser('list')
     subcommands.add_parser('status')
 
-    migrate = subcommands.add_parser('migrate')
+    plan = subcommands.add_parser('plan')
+    plan.add_argument(
+        '--datetime',
+        help='Plan migration up to the given datetime (ISO8601)',
+    )
+    plan.add_argument(
+        '--explain',
+        action='store_true',
+        help='Estimate the cost of the statements of each pending migration',
+    )
+    plan.add_argument(
+        '--count-limit',
+        type=int,
+        help=(
+            'With --explain, count the records touched by each statement, '
+            'up to this limit'
+        ),
+    )
+
+    rehearse = subcommands.add_parser('rehearse')
+    rehearse.add_argument(
+        '--datetime',
+        help='Rehearse migration up to the given datetime (ISO8601)',
+    )
+    rehearse.add_argument(
+        '--url',
+        help=(
+            'Clone the database into the given server or embedded engine '
+            '(for example mem://) instead of a throwaway database'
+        ),
+    )
+
+    migrate = subcommands.add_parser(
+        'migrate',
+        description=(
+            'Apply the migrations that are not recorded in the metastore, '
+            'including migrations older than the latest applied one'
+        ),
+    )
     migrate.add_argument(
         '--datetime',
         help='Migrate database up to the given datetime (ISO8601)',
     )
+    migrate.add_argument(
+        '--phase',
+        choices=PHASES,
+        help=(
+            'Only apply the migrations of the given deploy phase, expand '
+            'before rolling out the application and contract after'
+        ),
+    )
+    migrate.add_argument(
+        '--render',
+        metavar='PATH',
+        help=(
+            'Write the pending migrations to the given SurrealQL script '
+            'instead of applying them'
+        ),
+    )
+
+    worker = subcommands.add_parser('worker')
+    worker.add_argument(
+        '--drain',
+        action='store_true',
+        help='Exit once no deferred job is available',
+    )
 
     rollback = subcommands.add_parser('rollback')
     rollback.add_argument(
         '--datetime',
         help='Rollback database down to the given datetime (ISO8601)',
     )
+    rollback.add_argument(
+        '--last-batch',
+        action='store_true',
+        help=(
+            'Rollback all the migrations applied by the last migrate '
+            'command, in a single transaction'
+        ),
+    )
+
+    drift = subcommands.add_parser('drift')
+    drift.add_argument(
+        '--update',
+        action='store_true',
+        help=(
+            'Record the live schema as the schema of the last applied '
+            'migration, accepting its differences'
+        ),
+    )
+
+    benchmark = subcommands.add_parser('benchmark')
+    benchmark.add_argument(
+        '--url',
+        default='mem://',
+        help=(
+            'Server or embedded engine to benchmark, its database should be '
+            'empty (default: %(default)s)'
+        ),
+    )
+    benchmark.add_argument(
+        '--migrations',
+        metavar='PATH',
+        help=(
+            'Directory of the migrations to apply, instead of the '
+            'representative schema and data migrations'
+        ),
+    )
+    benchmark.add_argument(
+        '--records',
+        type=int,
+        default=10000,
+        help='Number of records to seed (default: %(default)s)',
+    )
+    benchmark.add_argument(
+        '--clients',
+        type=int,
+        default=8,
+        help='Number of concurrent clients (default: %(default)s)',
+    )
+    benchmark.add_argument(
+        '--write-ratio',
+        type=float,
+        default=0.2,
+        help=(
+            'Fraction of the queries that update a record '
+            '(default: %(default)s)'
+        ),
+    )
+    benchmark.add_argument(
+        '--warmup',
+        type=float,
+        default=10.0,
+        help='Seconds to measure before the migrations (default: %(default)s)',
+    )
+    benchmark.add_argument(
+        '--cooldown',
+        type=float,
+        default=10.0,
+        help='Seconds to measure after the migrations (default: %(default)s)',
+    )
 
     # Parse and validate arguments
     args = parser.parse_args(argv)
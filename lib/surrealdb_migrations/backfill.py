@@ -0,0 +1,381 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to rewrite large tables in chunks, with resumable checkpoints.
+"""
+
+from math import ceil
+from time import monotonic
+from logging import getLogger
+from contextlib import nullcontext
+from asyncio import gather
+from functools import partial
+
+from surrealdb import RecordID
+
+
+log = getLogger(__name__)
+
+
+def checkpoints_table(config):
+    """
+    Name of the table that stores the checkpoints of the migrations.
+
+    :param Namespace config: runtime configuration.
+
+    :return: The name of the checkpoints table.
+    :rtype: str
+    """
+    return f'{config.migrations.metastore}_checkpoints'
+
+
+async def load_checkpoint(db, table, migration, key):
+    """
+    Load a checkpoint.
+
+    :param db: The database session.
+    :param str table: Name of the checkpoints table.
+    :param str migration: Name of the migration owning the checkpoint.
+    :param str key: Key of the checkpoint in the migration.
+
+    :return: The checkpoint record or None if it does not exist.
+    :rtype: dict
+    """
+    result = await db.query(
+        'SELECT * FROM $id;',
+        {'id': RecordID(table, [migration, key])},
+    )
+    return next(iter(result or []), None)
+
+
+async def save_checkpoint(db, table, migration, key, **fields):
+    """
+    Create or update a checkpoint.
+
+    :param db: The database session or transaction.
+    :param str table: Name of the checkpoints table.
+    :param str migration: Name of the migration owning the checkpoint.
+    :param str key: Key of the checkpoint in the migration.
+    :param fields: Fields to set in the checkpoint.
+    """
+    await db.query(
+        'UPSERT $id MERGE $fields;',
+        {
+            'id': RecordID(table, [migration, key]),
+            'fields': {
+                'migration': migration,
+                'key': key,
+                **fields,
+            },
+        },
+    )
+
+
+async def backfill(
+    db, table, transform, chunk_size,
+    checkpoints, migration, key,
+    start=None, end=None, throttle=None, retry=None,
+):
+    """
+    Rewrite the records of a table in chunks.
+
+    The table is walked by record id, ``chunk_size`` records at a time,
+    optionally restricted to the ``[start, end)`` record id range. Each chunk
+    is updated in its own transaction together with the checkpoint that
+    records the last record id processed, so an interrupted backfill resumes
+    after the last committed chunk.
+
+    :param db: The database session, outside of any transaction.
+    :param str table: Name of the table to rewrite.
+    :param transform: Either a SurrealQL ``SET`` clause, as a string, applied
+     to every record of the chunk, or a callable that receives a record and
+     returns a dictionary of fields to merge into it, or None to leave the
+     record unchanged.
+    :param int chunk_size: Number of records per chunk.
+    :param str checkpoints: Name of the checkpoints table.
+    :param str migration: Name of the migration running the backfill.
+    :param str key: Key of the checkpoint in the migration.
+    :param RecordID start: Inclusive lower bound of the record ids to rewrite.
+    :param RecordID end: Exclusive upper bound of the record ids to rewrite.
+    :param Throttle throttle: Optional throttle that decides when each chunk
+     starts and its size, instead of ``chunk_size``.
+    :param RetryPolicy retry: Optional retry policy for the chunks failing
+     with transient errors.
+
+    :return: The total number of records processed, including those
+     processed before resuming.
+    :rtype: int
+    """
+    checkpoint = await load_checkpoint(db, checkpoints, migration, key)
+    cursor = None
+    processed = 0
+
+    if checkpoint is not None:
+        processed = checkpoint.get('processed', 0)
+        if checkpoint.get('done'):
+            log.info(
+                f'Backfill {key!r} of {migration} already completed '
+                f'({processed} records)'
+            )
+            return processed
+
+        cursor = checkpoint.get('cursor')
+        log.info(
+            f'Resuming backfill {key!r} of {migration} after {cursor} '
+            f'({processed} records already processed) ...'
+        )
+
+    while True:
+        async with throttle.slot() if throttle else nullcontext():
+            size = throttle.batch_size if throttle else chunk_size
+            started = monotonic()
+
+            chunk = partial(
+                _backfill_chunk,
+                db, table, transform, size,
+                checkpoints, migration, key,
+                cursor, start, end, processed,
+            )
+            if retry is None:
+                ids = await chunk()
+            else:
+                ids, _ = await retry.run(
+                    chunk, f'backfill {key!r} of {migration}',
+                )
+
+            if throttle:
+                throttle.record(monotonic() - started, len(ids))
+
+        if not ids:
+            break
+
+        cursor = ids[-1]
+        processed += len(ids)
+
+        log.info(
+            f'Backfill {key!r} of {migration}: '
+            f'{processed} records processed'
+        )
+
+        if len(ids) < size:
+            break
+
+    await save_checkpoint(
+        db, checkpoints, migration, key,
+        cursor=cursor, processed=processed, done=True,
+    )
+    return processed
+
+
+async def _backfill_chunk(
+    db, table, transform, size,
+    checkpoints, migration, key,
+    cursor, start, end, processed,
+):
+    """
+    Rewrite a single chunk of a backfill, and record its checkpoint, in a
+    transaction.
+
+    :return: The record ids of the chunk, empty if no records remained.
+    :rtype: list
+    """
+    conditions = []
+    if cursor is not None:
+        conditions.append('id > $cursor')
+    elif start is not None:
+        conditions.append('id >= $start')
+    if end is not None:
+        conditions.append('id < $end')
+
+    where = f'WHERE {" AND ".join(conditions)} ' if conditions else ''
+    ids = await db.query(
+        f'SELECT VALUE id FROM {table} {where}ORDER BY id LIMIT $limit;',
+        {
+            'cursor': cursor,
+            'start': start,
+            'end': end,
+            'limit': size,
+        },
+    )
+    if not ids:
+        return []
+
+    txn = await db.begin_transaction()
+    try:
+        if callable(transform):
+            records = await txn.query('SELECT * FROM $ids;', {'ids': ids})
+            patches = []
+            for record in records:
+                fields = transform(record)
+                if fields:
+                    patches.append({'id': record['id'], 'fields': fields})
+
+            await txn.query(
+                'FOR $patch IN $patches { '
+                'UPDATE $patch.id MERGE $patch.fields; '
+                '};',
+                {'patches': patches},
+            )
+        else:
+            await txn.query(f'UPDATE $ids SET {transform};', {'ids': ids})
+
+        await save_checkpoint(
+            txn, checkpoints, migration, key,
+            cursor=ids[-1],
+            processed=processed + len(ids),
+            done=False,
+        )
+        await txn.commit()
+
+    except Exception as e:
+        log.error(
+            f'Backfill {key!r} of {migration} failed after {cursor}, '
+            'canceling transaction ...'
+        )
+        await txn.cancel()
+        raise e
+
+    return ids
+
+
+async def partition_bounds(db, table, partitions):
+    """
+    Split the record ids of a table in ranges of similar size.
+
+    :param db: The database session.
+    :param str table: Name of the table to split.
+    :param int partitions: Number of ranges to split the table in.
+
+    :return: A list of ``(start, end)`` record id ranges, where ``start`` is
+     inclusive and ``end`` exclusive, and None means unbounded.
+    :rtype: list[tuple]
+    """
+    result = await db.query(
+        f'SELECT count() AS count FROM {table} GROUP ALL;'
+    )
+    total = next(iter(result or []), {}).get('count', 0)
+    step = ceil(total / partitions)
+
+    bounds = []
+    for index in range(1, partitions):
+        if not step or index * step >= total:
+            break
+        result = await db.query(
+            f'SELECT VALUE id FROM {table} ORDER BY id LIMIT 1 START $start;',
+            {'start': index * step},
+        )
+        bounds.extend(result or [])
+
+    edges = [None, *bounds, None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+async def backfill_partitioned(
+    acquire, table, transform, chunk_size, partitions,
+    checkpoints, migration, key, throttle=None, retry=None,
+):
+    """
+    Rewrite the records of a table in chunks, partitioned in record id ranges
+    processed concurrently.
+
+    The record ids of the table are split in ``partitions`` ranges, stored in
+    a checkpoint so the same ranges are used when resuming, and each range is
+    backfilled with :py:func:`backfill` on its own session. All the
+    partitions are processed even if some of them fail.
+
+    :param acquire: Callable returning an async context manager that yields a
+     database session, for example :py:meth:`SessionPool.acquire`.
+    :param str table: Name of the table to rewrite.
+    :param transform: The transform, as accepted by :py:func:`backfill`.
+    :param int chunk_size: Number of records per chunk.
+    :param int partitions: Number of record id ranges.
+    :param str checkpoints: Name of the checkpoints table.
+    :param str migration: Name of the migration running the backfill.
+    :param str key: Key of the checkpoint in the migration.
+    :param Throttle throttle: Optional throttle shared by all the partitions.
+    :param RetryPolicy retry: Optional retry policy for the chunks failing
+     with transient errors.
+
+    :return: The total number of records processed.
+    :rtype: int
+
+    :raises RuntimeError: If any of the partitions failed.
+    """
+    async with acquire() as db:
+        checkpoint = await load_checkpoint(db, checkpoints, migration, key)
+
+        if checkpoint is not None and 'bounds' in checkpoint:
+            bounds = [tuple(bound) for bound in checkpoint['bounds']]
+        else:
+            bounds = await partition_bounds(db, table, partitions)
+            await save_checkpoint(
+                db, checkpoints, migration, key,
+                bounds=[list(bound) for bound in bounds],
+            )
+
+    log.info(
+        f'Backfilling {table!r} in {len(bounds)} partitions ...'
+    )
+    completed = []
+
+    async def run(index, start, end):
+        async with acquire() as session:
+            processed = await backfill(
+                session, table, transform, chunk_size,
+                checkpoints, migration, f'{key}#{index}',
+                start=start, end=end, throttle=throttle, retry=retry,
+            )
+
+        completed.append(processed)
+        log.info(
+            f'Partition {index} of {table!r} completed: '
+            f'{len(completed)}/{len(bounds)} partitions, '
+            f'{sum(completed)} records processed'
+        )
+        return processed
+
+    results = await gather(
+        *(
+            run(index, start, end)
+            for index, (start, end) in enumerate(bounds)
+        ),
+        return_exceptions=True,
+    )
+
+    errors = [
+        (index, result) for index, result in enumerate(results)
+        if isinstance(result, BaseException)
+    ]
+    for index, error in errors:
+        log.error(
+            f'Partition {index} of {table!r} failed',
+            exc_info=error,
+        )
+    if errors:
+        raise RuntimeError(
+            f'{len(errors)} of {len(bounds)} partitions of {table!r} failed'
+        ) from errors[0][1]
+
+    return sum(results)
+
+
+__all__ = [
+    'checkpoints_table',
+    'load_checkpoint',
+    'save_checkpoint',
+    'backfill',
+    'partition_bounds',
+    'backfill_partitioned',
+]
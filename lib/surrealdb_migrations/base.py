@@ -16,6 +16,18 @@
 Module for migrations base class.
 """
 
+from logging import getLogger
+from contextlib import asynccontextmanager
+
+from .bulk import bulk_mode
+from .indexes import index_statement, wait_for_index
+from .backfill import checkpoints_table, backfill, backfill_partitioned
+from .loader import read_records, load_records
+from .verify import CHECKSUM_CHUNK_SIZE, table_stats
+
+
+log = getLogger(__name__)
+
 
 class BaseMigration:
     """
@@ -27,11 +39,103 @@ class BaseMigration:
     The upgrade method will be called when the migration is applied, and the
     downgrade method will be called when the migration is rolled back.
 
+    Migrations can optionally declare how they relate to other migrations, so
+    that independent migrations can be applied concurrently:
+
+    - ``depends_on``: names of older migrations (file name, with or without
+      the ``.py`` suffix) that must be applied before this one.
+    - ``touches``: names of the tables this migration modifies. A migration
+      that does not declare it depends on all the older migrations.
+
+    ::
+
+        class Migration(BaseMigration):
+            depends_on = ['2026-02-05T17_11_27_944133_00_00_test']
+            touches = ['user']
+
+    For zero-downtime deploys, ``phase`` tells when the migration is applied:
+    ``expand`` (the default) before rolling out a new version of the
+    application, for additive changes the old version tolerates, and
+    ``contract`` after all the replicas run the new version, for destructive
+    changes like removing fields or tables.
+
+    ``timeout`` and ``statement_timeout`` bound, in seconds, the duration of
+    the migration and of each of its statements, overriding the
+    ``migrations.timeout`` and ``migrations.statement_timeout``
+    configuration. The timeout covers all the attempts of the migration.
+
+    Setting ``retryable`` to ``True`` retries the migration transaction, from
+    the start of the ``upgrade`` or ``downgrade`` function, when it fails with
+    a transient error. Only migrations whose functions are safe to run again
+    should opt in, as helpers that run outside of the migration transaction,
+    like the loaders, are run again too.
+
+    Setting ``coalesce`` to ``True`` sends consecutive write queries of the
+    migration transaction in a single request, see
+    :py:class:`surrealdb_migrations.sessions.CoalescingSession`. Deferred
+    writes return ``None`` instead of their results.
+
     :param Namespace config: runtime configuration to execute migration.
+    :param session: database session outside of the migration transaction,
+     used by the helpers that cannot run inside a transaction.
+    :param SessionPool pool: pool of database sessions, used by the helpers
+     that run queries concurrently.
+    :param str name: name of the migration, used by the helpers that record
+     checkpoints.
+    :param Throttle throttle: throttle shared by the data migration helpers,
+     if throttling is enabled.
+    :param RetryPolicy retry: retry policy of the data migration helpers for
+     transient errors.
     """
 
-    def __init__(self, config):
+    depends_on = ()
+    touches = None
+    phase = 'expand'
+    timeout = None
+    statement_timeout = None
+    retryable = False
+    coalesce = False
+
+    def __init__(
+        self, config,
+        session=None, pool=None, name=None, throttle=None, retry=None,
+    ):
         self.config = config
+        self.session = session
+        self.pool = pool
+        self.name = name or type(self).__module__
+        self.throttle = throttle
+        self.retry = retry
+        self.jobs = []
+
+    def _require_session(self):
+        """
+        Return the session outside of the migration transaction.
+
+        :raises RuntimeError: If the migration was created without a session.
+        """
+        if self.session is None:
+            raise RuntimeError(
+                'This helper requires a database session outside of the '
+                'migration transaction'
+            )
+        return self.session
+
+    def _acquire(self):
+        """
+        Acquire a database session outside of the migration transaction,
+        from the pool if available.
+
+        :return: An async context manager that yields the session.
+        """
+        if self.pool is not None:
+            return self.pool.acquire()
+
+        @asynccontextmanager
+        async def acquire():
+            yield self._require_session()
+
+        return acquire()
 
     async def upgrade(self, db):
         """
@@ -49,6 +153,316 @@ class BaseMigration:
         """
         raise NotImplementedError
 
+    async def verify(self, db):
+        """
+        Verify the data of the migration, once upgraded, before it is
+        committed.
+
+        Raise an error to cancel the migration. The returned results are
+        stored in the migration record of the metastore.
+
+        ::
+
+            async def upgrade(self, db):
+                self.before = await self.table_stats(db, 'user')
+                await db.query('UPDATE user SET email = email.lowercase();')
+
+            async def verify(self, db):
+                after = await self.table_stats(db, 'user', ['email'])
+                check_stats(after, count=self.before['count'])
+                return {'user': after}
+
+        :param db: The database connection, in the migration transaction.
+
+        :return: The verification results, if any. Values that are not JSON
+         types are stored as strings.
+        :rtype: dict
+        """
+        return None
+
+    async def table_stats(
+        self, db, table, fields=(), where=None, vars=None,
+        chunk_size=CHECKSUM_CHUNK_SIZE,
+    ):
+        """
+        Compute the record count, missing values and checksum of a table in
+        the database, see
+        :py:func:`surrealdb_migrations.verify.table_stats`.
+
+        :param db: The database connection.
+        :param str table: The name of the table.
+        :param list fields: The fields to count the missing values of, and to
+         include in the checksum.
+        :param str where: Optional condition selecting the records.
+        :param dict vars: The parameters bound to the condition.
+        :param int chunk_size: Number of records hashed together.
+
+        :return: A dictionary with the ``count``, ``nulls`` and ``checksum``.
+        :rtype: dict
+        """
+        return await table_stats(
+            db, table, fields, where=where, vars=vars, chunk_size=chunk_size,
+        )
+
+    async def define_index(
+        self, name, table, fields,
+        unique=False, options='', timeout=None,
+    ):
+        """
+        Define an index and build it in the background.
+
+        The index is defined with ``CONCURRENTLY`` outside of the migration
+        transaction, so the table is not locked while the index is built, and
+        this method waits until the index is ready, logging the build
+        progress. The index is defined only if it does not exist, so a
+        migration interrupted while building an index resumes waiting for it
+        when applied again.
+
+        ::
+
+            async def upgrade(self, db):
+                await self.define_index(
+                    'user_email_unique', 'user', 'email', unique=True,
+                )
+
+        :param str name: Name of the index.
+        :param str table: Name of the table to index.
+        :param fields: Field or list of fields to index.
+        :param bool unique: Define a unique index.
+        :param str options: Extra index options.
+        :param float timeout: Maximum number of seconds to wait for the index
+         to be ready. Defaults to the ``indexes.timeout`` configuration.
+        """
+        session = self._require_session()
+
+        statement = index_statement(
+            name, table, fields, unique=unique, options=options,
+        )
+        log.info(f'Building index {name!r} on {table!r} ...')
+        await session.query(statement)
+        await self.wait_for_index(name, table, timeout=timeout)
+
+    async def wait_for_index(self, name, table, timeout=None):
+        """
+        Wait for an index being built in the background to be ready.
+
+        :param str name: Name of the index.
+        :param str table: Name of the indexed table.
+        :param float timeout: Maximum number of seconds to wait. Defaults to
+         the ``indexes.timeout`` configuration.
+
+        :raises TimeoutError: If the index is not ready before the timeout.
+        """
+        if timeout is None:
+            timeout = self.config.indexes.timeout or None
+
+        await wait_for_index(
+            self._require_session(), name, table,
+            timeout=timeout,
+            poll_interval=self.config.indexes.poll_interval,
+        )
+
+    async def load_records(
+        self, table, path,
+        batch_size=None, concurrency=None, retries=None, format=None,
+    ):
+        """
+        Stream the records of a JSONL or CSV file into a table.
+
+        The file is memory mapped and read one line at a time, and records
+        are inserted with batched ``INSERT`` statements, outside of the
+        migration transaction, using up to ``concurrency`` pooled sessions.
+        Failed batches are retried ``retries`` times with an exponential
+        backoff. If throttling is enabled, the batch size and the number of
+        concurrent batches adapt to the database latency.
+
+        Batches are committed independently, so records should include their
+        ``id`` for the downgrade to be able to remove them, and for an
+        interrupted load to fail on duplicates instead of loading them twice.
+
+        ::
+
+            async def upgrade(self, db):
+                await self.load_records('country', DATA / 'countries.jsonl')
+
+        :param str table: Name of the table to insert the records into.
+        :param path: Path to the JSONL or CSV file.
+        :param int batch_size: Number of records per ``INSERT`` statement.
+         Defaults to the ``loader.batch_size`` configuration.
+        :param int concurrency: Maximum number of batches inserted
+         concurrently. Defaults to the ``loader.concurrency`` configuration.
+        :param int retries: Number of times a failed batch is retried.
+         Defaults to the ``loader.retries`` configuration.
+        :param str format: Format of the file, either ``jsonl`` or ``csv``.
+         Inferred from the file extension by default.
+
+        :return: The number of records inserted.
+        :rtype: int
+        """
+        loader = self.config.loader
+
+        log.info(f'Loading records from {path} into {table!r} ...')
+        return await load_records(
+            self._acquire, table, read_records(path, format=format),
+            batch_size=batch_size or loader.batch_size,
+            concurrency=concurrency or loader.concurrency,
+            retries=loader.retries if retries is None else retries,
+            retry_delay=loader.retry_delay,
+            throttle=self.throttle,
+        )
+
+    async def backfill(
+        self, table, transform,
+        chunk_size=None, partitions=None, key=None,
+    ):
+        """
+        Rewrite all the records of a large table in chunks.
+
+        The table is walked by record id, ``chunk_size`` records at a time,
+        outside of the migration transaction. Each chunk is committed
+        separately, together with a checkpoint stored in the checkpoints
+        table of the metastore, so if the migration fails or the tool is
+        interrupted, applying the migration again resumes after the last
+        committed chunk. Checkpoints are removed once the migration is
+        applied.
+
+        With more than one partition, the record ids of the table are split
+        in ranges of similar size, and the ranges are backfilled concurrently
+        on pooled sessions. The number of ranges processed at the same time is
+        bounded by the size of the session pool.
+
+        If throttling is enabled, the chunk size and the number of chunks
+        processed concurrently adapt to the database latency.
+
+        ::
+
+            async def upgrade(self, db):
+                await self.backfill(
+                    'user', 'email = string::lowercase(email)',
+                )
+
+        :param str table: Name of the table to rewrite.
+        :param transform: Either a SurrealQL ``SET`` clause applied to every
+         record, or a callable that receives a record and returns a
+         dictionary of fields to merge into it (or None to skip it).
+        :param int chunk_size: Number of records per chunk. Defaults to the
+         ``backfill.chunk_size`` configuration.
+        :param int partitions: Number of record id ranges processed
+         concurrently. Defaults to the ``backfill.partitions`` configuration.
+        :param str key: Key identifying the checkpoint of this backfill in the
+         migration. Defaults to the name of the table.
+
+        :return: The number of records processed.
+        :rtype: int
+        """
+        chunk_size = chunk_size or self.config.backfill.chunk_size
+        partitions = partitions or self.config.backfill.partitions
+
+        log.info(f'Backfilling table {table!r} ...')
+        if partitions > 1:
+            return await backfill_partitioned(
+                self._acquire, table, transform, chunk_size, partitions,
+                checkpoints_table(self.config), self.name, key or table,
+                throttle=self.throttle, retry=self.retry,
+            )
+
+        return await backfill(
+            self._require_session(), table, transform, chunk_size,
+            checkpoints_table(self.config), self.name, key or table,
+            throttle=self.throttle, retry=self.retry,
+        )
+
+    def enqueue_backfill(
+        self, table, transform,
+        chunk_size=None, partitions=None, key=None,
+    ):
+        """
+        Defer the rewrite of all the records of a large table to the workers.
+
+        The backfill is enqueued in the jobs table of the metastore when the
+        migration is applied, split in ``partitions`` record id ranges, one
+        job each. Jobs are processed by the ``worker`` command, that can run
+        on many nodes, as described in :py:meth:`backfill`. The migration is
+        marked as completed once all its jobs are done.
+
+        Workers import the migration to run its jobs, so the transform must be
+        a SurrealQL ``SET`` clause or a method of the migration.
+
+        ::
+
+            async def upgrade(self, db):
+                self.enqueue_backfill('user', self.normalize, partitions=8)
+
+            def normalize(self, record):
+                return {'email': record['email'].lower()}
+
+        :param str table: Name of the table to rewrite.
+        :param transform: Either a SurrealQL ``SET`` clause applied to every
+         record, or a method of the migration that receives a record and
+         returns a dictionary of fields to merge into it (or None to skip
+         it).
+        :param int chunk_size: Number of records per chunk. Defaults to the
+         ``backfill.chunk_size`` configuration.
+        :param int partitions: Number of record id ranges, one job each.
+         Defaults to the ``backfill.partitions`` configuration.
+        :param str key: Key identifying this backfill in the migration.
+         Defaults to the name of the table.
+
+        :raises RuntimeError: If the transform is neither a string nor a
+         method of the migration.
+        """
+        if isinstance(transform, str):
+            transform = {'set': transform}
+        elif getattr(transform, '__self__', None) is self:
+            transform = {'method': transform.__name__}
+        else:
+            raise RuntimeError(
+                'Deferred backfills require a SET clause or a method of the '
+                'migration as transform'
+            )
+
+        self.jobs.append({
+            'table': table,
+            'transform': transform,
+            'chunk_size': chunk_size or self.config.backfill.chunk_size,
+            'partitions': partitions or self.config.backfill.partitions,
+            'key': key or table,
+        })
+
+    def bulk_mode(self, table):
+        """
+        Suspend the events and indexes of a table during bulk writes.
+
+        The event and index definitions of the table are captured with
+        ``INFO FOR TABLE`` and removed when entering the context. When leaving
+        it, indexes are rebuilt in the background, waiting until they are
+        ready, and events are recreated. Definitions are restored whether the
+        bulk work succeeded or failed, and are kept in a checkpoint so an
+        interrupted migration restores them the next time it is applied.
+
+        Indexes are rebuilt from the committed data, so the bulk work must be
+        committed before leaving the context, for example using
+        :py:meth:`load_records` or :py:meth:`backfill`. The same context can
+        be used in the downgrade to remove the data.
+
+        ::
+
+            async def upgrade(self, db):
+                async with self.bulk_mode('user'):
+                    await self.load_records('user', DATA / 'users.jsonl')
+
+        :param str table: Name of the table.
+
+        :return: An async context manager that yields the suspended
+         definitions.
+        """
+        return bulk_mode(
+            self._require_session(), table,
+            checkpoints_table(self.config), self.name,
+            timeout=self.config.indexes.timeout or None,
+            poll_interval=self.config.indexes.poll_interval,
+        )
+
 
 __all__ = [
     'BaseMigration',
@@ -0,0 +1,334 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to measure the impact of migrations on the foreground traffic of a
+database.
+
+Synthetic clients read and update random records of a seeded table while
+migrations are applied, and the latency of their queries is recorded before,
+during and after the migrations.
+"""
+
+from math import ceil
+from pathlib import Path
+from copy import deepcopy
+from logging import getLogger
+from time import perf_counter
+from random import random, randrange
+from asyncio import Event, create_task, gather, sleep
+
+from surrealdb import RecordID
+from tabulate import tabulate
+
+from .rehearse import is_embedded
+from .migrations import MigrationsManager
+
+
+log = getLogger(__name__)
+
+
+BENCHMARK_TABLE = 'bench'
+"""
+Name of the table seeded and queried by the synthetic clients, and migrated
+by the representative migrations.
+"""
+
+BENCHMARK_MIGRATIONS = Path(__file__).parent / 'data' / 'benchmark'
+"""
+Directory of the representative migrations, a schema migration building an
+index in the background and a data migration backfilling the table.
+"""
+
+
+def percentile(values, percent):
+    """
+    Compute a percentile with the nearest-rank method.
+
+    :param list values: The values, sorted in ascending order.
+    :param float percent: The percentile to compute, between 0 and 100.
+
+    :return: The smallest value greater than or equal to ``percent`` percent
+     of the values, or None if there are no values.
+    :rtype: float
+    """
+    if not values:
+        return None
+    rank = max(ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class LatencyRecorder:
+    """
+    Recorder of the latency of the queries of the synthetic clients, by
+    benchmark phase.
+    """
+
+    def __init__(self):
+        self.phase = None
+        self._latencies = {}
+        self._errors = {}
+        self._durations = {}
+        self._started = None
+
+    def start(self, phase):
+        """
+        Start a phase, ending the current one if any.
+
+        :param str phase: The name of the phase.
+        """
+        self.stop()
+        self.phase = phase
+        self._latencies[phase] = []
+        self._errors[phase] = 0
+        self._started = perf_counter()
+
+    def stop(self):
+        """
+        End the current phase, if any.
+        """
+        if self.phase is not None:
+            self._durations[self.phase] = perf_counter() - self._started
+            self.phase = None
+
+    def record(self, latency):
+        """
+        Record the latency of a successful query in the current phase.
+
+        :param float latency: The number of seconds the query took.
+        """
+        if self.phase is not None:
+            self._latencies[self.phase].append(latency)
+
+    def fail(self):
+        """
+        Record a failed query in the current phase.
+        """
+        if self.phase is not None:
+            self._errors[self.phase] += 1
+
+    def summary(self):
+        """
+        Summarize the recorded phases.
+
+        :return: For each ended phase, in the order they started, a
+         dictionary with the ``phase`` name, its ``duration`` in seconds, the
+         number of successful ``operations`` and of ``errors``, the
+         ``throughput`` in operations per second, and the ``p50`` and ``p99``
+         latencies in milliseconds.
+        :rtype: list[dict]
+        """
+        summary = []
+        for phase, duration in self._durations.items():
+            latencies = sorted(self._latencies[phase])
+            p50 = percentile(latencies, 50)
+            p99 = percentile(latencies, 99)
+            summary.append({
+                'phase': phase,
+                'duration': duration,
+                'operations': len(latencies),
+                'errors': self._errors[phase],
+                'throughput': len(latencies) / duration if duration else 0.0,
+                'p50': None if p50 is None else p50 * 1000,
+                'p99': None if p99 is None else p99 * 1000,
+            })
+        return summary
+
+
+def _require_engine(url):
+    """
+    Check that the embedded engine is installed, if the URL uses it.
+
+    :raises RuntimeError: If the embedded engine is not installed.
+    """
+    if not is_embedded(url):
+        return
+
+    try:
+        from surrealdb import AsyncEmbeddedSurrealConnection  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError(
+            f'Benchmarking {url} requires the embedded engine, install it '
+            'with: pip install surrealdb_migrations[benchmark], or pass the '
+            'URL of a server with --url'
+        ) from e
+
+
+async def _seed(db, records, batch_size):
+    """
+    Insert the records queried by the synthetic clients.
+    """
+    log.info(f'Seeding {records} records into {BENCHMARK_TABLE!r} ...')
+    for start in range(0, records, batch_size):
+        await db.query(
+            f'INSERT INTO {BENCHMARK_TABLE} $records;',
+            {
+                'records': [
+                    {
+                        'id': index,
+                        'email': f'User.{index}@Example.com',
+                        'hits': 0,
+                    }
+                    for index in range(
+                        start, min(start + batch_size, records),
+                    )
+                ],
+            },
+        )
+
+
+async def _client(session, recorder, records, write_ratio, stopped):
+    """
+    Read and update random records until stopped, recording the latency of
+    each query.
+    """
+    while not stopped.is_set():
+        record_id = RecordID(BENCHMARK_TABLE, randrange(records))
+        if random() < write_ratio:
+            query = 'UPDATE $id SET hits += 1;'
+        else:
+            query = 'SELECT * FROM $id;'
+
+        start = perf_counter()
+        try:
+            await session.query(query, {'id': record_id})
+        except Exception as e:
+            log.debug(f'Benchmark query failed: {e}')
+            recorder.fail()
+            await sleep(0)
+            continue
+        recorder.record(perf_counter() - start)
+
+
+async def run_benchmark(
+    config, url='mem://', directory=None,
+    records=10000, clients=8, write_ratio=0.2, warmup=10.0, cooldown=10.0,
+    reporter=None,
+):
+    """
+    Measure the latency and throughput of synthetic foreground traffic before,
+    during and after applying migrations.
+
+    A table is seeded with ``records`` records, then ``clients`` concurrent
+    clients, each with its own session, read and update random records.
+    After ``warmup`` seconds, the migrations are applied with
+    :py:meth:`MigrationsManager.do_migrate` while the traffic goes on, and the
+    traffic is measured for ``cooldown`` more seconds once they are applied.
+
+    The database should be empty, as the migrations are applied to it and
+    the seeded table is not removed afterwards.
+
+    :param Namespace config: runtime configuration. The namespace, database
+     and credentials are used to connect to the benchmarked database.
+    :param str url: URL of the server or embedded engine to benchmark.
+     Embedded engines require the ``benchmark`` extra.
+    :param directory: Directory of the migrations to apply. Defaults to the
+     representative migrations of the benchmarked table.
+    :param int records: Number of records to seed.
+    :param int clients: Number of concurrent clients.
+    :param float write_ratio: Fraction of the queries that update a record.
+    :param float warmup: Number of seconds to measure before the migrations.
+    :param float cooldown: Number of seconds to measure after the migrations.
+    :param reporter: Optional reporter of machine-readable results.
+
+    :return: The summary of each phase, as returned by
+     :py:meth:`LatencyRecorder.summary`.
+    :rtype: list[dict]
+
+    :raises RuntimeError: If the URL uses an embedded engine that is not
+     installed.
+    """
+    _require_engine(url)
+
+    config = deepcopy(config)
+    config.database.url = url
+    config.migrations.directory = str(directory or BENCHMARK_MIGRATIONS)
+    config.migrations.package = ''
+
+    recorder = LatencyRecorder()
+    stopped = Event()
+
+    async with MigrationsManager(config) as mgr:
+        await _seed(mgr.db, records, config.loader.batch_size)
+
+        sessions = [await mgr._new_session() for _ in range(clients)]
+        tasks = [
+            create_task(
+                _client(session, recorder, records, write_ratio, stopped)
+            )
+            for session in sessions
+        ]
+        log.info(
+            f'Running {clients} clients against {url} '
+            f'({write_ratio:.0%} writes) ...'
+        )
+
+        try:
+            recorder.start('before')
+            await sleep(warmup)
+
+            recorder.start('during')
+            await mgr.do_migrate()
+
+            recorder.start('after')
+            await sleep(cooldown)
+            recorder.stop()
+
+        finally:
+            stopped.set()
+            await gather(*tasks, return_exceptions=True)
+            for session in sessions:
+                await session.close_session()
+
+    summary = recorder.summary()
+
+    if reporter is not None:
+        for phase in summary:
+            reporter.emit('benchmark', **phase)
+        return summary
+
+    def ms(value):
+        return '-' if value is None else f'{value:.2f}'
+
+    table = tabulate(
+        [
+            [
+                phase['phase'],
+                f'{phase["duration"]:.2f}',
+                phase['operations'],
+                phase['errors'],
+                f'{phase["throughput"]:.1f}',
+                ms(phase['p50']),
+                ms(phase['p99']),
+            ]
+            for phase in summary
+        ],
+        headers=[
+            'Phase', 'Duration (s)', 'Operations', 'Errors',
+            'Throughput (ops/s)', 'p50 (ms)', 'p99 (ms)',
+        ],
+        tablefmt='rounded_outline',
+    )
+    log.info(f'Foreground traffic while applying migrations:\n{table}')
+
+    return summary
+
+
+__all__ = [
+    'BENCHMARK_TABLE',
+    'BENCHMARK_MIGRATIONS',
+    'percentile',
+    'LatencyRecorder',
+    'run_benchmark',
+]
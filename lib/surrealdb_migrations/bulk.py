@@ -0,0 +1,190 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to suspend events and indexes of a table during bulk writes.
+"""
+
+from logging import getLogger
+from contextlib import asynccontextmanager
+
+from surrealdb import RecordID
+
+from .indexes import wait_for_index
+from .backfill import load_checkpoint, save_checkpoint
+
+
+log = getLogger(__name__)
+
+
+def _concurrently(definition):
+    """
+    Make an index definition build the index in the background.
+
+    :param str definition: A ``DEFINE INDEX`` statement.
+
+    :return: The statement with the ``CONCURRENTLY`` clause.
+    :rtype: str
+    """
+    definition = definition.strip().rstrip(';')
+    if not definition.upper().endswith(' CONCURRENTLY'):
+        definition = f'{definition} CONCURRENTLY'
+    return f'{definition};'
+
+
+async def capture_definitions(db, table):
+    """
+    Capture the events and indexes definitions of a table.
+
+    :param db: The database session.
+    :param str table: Name of the table.
+
+    :return: A dictionary with the ``events`` and ``indexes`` definitions,
+     each one a mapping of name to ``DEFINE`` statement.
+    :rtype: dict
+    """
+    info = await db.query(f'INFO FOR TABLE {table};') or {}
+    return {
+        'events': dict(info.get('events') or {}),
+        'indexes': dict(info.get('indexes') or {}),
+    }
+
+
+async def remove_definitions(db, table, definitions):
+    """
+    Remove the given events and indexes from a table.
+
+    :param db: The database session.
+    :param str table: Name of the table.
+    :param dict definitions: Definitions as returned by
+     :py:func:`capture_definitions`.
+    """
+    statements = [
+        f'REMOVE EVENT IF EXISTS {name} ON TABLE {table};'
+        for name in definitions['events']
+    ] + [
+        f'REMOVE INDEX IF EXISTS {name} ON TABLE {table};'
+        for name in definitions['indexes']
+    ]
+    if statements:
+        await db.query(' '.join(statements))
+
+
+async def restore_definitions(
+    db, table, definitions,
+    timeout=None, poll_interval=1.0,
+):
+    """
+    Recreate the given events and indexes of a table.
+
+    Indexes are rebuilt in the background, and this function waits until all
+    of them are ready before recreating the events, so no event fires on a
+    partially indexed table.
+
+    :param db: The database session.
+    :param str table: Name of the table.
+    :param dict definitions: Definitions as returned by
+     :py:func:`capture_definitions`.
+    :param float timeout: Maximum number of seconds to wait for each index.
+    :param float poll_interval: Number of seconds between index status
+     checks.
+    """
+    # Definitions could have been partially restored by an interrupted run
+    await remove_definitions(db, table, definitions)
+
+    for name, definition in definitions['indexes'].items():
+        log.info(f'Rebuilding index {name!r} on {table!r} ...')
+        await db.query(_concurrently(definition))
+
+    for name in definitions['indexes']:
+        await wait_for_index(
+            db, name, table, timeout=timeout, poll_interval=poll_interval,
+        )
+
+    for name, definition in definitions['events'].items():
+        log.info(f'Restoring event {name!r} on {table!r} ...')
+        await db.query(definition)
+
+
+@asynccontextmanager
+async def bulk_mode(
+    db, table, checkpoints, migration,
+    timeout=None, poll_interval=1.0,
+):
+    """
+    Suspend the events and indexes of a table.
+
+    The definitions are captured and stored in a checkpoint before being
+    removed, and restored when leaving the context, whether the bulk work
+    succeeded or not. If the tool is interrupted in between, the definitions
+    are taken from the checkpoint the next time the migration enters the
+    context, and restored when it leaves it.
+
+    :param db: The database session, outside of any transaction.
+    :param str table: Name of the table.
+    :param str checkpoints: Name of the checkpoints table.
+    :param str migration: Name of the migration.
+    :param float timeout: Maximum number of seconds to wait for each index to
+     be rebuilt.
+    :param float poll_interval: Number of seconds between index status
+     checks.
+    """
+    key = f'bulk:{table}'
+    checkpoint = await load_checkpoint(db, checkpoints, migration, key)
+
+    if checkpoint is not None:
+        log.warning(
+            f'Resuming interrupted bulk mode on {table!r}, using the '
+            'definitions captured by the previous run'
+        )
+        definitions = checkpoint['definitions']
+    else:
+        definitions = await capture_definitions(db, table)
+        await save_checkpoint(
+            db, checkpoints, migration, key, definitions=definitions,
+        )
+
+    log.info(
+        f'Suspending {len(definitions["events"])} events and '
+        f'{len(definitions["indexes"])} indexes on {table!r} ...'
+    )
+    await remove_definitions(db, table, definitions)
+
+    try:
+        yield definitions
+
+    except BaseException as e:
+        log.error(
+            f'Bulk work on {table!r} failed, restoring its events and '
+            'indexes ...'
+        )
+        raise e
+
+    finally:
+        await restore_definitions(
+            db, table, definitions,
+            timeout=timeout, poll_interval=poll_interval,
+        )
+        await db.query(
+            'DELETE $id;', {'id': RecordID(checkpoints, [migration, key])},
+        )
+        log.info(f'Events and indexes on {table!r} restored')
+
+
+__all__ = [
+    'capture_definitions',
+    'remove_definitions',
+    'restore_definitions',
+    'bulk_mode',
+]
@@ -0,0 +1,126 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to bundle migrations in Python packages, wheels and zipapps.
+
+Bundled migrations are listed in a manifest, so they are known without
+listing a directory, and precompiled to bytecode, so they are imported without
+compiling their source.
+"""
+
+from logging import getLogger
+from compileall import compile_file
+from importlib.resources import files
+from py_compile import PycInvalidationMode
+
+
+log = getLogger(__name__)
+
+
+MANIFEST = 'manifest.txt'
+
+
+def is_migration(name):
+    """
+    Check if a file name is the name of a migration.
+
+    :param str name: The file name.
+
+    :return: True for Python files, except private modules like
+     ``__init__.py``.
+    :rtype: bool
+    """
+    return name.endswith('.py') and not name.startswith('_')
+
+
+def write_manifest(directory, legacy=False):
+    """
+    Write the manifest of the migrations of a directory, and compile them to
+    bytecode.
+
+    Bytecode is validated with the hash of the source instead of its
+    modification time, which is not preserved by every packaging tool.
+
+    :param Path directory: The migrations directory.
+    :param bool legacy: Write the bytecode next to the sources instead of in
+     ``__pycache__``, as required to import it from zipapps.
+
+    :return: The names of the migrations in the manifest, sorted by name
+     (older first).
+    :rtype: list[str]
+
+    :raises RuntimeError: If a migration fails to compile.
+    """
+    migrations = sorted(
+        path.name for path in directory.glob('*.py')
+        if is_migration(path.name)
+    )
+
+    for migration in migrations:
+        if not compile_file(
+            directory / migration,
+            quiet=1,
+            legacy=legacy,
+            invalidation_mode=PycInvalidationMode.CHECKED_HASH,
+        ):
+            raise RuntimeError(f'Unable to compile migration {migration}')
+
+    (directory / MANIFEST).write_text(
+        ''.join(f'{migration}\n' for migration in migrations),
+        encoding='utf-8',
+    )
+    log.info(
+        f'Wrote manifest of {len(migrations)} migrations to '
+        f'{directory / MANIFEST}'
+    )
+
+    return migrations
+
+
+def list_package(package):
+    """
+    List the migrations of a package.
+
+    The migrations are read from the manifest of the package, or found by
+    listing the package resources if it has no manifest.
+
+    :param str package: The name of the package, for example
+     ``myapp.migrations``.
+
+    :return: The migrations of the package, as resources with a ``name``,
+     sorted by name (older first).
+    :rtype: list[importlib.resources.abc.Traversable]
+    """
+    root = files(package)
+    manifest = root.joinpath(MANIFEST)
+
+    if manifest.is_file():
+        names = manifest.read_text(encoding='utf-8').split()
+    else:
+        log.debug(f'Package {package} has no manifest, listing it ...')
+        names = [
+            resource.name for resource in root.iterdir()
+            if is_migration(resource.name)
+        ]
+
+    return [root.joinpath(name) for name in sorted(names)]
+
+
+__all__ = [
+    'MANIFEST',
+    'is_migration',
+    'write_manifest',
+    'list_package',
+]
@@ -0,0 +1,16 @@
+from surrealdb_migrations.base import BaseMigration
+
+
+class Migration(BaseMigration):
+
+    async def upgrade(self, db):
+        await db.query("""
+            DEFINE FIELD email_lower ON bench TYPE option<string> ;
+        """)
+        await self.define_index('bench_email_lower', 'bench', 'email_lower')
+
+    async def downgrade(self, db):
+        await db.query("""
+            REMOVE INDEX bench_email_lower ON bench ;
+            REMOVE FIELD email_lower ON bench ;
+        """)
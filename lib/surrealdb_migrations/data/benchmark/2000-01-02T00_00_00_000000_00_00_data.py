@@ -0,0 +1,10 @@
+from surrealdb_migrations.base import BaseMigration
+
+
+class Migration(BaseMigration):
+
+    async def upgrade(self, db):
+        await self.backfill('bench', 'email_lower = string::lowercase(email)')
+
+    async def downgrade(self, db):
+        await self.backfill('bench', 'email_lower = NONE')
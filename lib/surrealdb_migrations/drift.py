@@ -0,0 +1,227 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to detect schema drift with fingerprints of the schema.
+
+A fingerprint holds a hash of the definitions of the database, a hash of each
+table computed by the database, and a short hash of each definition. The
+live schema is compared with a fingerprint in one request that returns the
+definitions of the database and the hash of each table. The definitions of a
+table are only fetched when its hash differs, to tell which ones changed.
+"""
+
+from json import dumps
+from hashlib import sha256
+from logging import getLogger
+
+from .surql import escape_ident
+
+
+log = getLogger(__name__)
+
+
+TABLE_KINDS = ('events', 'fields', 'indexes', 'tables')
+"""
+Kinds of definitions of a table that are part of its schema. Live queries are
+not.
+"""
+
+
+def _digest(value):
+    return sha256(value.encode('utf-8')).hexdigest()
+
+
+def _results(response):
+    """
+    Results of the statements of a raw query, None for failed statements.
+    """
+    return [
+        None if result.get('status') == 'ERR' else result.get('result')
+        for result in response.get('result') or []
+    ]
+
+
+def _definitions(info, kinds=None, ignore=None):
+    """
+    Flatten the result of an ``INFO`` statement into a mapping of
+    ``<kind> <name>`` to the definition, with normalized whitespace.
+    """
+    definitions = {}
+    for kind, items in (info or {}).items():
+        if kinds is not None and kind not in kinds:
+            continue
+        if not isinstance(items, dict):
+            continue
+
+        for name, definition in items.items():
+            if kind == 'tables' and ignore is not None and ignore(name):
+                continue
+            definitions[f'{kind} {name}'] = ' '.join(str(definition).split())
+
+    return definitions
+
+
+def _short_hashes(definitions):
+    return {
+        key: _digest(definition)[:16]
+        for key, definition in definitions.items()
+    }
+
+
+def _table_hash(table):
+    """
+    Statement returning the hash of the schema of a table, computed by the
+    database.
+    """
+    info = f'(INFO FOR TABLE {escape_ident(table)})'
+    return 'RETURN crypto::sha256(<string> [{}]);'.format(
+        ', '.join(f'{info}.{kind}' for kind in TABLE_KINDS)
+    )
+
+
+def _tables(definitions):
+    return sorted(
+        key[len('tables '):] for key in definitions
+        if key.startswith('tables ')
+    )
+
+
+def _compare(stored, live, table=None):
+    """
+    Compare short hashes of definitions.
+
+    :return: The differences, sorted by definition.
+    :rtype: list[dict]
+    """
+    return [
+        {
+            'table': table,
+            'definition': key,
+            'change': (
+                'added' if key not in stored
+                else 'removed' if key not in live
+                else 'changed'
+            ),
+        }
+        for key in sorted(set(stored) | set(live))
+        if stored.get(key) != live.get(key)
+    ]
+
+
+async def schema_fingerprint(db, ignore=None):
+    """
+    Compute the fingerprint of the schema of a database.
+
+    :param db: The database session.
+    :param ignore: Optional function taking the name of a table, returning
+     True to leave the table out of the fingerprint, like the tables of the
+     metastore.
+
+    :return: A dictionary with the ``database`` hash of the definitions of
+     the database, the ``definitions`` short hashes of each one, and the
+     ``tables`` with the ``hash`` of each table and the short hashes of its
+     ``definitions``.
+    :rtype: dict
+    """
+    info = await db.query('INFO FOR DB;')
+    definitions = _definitions(info, ignore=ignore)
+    tables = _tables(definitions)
+
+    results = []
+    if tables:
+        results = _results(await db.query_raw('\n'.join(
+            f'INFO FOR TABLE {escape_ident(table)}; {_table_hash(table)}'
+            for table in tables
+        )))
+
+    return {
+        'database': _digest(dumps(definitions, sort_keys=True)),
+        'definitions': _short_hashes(definitions),
+        'tables': {
+            table: {
+                'hash': results[2 * index + 1],
+                'definitions': _short_hashes(
+                    _definitions(results[2 * index], kinds=TABLE_KINDS)
+                ),
+            }
+            for index, table in enumerate(tables)
+        },
+    }
+
+
+async def schema_drift(db, fingerprint, ignore=None):
+    """
+    Compare the live schema of a database with a fingerprint.
+
+    The definitions of the database and the hashes of the tables of the
+    fingerprint are fetched in a single request. The definitions of the
+    tables that were added, or whose hash differs, are then fetched in a
+    second request, only if there are any.
+
+    :param db: The database session.
+    :param dict fingerprint: The fingerprint, as returned by
+     :py:func:`schema_fingerprint`.
+    :param ignore: Optional function taking the name of a table, returning
+     True to leave the table out of the comparison.
+
+    :return: The differences between the fingerprint and the live schema,
+     with the ``table`` they belong to, None for the definitions of the
+     database, the ``definition``, as ``<kind> <name>``, and the ``change``,
+     either ``added``, ``removed`` or ``changed``.
+    :rtype: list[dict]
+    """
+    stored_tables = sorted(fingerprint['tables'])
+
+    results = _results(await db.query_raw('\n'.join(
+        ['INFO FOR DB;'] + [_table_hash(table) for table in stored_tables]
+    )))
+    definitions = _definitions(results[0], ignore=ignore)
+    hashes = dict(zip(stored_tables, results[1:]))
+
+    drift = []
+    if _digest(dumps(definitions, sort_keys=True)) != fingerprint['database']:
+        drift.extend(_compare(
+            fingerprint['definitions'], _short_hashes(definitions),
+        ))
+
+    # Drill into the tables that exist and differ
+    tables = [
+        table for table in _tables(definitions)
+        if table not in fingerprint['tables']
+        or hashes.get(table) != fingerprint['tables'][table]['hash']
+    ]
+    if not tables:
+        return drift
+
+    log.info(f'Schema of tables {", ".join(tables)} differs, comparing ...')
+    results = _results(await db.query_raw('\n'.join(
+        f'INFO FOR TABLE {escape_ident(table)};' for table in tables
+    )))
+    for table, info in zip(tables, results):
+        stored = fingerprint['tables'].get(table, {}).get('definitions', {})
+        drift.extend(_compare(
+            stored,
+            _short_hashes(_definitions(info, kinds=TABLE_KINDS)),
+            table=table,
+        ))
+
+    return drift
+
+
+__all__ = [
+    'TABLE_KINDS',
+    'schema_fingerprint',
+    'schema_drift',
+]
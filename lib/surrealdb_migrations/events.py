@@ -0,0 +1,191 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module with the progress events of migrations and rollbacks.
+
+Events are yielded by :py:meth:`MigrationsManager.iter_migrate` and
+:py:meth:`MigrationsManager.iter_rollback`, and written by the JSON output
+mode.
+"""
+
+from asyncio import Queue, create_task, wait, FIRST_COMPLETED
+
+
+class Event:
+    """
+    Base class of the progress events.
+
+    :param str operation: The operation in progress, ``upgrade`` or
+     ``downgrade``.
+    """
+
+    type = 'event'
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    def fields(self):
+        """
+        Fields of the event.
+
+        :return: A mapping of field name to value.
+        :rtype: dict
+        """
+        return dict(vars(self))
+
+    def __repr__(self):
+        fields = ', '.join(
+            f'{name}={value!r}' for name, value in self.fields().items()
+        )
+        return f'{type(self).__name__}({fields})'
+
+
+class PlanComputed(Event):
+    """
+    The migrations to apply or roll back were computed.
+
+    :param str operation: The operation, ``upgrade`` or ``downgrade``.
+    :param list migrations: Names of the migrations, in the order they are
+     started.
+    :param str batch: Identifier of the release batch, if any.
+    """
+
+    type = 'plan'
+
+    def __init__(self, operation, migrations, batch=None):
+        super().__init__(operation)
+        self.migrations = list(migrations)
+        self.batch = batch
+
+
+class MigrationStarted(Event):
+    """
+    A migration started.
+
+    :param str operation: The operation, ``upgrade`` or ``downgrade``.
+    :param str name: The name of the migration.
+    """
+
+    type = 'started'
+
+    def __init__(self, operation, name):
+        super().__init__(operation)
+        self.name = name
+
+
+class StatementCount(Event):
+    """
+    Number of statements a migration ran in its transaction.
+
+    :param str operation: The operation, ``upgrade`` or ``downgrade``.
+    :param str name: The name of the migration.
+    :param int count: The number of statements.
+    """
+
+    type = 'statements'
+
+    def __init__(self, operation, name, count):
+        super().__init__(operation)
+        self.name = name
+        self.count = count
+
+
+class MigrationCommitted(Event):
+    """
+    The transaction of a migration was committed.
+
+    :param str operation: The operation, ``upgrade`` or ``downgrade``.
+    :param str name: The name of the migration.
+    :param float duration: Number of seconds since the migration started, or
+     None if the migration was found committed after a lost connection.
+    :param int retries: Number of times the transaction was retried.
+    """
+
+    type = 'committed'
+
+    def __init__(self, operation, name, duration=None, retries=0):
+        super().__init__(operation)
+        self.name = name
+        self.duration = duration
+        self.retries = retries
+
+
+class MigrationFailed(Event):
+    """
+    A migration failed.
+
+    :param str operation: The operation, ``upgrade`` or ``downgrade``.
+    :param str name: The name of the migration.
+    :param str error: The error.
+    :param bool timed_out: Whether the migration timed out.
+    """
+
+    type = 'failed'
+
+    def __init__(self, operation, name, error, timed_out=False):
+        super().__init__(operation)
+        self.name = name
+        self.error = error
+        self.timed_out = timed_out
+
+
+async def stream_events(run):
+    """
+    Run an operation, yielding the events it emits while it runs.
+
+    :param run: Coroutine function, taking the function to emit events with
+     as only argument.
+
+    :return: An asynchronous iterator of the events. The error of the
+     operation, if any, is raised once all the events emitted before it were
+     yielded. If the iteration is stopped early, the operation is cancelled.
+    :rtype: AsyncIterator[Event]
+    """
+    queue = Queue()
+    task = create_task(run(queue.put_nowait))
+    get = None
+
+    try:
+        while True:
+            get = create_task(queue.get())
+            done, _ = await wait({get, task}, return_when=FIRST_COMPLETED)
+
+            if get in done:
+                yield get.result()
+                continue
+
+            get.cancel()
+            while not queue.empty():
+                yield queue.get_nowait()
+
+            task.result()
+            return
+
+    finally:
+        if get is not None and not get.done():
+            get.cancel()
+        if not task.done():
+            task.cancel()
+
+
+__all__ = [
+    'Event',
+    'PlanComputed',
+    'MigrationStarted',
+    'StatementCount',
+    'MigrationCommitted',
+    'MigrationFailed',
+    'stream_events',
+]
@@ -0,0 +1,156 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to estimate the cost of migration statements using ``EXPLAIN``.
+"""
+
+from logging import getLogger
+from re import compile, IGNORECASE, DOTALL
+
+
+log = getLogger(__name__)
+
+
+SELECT = compile(
+    r'^SELECT\b.*?\bFROM\s+(?:ONLY\s+)?(?P<target>[^\s,;]+)',
+    IGNORECASE | DOTALL,
+)
+WRITE = compile(
+    r'^(?P<kind>UPDATE|UPSERT|DELETE)\s+(?:FROM\s+)?(?:ONLY\s+)?'
+    r'(?P<target>[^\s;]+)(?P<rest>.*)$',
+    IGNORECASE | DOTALL,
+)
+DEFINE_INDEX = compile(
+    r'^DEFINE\s+INDEX\s+(?:(?:IF\s+NOT\s+EXISTS|OVERWRITE)\s+)?\S+\s+'
+    r'ON\s+(?:TABLE\s+)?(?P<target>[^\s;]+)',
+    IGNORECASE,
+)
+WHERE = compile(
+    r'\bWHERE\b(?P<condition>.*?)(?:\b(?:RETURN|TIMEOUT|PARALLEL)\b.*)?$',
+    IGNORECASE | DOTALL,
+)
+EXPLAINED = compile(r'\bEXPLAIN(?:\s+FULL)?\s*$', IGNORECASE)
+
+FULL_SCANS = {'Iterate Table', 'Iterate Table Keys'}
+
+
+def _full_scan(plan):
+    """
+    Check if an ``EXPLAIN`` plan iterates over all the records of a table.
+    """
+    return any(
+        isinstance(step, dict) and step.get('operation') in FULL_SCANS
+        for step in plan or []
+    )
+
+
+async def _count(db, target, condition, vars, limit):
+    """
+    Count the records of a target matching a condition, up to a limit.
+    """
+    where = f' WHERE {condition}' if condition else ''
+    result = await db.query(
+        f'RETURN count((SELECT VALUE id FROM {target}{where} LIMIT {limit}));',
+        vars,
+    )
+    return result or 0
+
+
+async def explain_statement(db, statement, vars=None, count_limit=None):
+    """
+    Estimate the cost of a statement without modifying the database.
+
+    ``SELECT`` statements are explained as they are. ``UPDATE``, ``UPSERT``
+    and ``DELETE`` statements are explained as the equivalent ``SELECT`` over
+    their target and ``WHERE`` condition. ``DEFINE INDEX`` statements read all
+    the records of their table. Other statements are not analyzed.
+
+    Only the ``EXPLAIN`` plan is queried by default. With a ``count_limit``,
+    the records touched by writes and index definitions are also counted, up
+    to that limit, so counting never reads more than ``count_limit`` records.
+
+    :param db: The database session.
+    :param str statement: A single SurrealQL statement.
+    :param dict vars: The parameters bound to the statement.
+    :param int count_limit: Optional maximum number of records to count.
+
+    :return: A dictionary with the ``statement``, its ``kind`` (first
+     keyword), its ``target``, whether it does a ``full_scan``, the ``rows``
+     touched, counted up to ``count_limit``, the ``EXPLAIN`` ``plan`` and an
+     analysis ``error``, ``None`` when not known or not applicable.
+    :rtype: dict
+    """
+    statement = statement.strip().rstrip(';').strip()
+    analysis = {
+        'statement': statement,
+        'kind': statement.split(None, 1)[0].upper() if statement else '',
+        'target': None,
+        'full_scan': None,
+        'rows': None,
+        'plan': None,
+        'error': None,
+    }
+    vars = vars or {}
+
+    try:
+        match = DEFINE_INDEX.match(statement)
+        if match:
+            analysis['target'] = match.group('target')
+            analysis['full_scan'] = True
+            if count_limit is not None:
+                analysis['rows'] = await _count(
+                    db, analysis['target'], None, vars, count_limit,
+                )
+            return analysis
+
+        match = SELECT.match(statement)
+        if match:
+            analysis['target'] = match.group('target')
+            query = statement
+            condition = None
+        else:
+            match = WRITE.match(statement)
+            if not match:
+                return analysis
+
+            analysis['target'] = match.group('target')
+            where = WHERE.search(match.group('rest'))
+            condition = where.group('condition').strip() if where else None
+            query = f'SELECT * FROM {analysis["target"]}'
+            if condition:
+                query = f'{query} WHERE {condition}'
+
+        if not EXPLAINED.search(query):
+            query = f'{query} EXPLAIN'
+
+        plan = await db.query(f'{query};', vars)
+        analysis['plan'] = plan
+        analysis['full_scan'] = _full_scan(plan)
+
+        if analysis['kind'] != 'SELECT' and count_limit is not None:
+            analysis['rows'] = await _count(
+                db, analysis['target'], condition, vars, count_limit,
+            )
+
+    except Exception as e:
+        log.debug(f'Unable to analyze statement {statement!r}: {e}')
+        analysis['error'] = str(e)
+
+    return analysis
+
+
+__all__ = [
+    'explain_statement',
+]
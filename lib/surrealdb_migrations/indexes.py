@@ -0,0 +1,135 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to build indexes in the background.
+"""
+
+from asyncio import sleep
+from time import monotonic
+from logging import getLogger
+
+from .sessions import RecordingSession
+
+
+log = getLogger(__name__)
+
+
+def index_statement(name, table, fields, unique=False, options=''):
+    """
+    Build a ``DEFINE INDEX`` statement that builds the index concurrently.
+
+    :param str name: Name of the index.
+    :param str table: Name of the table to index.
+    :param fields: Field or list of fields to index.
+    :param bool unique: Define a unique index.
+    :param str options: Extra index options, for example ``SEARCH ANALYZER``
+     or ``HNSW`` clauses.
+
+    :return: The ``DEFINE INDEX`` statement.
+    :rtype: str
+    """
+    if not isinstance(fields, str):
+        fields = ', '.join(fields)
+
+    parts = [
+        f'DEFINE INDEX IF NOT EXISTS {name} ON TABLE {table} FIELDS {fields}',
+    ]
+    if unique:
+        parts.append('UNIQUE')
+    if options:
+        parts.append(options)
+    parts.append('CONCURRENTLY;')
+
+    return ' '.join(parts)
+
+
+async def wait_for_index(db, name, table, timeout=None, poll_interval=1.0):
+    """
+    Wait for an index being built in the background to be ready.
+
+    The index must be defined on the table. An index without a build state,
+    like an index built before the server restarted or built by another node,
+    is ready. Recording sessions are not polled, as they capture queries
+    without running them.
+
+    :param db: The database session, outside of any transaction.
+    :param str name: Name of the index.
+    :param str table: Name of the indexed table.
+    :param float timeout: Maximum number of seconds to wait, or None to wait
+     forever.
+    :param float poll_interval: Number of seconds between status checks.
+
+    :raises TimeoutError: If the index is not ready before the timeout.
+    :raises RuntimeError: If the index does not exist, or its build failed.
+    """
+    if isinstance(db, RecordingSession):
+        return
+
+    start = monotonic()
+    last = None
+
+    table_info = await db.query(f'INFO FOR TABLE {table};')
+    if name not in (table_info or {}).get('indexes', {}):
+        raise RuntimeError(f'Index {name!r} on {table!r} does not exist')
+
+    while True:
+        info = await db.query(f'INFO FOR INDEX {name} ON TABLE {table};')
+
+        building = (info or {}).get('building')
+        if not building:
+            log.info(
+                f'Index {name!r} on {table!r} has no build in progress, '
+                'it is ready'
+            )
+            return
+        status = building.get('status')
+
+        if status == 'ready':
+            log.info(
+                f'Index {name!r} on {table!r} ready after '
+                f'{monotonic() - start:.2f}s'
+            )
+            return
+
+        if status in ('error', 'aborted'):
+            raise RuntimeError(
+                f'Build of index {name!r} on {table!r} failed: '
+                f'{building.get("error", status)}'
+            )
+
+        progress = {
+            key: building[key]
+            for key in ('initial', 'pending', 'updated', 'count')
+            if key in building
+        }
+        if (status, progress) != last:
+            log.info(
+                f'Index {name!r} on {table!r} is {status} '
+                f'{progress or ""}'.rstrip()
+            )
+            last = (status, progress)
+
+        if timeout is not None and monotonic() - start > timeout:
+            raise TimeoutError(
+                f'Index {name!r} on {table!r} not ready after {timeout}s'
+            )
+
+        await sleep(poll_interval)
+
+
+__all__ = [
+    'index_statement',
+    'wait_for_index',
+]
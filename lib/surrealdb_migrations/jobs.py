@@ -0,0 +1,270 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module with the queue of deferred data jobs processed by workers.
+
+Migrations enqueue deferred backfills, stored as one job per record id
+partition in the jobs table of the metastore. Workers lease jobs, renew their
+lease while processing them, and retry them when they fail, until they reach
+the maximum number of attempts.
+"""
+
+from logging import getLogger
+from datetime import datetime, timedelta, timezone
+
+from surrealdb import RecordID, QueryError
+
+from .backfill import partition_bounds
+
+
+log = getLogger(__name__)
+
+
+def jobs_table(config):
+    """
+    Name of the table that stores the deferred jobs of the migrations.
+
+    :param Namespace config: runtime configuration.
+
+    :return: The name of the jobs table.
+    :rtype: str
+    """
+    return f'{config.migrations.metastore}_jobs'
+
+
+def _now():
+    return datetime.now(tz=timezone.utc)
+
+
+async def enqueue_jobs(db, jobs, migration, specs):
+    """
+    Enqueue the deferred backfills of a migration.
+
+    Each backfill is split in record id partitions, and one job is created per
+    partition.
+
+    :param db: The database session, usually the migration transaction so the
+     jobs are only enqueued if the migration is applied.
+    :param str jobs: Name of the jobs table.
+    :param str migration: Name of the migration.
+    :param list specs: The deferred backfills, as dictionaries with the
+     ``table``, ``transform``, ``chunk_size``, ``partitions`` and ``key`` of
+     each one.
+
+    :return: The number of jobs enqueued.
+    :rtype: int
+    """
+    enqueued = 0
+
+    for spec in specs:
+        bounds = await partition_bounds(db, spec['table'], spec['partitions'])
+
+        for index, (start, end) in enumerate(bounds):
+            await db.query(
+                'CREATE $id CONTENT $job;',
+                {
+                    'id': RecordID(jobs, [migration, spec['key'], index]),
+                    'job': {
+                        'migration': migration,
+                        'key': spec['key'],
+                        'index': index,
+                        'table': spec['table'],
+                        'transform': spec['transform'],
+                        'chunk_size': spec['chunk_size'],
+                        'start': start,
+                        'end': end,
+                        'status': 'pending',
+                        'attempts': 0,
+                        'created': _now(),
+                    },
+                },
+            )
+            enqueued += 1
+
+        log.info(
+            f'Enqueued backfill {spec["key"]!r} of {migration} in '
+            f'{len(bounds)} jobs'
+        )
+
+    return enqueued
+
+
+async def lease_job(db, jobs, worker, lease, max_attempts):
+    """
+    Lease the next available job.
+
+    Available jobs are pending jobs, and running jobs whose lease expired
+    because their worker stopped renewing it. Leases are taken with a
+    conditional update, so a job is only leased by one worker.
+
+    Running jobs whose lease expired after their last attempt are marked as
+    failed first, so they do not stay running forever.
+
+    :param db: The database session.
+    :param str jobs: Name of the jobs table.
+    :param str worker: Identifier of the worker.
+    :param float lease: Number of seconds the lease lasts.
+    :param int max_attempts: Maximum number of attempts of a job.
+
+    :return: The leased job or None if no job is available.
+    :rtype: dict
+    """
+    available = (
+        '(status = "pending" OR '
+        '(status = "running" AND leased_until < $now)) '
+        'AND attempts < $max_attempts'
+    )
+    now = _now()
+
+    try:
+        await db.query(
+            f'UPDATE {jobs} SET status = "failed", leased_until = NONE, '
+            'error = "Lease expired on the last attempt", finished = $now '
+            'WHERE status = "running" AND leased_until < $now '
+            'AND attempts >= $max_attempts RETURN NONE;',
+            {'now': now, 'max_attempts': max_attempts},
+        )
+    except QueryError as e:
+        # Another worker is failing them
+        if not e.is_transaction_conflict:
+            raise e
+
+    candidates = await db.query(
+        f'SELECT VALUE id FROM {jobs} WHERE {available} '
+        'ORDER BY created, index LIMIT 10;',
+        {'now': now, 'max_attempts': max_attempts},
+    )
+
+    for job_id in candidates or []:
+        try:
+            result = await db.query(
+                'UPDATE $id SET '
+                'status = "running", worker = $worker, '
+                'leased_until = $until, attempts += 1 '
+                f'WHERE {available} RETURN AFTER;',
+                {
+                    'id': job_id,
+                    'worker': worker,
+                    'now': now,
+                    'until': now + timedelta(seconds=lease),
+                    'max_attempts': max_attempts,
+                },
+            )
+        except QueryError as e:
+            if not e.is_transaction_conflict:
+                raise e
+            continue
+
+        job = next(iter(result or []), None)
+        if job is not None:
+            return job
+
+    return None
+
+
+async def renew_lease(db, job, worker, lease):
+    """
+    Renew the lease of a job.
+
+    :param db: The database session.
+    :param dict job: The leased job.
+    :param str worker: Identifier of the worker.
+    :param float lease: Number of seconds the lease lasts.
+
+    :return: True if the lease was renewed, False if it was lost.
+    :rtype: bool
+    """
+    result = await db.query(
+        'UPDATE $id SET leased_until = $until '
+        'WHERE status = "running" AND worker = $worker RETURN AFTER;',
+        {
+            'id': job['id'],
+            'worker': worker,
+            'until': _now() + timedelta(seconds=lease),
+        },
+    )
+    return bool(result)
+
+
+async def finish_job(db, job, worker, error=None, max_attempts=1):
+    """
+    Record the outcome of a leased job.
+
+    A failed job is made available again, unless it reached the maximum
+    number of attempts.
+
+    :param db: The database session.
+    :param dict job: The leased job.
+    :param str worker: Identifier of the worker.
+    :param Exception error: The error raised by the job, if it failed.
+    :param int max_attempts: Maximum number of attempts of a job.
+
+    :return: The new status of the job, ``done``, ``pending`` or ``failed``.
+    :rtype: str
+    """
+    if error is None:
+        status = 'done'
+    elif job['attempts'] < max_attempts:
+        status = 'pending'
+    else:
+        status = 'failed'
+
+    await db.query(
+        'UPDATE $id SET status = $status, error = $error, '
+        'leased_until = NONE, finished = $now '
+        'WHERE status = "running" AND worker = $worker;',
+        {
+            'id': job['id'],
+            'status': status,
+            'error': None if error is None else str(error),
+            'now': _now(),
+            'worker': worker,
+        },
+    )
+    return status
+
+
+async def job_progress(db, jobs):
+    """
+    Count the jobs of each migration by status.
+
+    :param db: The database session.
+    :param str jobs: Name of the jobs table.
+
+    :return: A mapping of migration name to a mapping of status to number of
+     jobs.
+    :rtype: dict[str, dict[str, int]]
+    """
+    result = await db.query(
+        'SELECT migration, status, count() AS count '
+        f'FROM {jobs} GROUP BY migration, status;'
+    )
+
+    progress = {}
+    for item in result or []:
+        progress.setdefault(item['migration'], {})[item['status']] = (
+            item['count']
+        )
+    return progress
+
+
+__all__ = [
+    'jobs_table',
+    'enqueue_jobs',
+    'lease_job',
+    'renew_lease',
+    'finish_job',
+    'job_progress',
+]
@@ -0,0 +1,211 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to stream records from data files into the database.
+"""
+
+from json import loads
+from pathlib import Path
+from csv import DictReader
+from time import monotonic
+from logging import getLogger
+from contextlib import nullcontext
+from mmap import mmap, ACCESS_READ
+from asyncio import Semaphore, create_task, gather, sleep
+
+
+log = getLogger(__name__)
+
+
+FORMATS = {
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.csv': 'csv',
+}
+
+
+def _lines(path):
+    """
+    Iterate over the lines of a file using a memory map.
+
+    :param Path path: Path to the file.
+
+    :return: A generator of lines, as bytes, including the line terminator.
+    """
+    with path.open('rb') as fd:
+
+        # Empty files cannot be memory mapped
+        if not path.stat().st_size:
+            return
+
+        with mmap(fd.fileno(), 0, access=ACCESS_READ) as mapped:
+            yield from iter(mapped.readline, b'')
+
+
+def read_records(path, format=None):
+    """
+    Iterate over the records of a JSONL or CSV file.
+
+    The file is memory mapped and read one line at a time, so it is never
+    loaded in memory.
+
+    :param path: Path to the file.
+    :param str format: Format of the file, either ``jsonl`` or ``csv``.
+     If None, the format is inferred from the file extension.
+
+    :return: A generator of records, as dictionaries. CSV values are strings.
+    """
+    path = Path(path)
+
+    if format is None:
+        format = FORMATS.get(path.suffix.lower())
+    if format not in ('jsonl', 'csv'):
+        raise ValueError(f'Unsupported format {format!r} for file {path}')
+
+    if format == 'csv':
+        yield from DictReader(
+            line.decode('utf-8') for line in _lines(path)
+        )
+        return
+
+    for number, line in enumerate(_lines(path), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield loads(line)
+        except ValueError as e:
+            raise ValueError(f'Invalid JSON at {path}:{number}: {e}') from e
+
+
+def batched(records, size):
+    """
+    Group records in lists of at most the given size.
+
+    :param records: Iterable of records.
+    :param size: Maximum size of each batch, or a callable returning it, so
+     the size can change between batches.
+
+    :return: A generator of lists of records.
+    """
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= (size() if callable(size) else size):
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def load_records(
+    acquire, table, records,
+    batch_size=1000, concurrency=1, retries=3, retry_delay=1.0,
+    throttle=None,
+):
+    """
+    Insert records into a table using batched ``INSERT`` statements.
+
+    At most ``concurrency`` batches are in flight at the same time, so at most
+    ``concurrency * batch_size`` records are held in memory.
+
+    :param acquire: Callable returning an async context manager that yields a
+     database session, for example :py:meth:`SessionPool.acquire`.
+    :param str table: Name of the table to insert the records into.
+    :param records: Iterable of records to insert.
+    :param int batch_size: Number of records per ``INSERT`` statement.
+    :param int concurrency: Maximum number of batches inserted concurrently.
+    :param int retries: Number of times a failed batch is retried.
+    :param float retry_delay: Seconds to wait before the first retry, doubled
+     on every further retry.
+    :param Throttle throttle: Optional throttle that decides when each batch
+     starts and its size, instead of ``batch_size``. Batches are still
+     bounded by ``concurrency``.
+
+    :return: The number of records inserted.
+    :rtype: int
+    """
+    semaphore = Semaphore(concurrency)
+    tasks = set()
+    loaded = 0
+
+    async def insert(number, batch):
+        nonlocal loaded
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    async with throttle.slot() if throttle else nullcontext():
+                        # Only the database latency is measured, not the
+                        # wait for a pooled session
+                        async with acquire() as session:
+                            started = monotonic()
+                            await session.query(
+                                f'INSERT INTO {table} $records;',
+                                {'records': batch},
+                            )
+                            latency = monotonic() - started
+                        if throttle:
+                            throttle.record(latency, len(batch))
+                    break
+                except Exception as e:
+                    if attempt >= retries:
+                        log.error(
+                            f'Batch {number} into {table!r} failed after '
+                            f'{attempt + 1} attempts'
+                        )
+                        raise e
+                    delay = retry_delay * 2 ** attempt
+                    log.warning(
+                        f'Batch {number} into {table!r} failed ({e}), '
+                        f'retrying in {delay:.2f}s ...'
+                    )
+                    await sleep(delay)
+
+            loaded += len(batch)
+            log.debug(f'Batch {number} inserted, {loaded} records loaded')
+        finally:
+            semaphore.release()
+
+    # The throttle adapts the size of the batches as they are read
+    size = batch_size if throttle is None else (lambda: throttle.batch_size)
+
+    try:
+        for number, batch in enumerate(batched(records, size), 1):
+            await semaphore.acquire()
+
+            # Stop reading as soon as a batch failed
+            for task in [task for task in tasks if task.done()]:
+                tasks.remove(task)
+                task.result()
+
+            tasks.add(create_task(insert(number, batch)))
+
+        await gather(*tasks)
+
+    except BaseException as e:
+        for task in tasks:
+            task.cancel()
+        await gather(*tasks, return_exceptions=True)
+        raise e
+
+    log.info(f'Loaded {loaded} records into {table!r}')
+    return loaded
+
+
+__all__ = [
+    'read_records',
+    'batched',
+    'load_records',
+]
@@ -17,16 +17,52 @@
 Module to manage (create, migrate, rollback and list) migrations.
 """
 
-from os import environ
+from os import environ, getpid
+from json import dumps, loads
+from copy import deepcopy
+from time import monotonic
+from functools import partial
+from socket import gethostname
+from asyncio import Lock, CancelledError, sleep, create_task, wait_for
+from asyncio import TimeoutError as AsyncTimeoutError
 from pathlib import Path
-from importlib import util
+from importlib import util, import_module
 from typing import Optional
-from logging import getLogger
+from contextlib import asynccontextmanager, suppress
+from logging import getLogger, INFO
 from datetime import datetime, timezone
 
 from tabulate import tabulate
 from surrealdb import AsyncSurreal, AsyncSurrealSession, NotFoundError
 
+from .pool import SessionPool
+from .bundle import is_migration, write_manifest, list_package
+from .archive import (
+    ARCHIVE, archive_migrations, list_archive, import_archived,
+)
+from .surql import escape_ident, split_statements
+from .retry import RetryPolicy, is_connection_lost
+from .throttle import Throttle
+from .explain import explain_statement
+from .rehearse import is_embedded, clone_database
+from .drift import schema_fingerprint, schema_drift
+from .sessions import (
+    RecordingSession, CountingSession, TimeoutSession, CoalescingSession,
+)
+from .events import (
+    PlanComputed, MigrationStarted, StatementCount, MigrationCommitted,
+    MigrationFailed, stream_events,
+)
+from .backfill import checkpoints_table, backfill
+from .scheduler import build_graph, select_phase, run_graph
+from .running import (
+    running_table, start_running, heartbeat, clear_running, list_running,
+)
+from .jobs import (
+    jobs_table, enqueue_jobs, lease_job, renew_lease, finish_job,
+    job_progress,
+)
+
 
 log = getLogger(__name__)
 
@@ -53,12 +89,28 @@ class MigrationsManager:
     migrations files and their status in the database.
 
     :param Namespace config: runtime configuration to manage migrations.
+    :param reporter: Optional reporter of machine-readable results, like
+     :py:class:`surrealdb_migrations.output.JsonReporter`. Human-readable
+     tables are not rendered when a reporter is set.
     """
 
-    def __init__(self, config):
+    def __init__(self, config, reporter=None):
         self.config = config
+        self.reporter = reporter
         self._connection: Optional[AsyncSurreal] = None
+        self._password: Optional[str] = None
+        self._metastore_lock = Lock()
+        self._reconnect_lock = Lock()
+        self._generation = 0
         self.db: Optional[AsyncSurrealSession] = None
+        self.pool: Optional[SessionPool] = None
+        self.migrations_pool: Optional[SessionPool] = None
+        self.throttle: Optional[Throttle] = Throttle.from_config(config)
+        self.retry: RetryPolicy = RetryPolicy.from_config(config)
+        self.durations = {}
+        self._attempts = {}
+        self.stopping = False
+        self._listener = None
 
     async def _connect(self):
         """
@@ -68,7 +120,7 @@ class MigrationsManager:
         variable specified in the configuration, establishes a connection to
         the database, and signs in with the provided credentials. It also
         selects the appropriate namespace and database for subsequent
-        operations.
+        operations, and prepares the pools of additional sessions.
 
         This private method is intended is not meant to be called directly by
         external code, use the context manager interface instead.
@@ -76,7 +128,7 @@ class MigrationsManager:
         :raises RuntimeError: If the database password environment variable is
          unset.
         """
-        log.info(
+        log.debug(
             'Connecting to SurrealDB with the following configuration:'
             f'\n{self.config}'
         )
@@ -84,38 +136,208 @@ class MigrationsManager:
         # Grab password from environment variable
         password_env = self.config.database.password_env
         password = environ.get(password_env, None)
-        if password is None:
+        if password is None and not is_embedded(self.config.database.url):
             raise RuntimeError(
                 'Database password environment variable '
                 f'{password_env} is not set'
             )
 
-        # Connect to SurrealDB
-        self._connection = AsyncSurreal(self.config.database.url)
-        await self._connection.connect()
+        self._password = password
 
-        # Create a new session, sign in and select namespace and database
-        self.db = await self._connection.new_session()
+        await self._open()
 
-        log.info(
-            f'Connecting via {self.config.database.url} '
-            f'as {self.config.database.username!r}'
+        log.info('Successfully connected and signed in!')
+
+    async def _open(self):
+        """
+        Open the connection to the database, with keepalive pings, and create
+        the main session and the pools of additional sessions.
+
+        The connection and its sessions replace the current ones at once, once
+        they are all ready, so concurrent tasks never see a partially opened
+        connection.
+
+        Migrations applied concurrently take their sessions from their own
+        pool, of ``migrations.concurrency`` sessions, so they never exhaust
+        the pool of ``database.pool_size`` sessions used by the helpers they
+        call, like ``load_records`` or partitioned backfills.
+        """
+        database = self.config.database
+
+        # Connect to SurrealDB
+        connection = AsyncSurreal(
+            database.url,
+            ping_interval=database.ping_interval or None,
+            ping_timeout=database.ping_timeout or None,
         )
-        await self.db.signin({
-            'username': self.config.database.username,
-            'password': password,
-        })
+        await connection.connect()
 
         log.info(
-            f'Using namespace {self.config.database.namespace!r} and '
-            f'database {self.config.database.database!r} ...'
+            f'Connecting via {database.url} as {database.username!r}'
+        )
+        log.info(
+            f'Using namespace {database.namespace!r} and '
+            f'database {database.database!r} ...'
+        )
+        try:
+            db = await self._new_session(connection)
+        except Exception as e:
+            await connection.close()
+            raise e
+
+        factory = partial(self._new_session, connection)
+        self._connection = connection
+        self.db = db
+        self.pool = SessionPool(factory, database.pool_size)
+        self.migrations_pool = SessionPool(
+            factory, max(self.config.migrations.concurrency, 1),
+        )
+
+    async def _reconnect(self, generation):
+        """
+        Replace a lost connection with a new one, signing in and selecting the
+        namespace and database again.
+
+        Connection attempts are retried with an exponential backoff, up to
+        ``database.reconnect_attempts`` times.
+
+        :param int generation: Generation of the connection that was lost.
+         If the connection was already replaced, for example by a concurrent
+         migration that lost it too, nothing is done.
+
+        :raises RuntimeError: If all the connection attempts failed.
+        """
+        async with self._reconnect_lock:
+            if generation != self._generation:
+                return
+
+            # The lost connection stays in place until the new one replaces
+            # it, concurrent tasks using it fail with a lost connection and
+            # wait for this lock
+            lost = (
+                self._connection, self.db, self.pool, self.migrations_pool,
+            )
+
+            attempts = self.config.database.reconnect_attempts
+            delay = self.config.database.reconnect_delay
+
+            for attempt in range(1, attempts + 1):
+                log.warning(
+                    f'Reconnecting to {self.config.database.url} '
+                    f'(attempt {attempt} of {attempts}) ...'
+                )
+                try:
+                    await self._open()
+                    break
+                except Exception as e:
+                    log.warning(f'Unable to reconnect: {e}')
+                    if attempt == attempts:
+                        raise RuntimeError(
+                            f'Unable to reconnect after {attempts} attempts'
+                        ) from e
+                    await sleep(delay)
+                    delay *= 2
+
+            self._generation += 1
+            log.info('Successfully reconnected and signed in!')
+
+            # The old sessions are unusable, close what can be closed
+            try:
+                await self._close_connection(*lost)
+            except Exception as e:
+                log.debug(f'Unable to close the lost connection: {e}')
+
+    async def _is_applied(self, migration):
+        """
+        Check if a migration is recorded in the metastore.
+
+        :param str migration: The name of the migration.
+
+        :return: True if the migration is applied.
+        :rtype: bool
+        """
+        result = await self.db.query(
+            f'SELECT VALUE name FROM {self.config.migrations.metastore} '
+            'WHERE name = $name;',
+            {'name': migration},
         )
-        await self.db.use(
+        return bool(result)
+
+    async def _resume(self, migration, apply):
+        """
+        Apply a migration, reconnecting and resuming if the connection is
+        lost.
+
+        As the migration is recorded in the metastore in its transaction, the
+        metastore tells if the transaction was committed before the connection
+        was lost. If not, the migration is applied again, and the attempts
+        made before the connection was lost are counted in its retries.
+
+        :param str migration: The name of the migration.
+        :param apply: Coroutine function, without arguments, applying the
+         migration with the current connection.
+
+        :raises Exception: The error of the last attempt, if the migration
+         failed for another reason or the connection was lost more than
+         ``database.reconnect_attempts`` times.
+        """
+        attempts = self.config.database.reconnect_attempts
+        attempt = 0
+        self._attempts[migration] = 0
+
+        try:
+            while True:
+                generation = self._generation
+                try:
+                    return await apply()
+
+                except Exception as e:
+                    if not is_connection_lost(e) or attempt >= attempts:
+                        raise e
+
+                    attempt += 1
+                    log.warning(
+                        'Connection lost while applying migration '
+                        f'{migration}, resuming ...'
+                    )
+                    await self._reconnect(generation)
+
+                    if await self._is_applied(migration):
+                        log.info(
+                            f'Migration {migration} was committed before the '
+                            'connection was lost'
+                        )
+                        self._event(MigrationCommitted('upgrade', migration))
+                        return
+        finally:
+            self._attempts.pop(migration, None)
+
+    async def _new_session(self, connection=None):
+        """
+        Create a new session on a connection, sign in and select the
+        configured namespace and database.
+
+        :param connection: The connection. Defaults to the current one.
+
+        :return: The new session, ready to be used.
+        :rtype: AsyncSurrealSession
+        """
+        if connection is None:
+            connection = self._connection
+        session = await connection.new_session()
+
+        # Embedded engines do not require to sign in
+        if not is_embedded(self.config.database.url):
+            await session.signin({
+                'username': self.config.database.username,
+                'password': self._password,
+            })
+        await session.use(
             namespace=self.config.database.namespace,
             database=self.config.database.database,
         )
 
-        log.info('Successfully connected and signed in!')
+        return session
 
     async def _close(self):
         """
@@ -125,17 +347,40 @@ class MigrationsManager:
         external code, use the context manager interface instead.
         """
         if self._connection is not None:
+            lost = (
+                self._connection, self.db, self.pool, self.migrations_pool,
+            )
+            self._connection = None
+            self.db = None
+            self.pool = None
+            self.migrations_pool = None
+            await self._close_connection(*lost)
 
-            if self.db is not None:
-                log.debug('Closing database session ...')
-                await self.db.close_session()
-                log.debug('Database session successfully closed!')
-                self.db = None
+    async def _close_connection(self, connection, db, pool, migrations_pool):
+        """
+        Close a connection and its sessions.
 
-            log.debug('Closing database connection ...')
-            await self._connection.close()
-            log.debug('Database connection successfully closed!')
-            self._connection = None
+        :param connection: The connection.
+        :param db: The main session of the connection.
+        :param SessionPool pool: The pool of sessions of the helpers.
+        :param SessionPool migrations_pool: The pool of sessions of the
+         migrations.
+        """
+        if pool is not None:
+            log.debug('Closing pooled database sessions ...')
+            await pool.close()
+
+        if migrations_pool is not None:
+            await migrations_pool.close()
+
+        if db is not None:
+            log.debug('Closing database session ...')
+            await db.close_session()
+            log.debug('Database session successfully closed!')
+
+        log.debug('Closing database connection ...')
+        await connection.close()
+        log.debug('Database connection successfully closed!')
 
     async def __aenter__(self):
         """
@@ -204,20 +449,47 @@ class MigrationsManager:
 
     def _list_fs_migrations(self):
         """
-        List all migration files in the configured directory.
+        List all migration files in the configured directory, or in the
+        configured package.
 
         :return list: A list of migration files sorted by name (older first).
          The name of the file is expected to start with an ISO8601 timestamp to
          ensure the correct order of migrations.
          If no migration files are found, an empty list is returned.
+         Migrations of a package are listed as package resources.
         :rtype: list[pathlib.Path]
         """
-        directory = Path(self.config.migrations.directory).resolve()
-        migrations = sorted(directory.glob('*.py'))
+        if self.config.migrations.package:
+            directory = f'package {self.config.migrations.package}'
+            migrations = list_package(self.config.migrations.package)
+        else:
+            directory = Path(self.config.migrations.directory).resolve()
+            migrations = sorted(
+                path for path in directory.glob('*.py')
+                if is_migration(path.name)
+            )
 
         if not migrations:
             log.info(f'No migration files found at {directory}')
         else:
+            log.debug(f'Found {len(migrations)} migrations at {directory}')
+
+        return migrations
+
+    def do_list(self):
+        """
+        List all migration files in the configured directory.
+
+        :return list: A list of migration files sorted by name (older first).
+        :rtype: list[pathlib.Path]
+        """
+        migrations = self._list_fs_migrations()
+
+        if self.reporter is not None:
+            for migration in migrations:
+                self._report('migration_file', name=migration.name)
+
+        elif migrations and log.isEnabledFor(INFO):
             table = tabulate(
                 [
                     [migration.name]
@@ -226,18 +498,105 @@ class MigrationsManager:
                 headers=['Migration Files'],
                 tablefmt='rounded_outline',
             )
-            log.info(f'Migrations located at {directory}:\n{table}')
+            log.info(f'Migration files:\n{table}')
 
         return migrations
 
-    def do_list(self):
+    def do_bundle(self, legacy=False):
         """
-        List all migration files in the configured directory.
+        Write the manifest of the migrations of the configured directory, and
+        compile them to bytecode, so they can be shipped as a package.
 
-        :return list: A list of migration files sorted by name (older first).
-        :rtype: list[pathlib.Path]
+        :param bool legacy: Write the bytecode next to the sources, as
+         required to import it from zipapps.
+
+        :return list: The names of the migrations in the manifest, sorted by
+         name (older first).
+        :rtype: list[str]
+        """
+        directory = Path(self.config.migrations.directory).resolve()
+        return write_manifest(directory, legacy=legacy)
+
+    def _archive_path(self):
+        """
+        Path to the archive of the configured directory.
+
+        :return: The path to the archive, or None if the migrations were
+         never archived, or are loaded from a package.
+        :rtype: pathlib.Path
+        """
+        if self.config.migrations.package:
+            return None
+
+        path = Path(self.config.migrations.directory).resolve() / ARCHIVE
+        return path if path.is_file() else None
+
+    async def do_archive(self, before):
+        """
+        Move the applied migrations older than a datetime into the archive of
+        the configured directory.
+
+        Archived migrations are no longer listed by routine commands. They
+        are read from the archive only when needed, to bootstrap a database
+        that did not apply them, or to roll them back.
+
+        Migrations are archived in order, up to the first migration that is
+        not applied, so the archive only holds migrations older than the ones
+        left in the directory.
+
+        :param datetime before: Migrations with a timestamp older (less) than
+         this datetime are archived.
+
+        :return list: The names of the archived migrations, sorted by name
+         (older first).
+        :rtype: list[str]
+
+        :raises RuntimeError: If the migrations are loaded from a package.
         """
-        return self._list_fs_migrations()
+        if self.config.migrations.package:
+            raise RuntimeError(
+                'Migrations loaded from a package cannot be archived'
+            )
+
+        applied_names = {
+            migration['name'] for migration in await self._list_db_migrations()
+        }
+
+        migrations_to_archive = []
+        for migration_file in self._list_fs_migrations():
+            if migration_file.name >= before.isoformat():
+                break
+            if migration_file.name not in applied_names:
+                log.warning(
+                    f'Migration {migration_file.name} is not applied, '
+                    'archiving the migrations before it only'
+                )
+                break
+            migrations_to_archive.append(migration_file.name)
+
+        if not migrations_to_archive:
+            log.info(f'No migrations to archive before {before.isoformat()}')
+            return []
+
+        directory = Path(self.config.migrations.directory).resolve()
+        archive = archive_migrations(directory, migrations_to_archive)
+
+        if self.reporter is not None:
+            for migration in migrations_to_archive:
+                self._report('archived', name=migration, archive=archive)
+
+        elif log.isEnabledFor(INFO):
+            table = tabulate(
+                [
+                    [migration]
+                    for migration in migrations_to_archive
+                ],
+                headers=['Archived Migrations'],
+                tablefmt='rounded_outline',
+            )
+            log.info(f'Migrations archived into {archive}:\n{table}')
+
+        return migrations_to_archive
 
     async def _list_db_migrations(self):
         """
@@ -263,7 +622,8 @@ class MigrationsManager:
         log.info('Fetching applied migrations ...')
         try:
             result = await self.db.query(
-                'SELECT name, applied_date '
+                'SELECT name, applied_date, phase, completed_date, batch, '
+                'retries, verification '
                 f'FROM {table} '
                 'ORDER BY applied_date DESC;'
             )
@@ -281,23 +641,20 @@ class MigrationsManager:
 
         migrations = [
             {
-                key: item[key]
-                for key in ('name', 'applied_date')
+                key: item.get(key)
+                for key in (
+                    'name', 'applied_date', 'phase', 'completed_date',
+                    'batch', 'retries',
+                )
             }
             for item in result
         ]
 
-        table = tabulate(
-            [
-                [migration['name'], migration['applied_date']]
-                for migration in migrations
-            ],
-            headers=['Name', 'Applied Date'],
-            tablefmt='rounded_outline',
-        )
-        log.info(
-            f'Migrations currently applied in the database:\n{table}'
-        )
+        for migration, item in zip(migrations, result):
+            verification = item.get('verification')
+            migration['verification'] = (
+                None if verification is None else loads(verification)
+            )
 
         return migrations
 
@@ -306,7 +663,8 @@ class MigrationsManager:
         List all applied migrations in the database.
 
         :return list: A list of applied migrations (name and applied_date)
-         sorted by applied date in descending order (newer first).
+         sorted by applied date in descending order (newer first), with the
+         progress of their deferred ``jobs``.
 
          ::
 
@@ -320,46 +678,288 @@ class MigrationsManager:
 
         :rtype: list[dict]
         """
-        return await self._list_db_migrations()
+        await self._show_running()
+
+        migrations = await self._list_db_migrations()
+        if not migrations:
+            return migrations
+
+        # Progress of the deferred jobs of the migrations
+        try:
+            progress = await job_progress(self.db, jobs_table(self.config))
+        except NotFoundError as e:
+            if e.table_name is None:
+                raise e
+            progress = {}
+
+        for migration in migrations:
+            migration['jobs'] = progress.get(migration['name'], {})
+
+        if self.reporter is not None:
+            for migration in migrations:
+                self._report('migration', **migration)
+            return migrations
+
+        if not log.isEnabledFor(INFO):
+            return migrations
+
+        def jobs(migration):
+            if not migration['jobs']:
+                return '-'
+            counts = migration['jobs']
+            summary = f'{counts.get("done", 0)}/{sum(counts.values())} done'
+            if counts.get('failed'):
+                summary = f'{summary}, {counts["failed"]} failed'
+            return summary
+
+        table = tabulate(
+            [
+                [
+                    migration['name'], migration['applied_date'],
+                    migration['phase'] or '-',
+                    migration['completed_date'] or 'pending',
+                    jobs(migration),
+                    migration['batch'] or '-',
+                    migration['retries'] or 0,
+                ]
+                for migration in migrations
+            ],
+            headers=[
+                'Name', 'Applied Date', 'Phase', 'Completed Date', 'Jobs',
+                'Batch', 'Retries',
+            ],
+            tablefmt='rounded_outline',
+        )
+        log.info(
+            f'Migrations currently applied in the database:\n{table}'
+        )
+
+        return migrations
+
+    async def _list_running(self):
+        """
+        List the migrations in progress.
+
+        :return list: The running records, oldest first, with the ``host`` and
+         ``pid`` of the process running them, their ``operation``,
+         ``started_at`` and ``last_heartbeat`` dates, their ``progress``
+         counters, and a ``stale`` flag, set if their heartbeat expired.
+        :rtype: list[dict]
+        """
+        try:
+            return await list_running(
+                self.db, running_table(self.config),
+                self.config.migrations.heartbeat_timeout,
+            )
+        except NotFoundError as e:
+            if e.table_name is None:
+                raise e
+            return []
+
+    async def _show_running(self):
+        """
+        Show the migrations in progress, and warn about stale runs.
+
+        :return list: The running records, see :py:meth:`_list_running`.
+        :rtype: list[dict]
+        """
+        running = await self._list_running()
+
+        for record in running:
+            if record['stale']:
+                log.warning(
+                    f'Migration {record["migration"]} run by process '
+                    f'{record["pid"]} on {record["host"]} is stale, its last '
+                    f'heartbeat was at {record["last_heartbeat"]}'
+                )
+
+        if self.reporter is not None:
+            for record in running:
+                self._report('running', **record)
+
+        elif running and log.isEnabledFor(INFO):
+            table = tabulate(
+                [
+                    [
+                        record['migration'], record['operation'],
+                        f'{record["host"]}:{record["pid"]}',
+                        record['started_at'], record['last_heartbeat'],
+                        ', '.join(
+                            f'{name} {value}'
+                            for name, value in record['progress'].items()
+                        ) or '-',
+                        'stale' if record['stale'] else 'running',
+                    ]
+                    for record in running
+                ],
+                headers=[
+                    'Name', 'Operation', 'Process', 'Started At',
+                    'Last Heartbeat', 'Progress', 'State',
+                ],
+                tablefmt='rounded_outline',
+            )
+            log.info(f'Migrations in progress:\n{table}')
+
+        return running
+
+    @asynccontextmanager
+    async def _track(self, migration, operation, progress):
+        """
+        Record a migration as running while the context is active, updating
+        its heartbeat every ``migrations.heartbeat_interval`` seconds.
+
+        Failing to update the running record is logged, but does not fail
+        the migration.
+
+        :param str migration: The name of the migration.
+        :param str operation: The operation, ``upgrade`` or ``downgrade``.
+        :param dict progress: The progress counters of the migration, written
+         with each heartbeat. Callable values are called to get the current
+         value of the counter.
+        """
+        interval = self.config.migrations.heartbeat_interval
+        record_id = None
+
+        if interval:
+            try:
+                record_id = await start_running(
+                    self.db, running_table(self.config), migration,
+                    operation, gethostname(), getpid(),
+                )
+            except Exception as e:
+                log.warning(
+                    f'Unable to record migration {migration} as running: {e}'
+                )
+
+        async def beat():
+            while True:
+                await sleep(interval)
+                try:
+                    await heartbeat(self.db, record_id, {
+                        name: value() if callable(value) else value
+                        for name, value in progress.items()
+                    })
+                except Exception as e:
+                    log.warning(
+                        'Unable to update the heartbeat of migration '
+                        f'{migration}: {e}'
+                    )
+
+        beats = None if record_id is None else create_task(beat())
+        try:
+            yield
+        finally:
+            if beats is not None:
+                # Wait for the heartbeat to stop, so it does not write the
+                # running record again once cleared
+                beats.cancel()
+                with suppress(CancelledError):
+                    await beats
+                try:
+                    await clear_running(self.db, record_id)
+                except Exception as e:
+                    log.warning(
+                        'Unable to clear the running record of migration '
+                        f'{migration}: {e}'
+                    )
 
     async def _create_metastore_table(self):
         """
         Create the metastore table if it does not exist.
 
         This table is used to store the applied migrations and their
-        timestamps.
+        timestamps. A companion table stores the checkpoints of the migrations
+        being applied.
+        """
+        await self.db.query(self._metastore_table_query())
+        log.debug('Successfully created the metastore table!')
+
+    def _metastore_table_query(self):
+        """
+        Build the query that creates the metastore tables.
+
+        :return: The SurrealQL query.
+        :rtype: str
         """
         table = self.config.migrations.metastore
-        query = (
+        checkpoints = checkpoints_table(self.config)
+        return (
             f'DEFINE TABLE IF NOT EXISTS {table} SCHEMAFULL; '
             f'DEFINE FIELD IF NOT EXISTS name '
             f'ON {table} TYPE string; '
             f'DEFINE FIELD IF NOT EXISTS applied_date '
             f'ON {table} TYPE datetime; '
+            f'DEFINE FIELD IF NOT EXISTS phase '
+            f'ON {table} TYPE option<string>; '
+            f'DEFINE FIELD IF NOT EXISTS completed_date '
+            f'ON {table} TYPE option<datetime>; '
+            f'DEFINE FIELD IF NOT EXISTS batch '
+            f'ON {table} TYPE option<string>; '
+            f'DEFINE FIELD IF NOT EXISTS retries '
+            f'ON {table} TYPE option<int>; '
+            f'DEFINE FIELD IF NOT EXISTS verification '
+            f'ON {table} TYPE option<string>; '
+            f'DEFINE FIELD IF NOT EXISTS fingerprint '
+            f'ON {table} TYPE option<string>; '
             f'DEFINE INDEX IF NOT EXISTS unique_migration '
             f'ON {table} COLUMNS name UNIQUE; '
+            f'DEFINE TABLE IF NOT EXISTS {checkpoints} SCHEMALESS; '
+            f'DEFINE TABLE IF NOT EXISTS {jobs_table(self.config)} '
+            'SCHEMALESS; '
+            f'DEFINE TABLE IF NOT EXISTS {table}_failures SCHEMALESS; '
+            f'DEFINE TABLE IF NOT EXISTS {running_table(self.config)} '
+            'SCHEMALESS; '
         )
-        await self.db.query(query)
-        log.debug('Successfully created the metastore table!')
 
-    async def _insert_migration(self, migration):
+    async def _insert_migration(
+        self, migration, phase=None, completed=True, batch=None, retries=0,
+        verification=None, db=None,
+    ):
         """
         Insert a record of the applied migration into the metastore table.
 
         :param str migration: The name of the migration to insert.
+        :param str phase: The deploy phase the migration was applied in.
+        :param bool completed: Whether the migration is completed, or has
+         deferred jobs pending.
+        :param str batch: Identifier of the release batch the migration was
+         applied in.
+        :param int retries: Number of times the migration transaction was
+         retried.
+        :param dict verification: The results of the verification of the
+         migration, stored as JSON.
+        :param db: Optional database session or transaction to insert the
+         record with, instead of the main session.
+
+        :return: The record of the inserted migration.
+        :rtype: dict
         """
         table = self.config.migrations.metastore
         query = (
             f'CREATE {table} SET '
             'name = $name, '
-            'applied_date = <datetime>$time;'
+            'applied_date = <datetime>$time, '
+            'phase = $phase, '
+            'completed_date = IF $completed THEN <datetime>$time END, '
+            'batch = $batch, '
+            'retries = $retries, '
+            'verification = $verification '
+            'RETURN AFTER;'
         )
 
-        response = await self.db.query(
+        response = await (db or self.db).query(
             query,
             {
                 'name': migration,
                 'time': datetime.now(tz=timezone.utc).isoformat(),
+                'phase': phase,
+                'completed': completed,
+                'batch': batch,
+                'retries': retries,
+                'verification': (
+                    None if verification is None
+                    else dumps(verification, default=str)
+                ),
             }
         )
 
@@ -369,17 +969,66 @@ class MigrationsManager:
         )
         return record
 
+    async def _delete_checkpoints(self, migration):
+        """
+        Delete the checkpoints recorded by a migration.
+
+        :param str migration: The name of the migration.
+        """
+        table = checkpoints_table(self.config)
+        try:
+            await self.db.query(
+                f'DELETE {table} WHERE migration = $name;',
+                {'name': migration},
+            )
+        except NotFoundError as e:
+            if e.table_name is None:
+                raise e
+
+    async def _delete_jobs(self, migration):
+        """
+        Delete the deferred jobs enqueued by a migration.
+
+        :param str migration: The name of the migration.
+        """
+        try:
+            await self.db.query(
+                f'DELETE {jobs_table(self.config)} WHERE migration = $name;',
+                {'name': migration},
+            )
+        except NotFoundError as e:
+            if e.table_name is None:
+                raise e
+
     def _import_module(self, migration):
         """
         Dynamically loads a file as a Python module and executes it.
 
+        Migrations of the configured package are imported as submodules of
+        the package instead, using its bytecode when available. Archived
+        migrations are imported from the archive.
+
         :param migration (str): The name of the migration file to load.
 
         :return module: The dynamically loaded Python module.
         """
+        package = self.config.migrations.package
+        if package:
+            log.info(f'Importing migration module {migration} from {package}')
+            return import_module(f'{package}.{migration[:-len(".py")]}')
+
         directory = Path(self.config.migrations.directory)
         import_path = (directory / migration).resolve()
 
+        # Archived migrations are only read when their file is gone
+        archive = self._archive_path()
+        if archive is not None and not import_path.is_file():
+            log.info(
+                f'Importing archived migration module {migration} from '
+                f'{archive} ...'
+            )
+            return import_archived(archive, migration)
+
         log.info(f'Importing migration module from {import_path} ...')
 
         spec = util.spec_from_file_location(
@@ -390,93 +1039,1005 @@ class MigrationsManager:
 
         return module
 
-    async def do_migrate(self, to_datetime=None):
+    def _report(self, event, **fields):
         """
-        Apply all relevant migrations.
+        Report an event to the reporter, if any.
 
-        :param datetime to_datetime: Optional datetime to migrate to.
-         Migrations with a timestamp older (less) than this datetime will be
-         applied.
+        :param str event: The event type.
+        :param fields: The fields of the event.
+        """
+        if self.reporter is not None:
+            self.reporter.emit(event, **fields)
 
-        :return list: A list of applied migrations names, sorted in descending
-         order (newer first).
-        :rtype: list[str]
+    def _event(self, event):
         """
-        if to_datetime is None:
-            to_datetime = datetime.now(tz=timezone.utc)
+        Emit a progress event to the reporter, if any, and to the listener of
+        the running :py:meth:`iter_migrate` or :py:meth:`iter_rollback`, if
+        any.
 
-        log.info(f'Executing migration up to {to_datetime.isoformat()} ...')
+        :param Event event: The event.
+        """
+        self._report(event.type, **event.fields())
+        if self._listener is not None:
+            self._listener(event)
 
-        files = self._list_fs_migrations()
-        migrations_applied = await self._list_db_migrations()
+    def stop(self):
+        """
+        Stop at the next safe point.
 
-        # Filter migration files to apply only those that are newer (greater)
-        # than the latest applied migration
-        migrations_to_apply = [
-            migration_file.name for migration_file in files
-            if (
-                not migrations_applied
-                or migration_file.name > migrations_applied[0]['name']
-            )
-        ]
+        Migrations being applied or rolled back are completed, but no other
+        migration is started, and workers stop before leasing another job.
+        """
+        if not self.stopping:
+            log.warning('Stopping at the next safe point ...')
+        self.stopping = True
 
-        # Further filter migration files to apply only those that are older
-        # (less) than the provided datetime
-        if to_datetime:
-            migrations_to_apply = [
-                migration
-                for migration in migrations_to_apply
-                if migration < to_datetime.isoformat()
-            ]
+    def _check_stopping(self, migration):
+        """
+        Check if a migration can be started.
 
-        if not migrations_to_apply:
-            log.info('No migrations need to be applied')
-            return migrations_to_apply
+        :param str migration: The name of the migration about to start.
 
-        await self._create_metastore_table()
-        log.info(f'Applying {len(migrations_to_apply)} migrations ...')
+        :raises RuntimeError: If the manager was asked to stop.
+        """
+        if self.stopping:
+            raise RuntimeError(
+                f'Stopped before migration {migration}, as requested'
+            )
 
-        for migration in migrations_to_apply:
+    def _timeout(self, migration_obj, name):
+        """
+        Get a timeout of a migration, from the migration or the configuration.
+
+        :param BaseMigration migration_obj: The migration instance.
+        :param str name: Name of the timeout, ``timeout`` or
+         ``statement_timeout``.
+
+        :return: The number of seconds, or None for no timeout.
+        :rtype: float
+        """
+        timeout = getattr(migration_obj, name, None)
+        if timeout is None:
+            timeout = self.config.migrations[name]
+        return timeout or None
+
+    def _wrap_transaction(self, migration_obj, txn):
+        """
+        Wrap the transaction passed to a migration.
+
+        :param BaseMigration migration_obj: The migration instance.
+        :param txn: The transaction.
+
+        :return: The transaction, wrapped in a :py:class:`CountingSession`,
+         in a :py:class:`TimeoutSession` if statements have a timeout, and in a
+         :py:class:`CoalescingSession` if the migration opted in.
+        """
+        txn = CountingSession(txn)
+        statement_timeout = self._timeout(migration_obj, 'statement_timeout')
+        if statement_timeout:
+            txn = TimeoutSession(txn, statement_timeout)
+        if migration_obj.coalesce:
+            txn = CoalescingSession(txn)
+        return txn
+
+    async def _begin_transaction(self, migration_obj, db):
+        """
+        Begin the transaction passed to a migration.
+
+        :param BaseMigration migration_obj: The migration instance.
+        :param db: The database session to begin the transaction on.
+
+        :return: The transaction, wrapped as described in
+         :py:meth:`_wrap_transaction`.
+        """
+        txn = await db.begin_transaction()
+        return self._wrap_transaction(migration_obj, txn)
+
+    async def _cancel_transaction(self, txn):
+        """
+        Cancel a transaction, logging instead of raising errors, as a
+        transaction that failed to commit may be gone already.
+
+        :param txn: The transaction.
+        """
+        try:
+            await txn.cancel()
+        except Exception as e:
+            log.debug(f'Unable to cancel transaction: {e}')
+
+    def _deadline(self, migration_obj):
+        """
+        Compute the deadline of a migration, from its timeout.
+
+        :param migration_obj: The migration instance or class.
+
+        :return: The :py:func:`time.monotonic` time the migration must be
+         done by, or None for no timeout.
+        :rtype: float
+        """
+        timeout = self._timeout(migration_obj, 'timeout')
+        return None if timeout is None else monotonic() + timeout
+
+    def _retry_policy(self, *migration_classes):
+        """
+        Get the retry policy of the transaction of some migrations.
+
+        Migration functions may have side effects outside of their
+        transaction, so transactions are only retried if all their migrations
+        opted in.
+
+        :param migration_classes: The migration classes.
+
+        :return: The retry policy, that does not retry if any migration did
+         not opt in.
+        :rtype: RetryPolicy
+        """
+        if all(cls.retryable for cls in migration_classes):
+            return self.retry
+        return RetryPolicy(max_attempts=1)
+
+    async def _run_with_timeout(
+        self, migration, migration_obj, coroutine, deadline=None,
+    ):
+        """
+        Run a migration function, bounded by the timeout of the migration.
+
+        :param str migration: The name of the migration.
+        :param BaseMigration migration_obj: The migration instance.
+        :param coroutine: The coroutine to run.
+        :param float deadline: The deadline of the migration, as returned by
+         :py:meth:`_deadline`, shared by all its functions and attempts.
+         Defaults to the timeout of the migration from now.
+
+        :raises TimeoutError: If the timeout expired. The coroutine is
+         cancelled.
+        """
+        timeout = self._timeout(migration_obj, 'timeout')
+        if deadline is None and timeout is not None:
+            deadline = monotonic() + timeout
+        try:
+            return await wait_for(
+                coroutine,
+                None if deadline is None else max(deadline - monotonic(), 0),
+            )
+        except AsyncTimeoutError as e:
+            raise TimeoutError(
+                f'Migration {migration} timed out after {timeout}s'
+            ) from e
+
+    async def _record_failure(self, migration, operation, error):
+        """
+        Record the failure of a migration in the failures table of the
+        metastore.
+
+        Failing to record the failure is logged, but not raised, so the
+        original error is reported.
+
+        :param str migration: The name of the migration.
+        :param str operation: The failed operation, ``upgrade`` or
+         ``downgrade``.
+        :param Exception error: The error.
+        """
+        self._event(MigrationFailed(
+            operation, migration, f'{type(error).__name__}: {error}',
+            timed_out=isinstance(error, TimeoutError),
+        ))
+
+        try:
+            await self.db.query(
+                f'CREATE {self.config.migrations.metastore}_failures SET '
+                'migration = $migration, operation = $operation, '
+                'error = $error, timed_out = $timed_out, '
+                'failed_date = time::now();',
+                {
+                    'migration': migration,
+                    'operation': operation,
+                    'error': f'{type(error).__name__}: {error}',
+                    'timed_out': isinstance(error, TimeoutError),
+                },
+            )
+        except Exception:
+            log.warning(
+                f'Unable to record the failure of migration {migration}',
+                exc_info=True,
+            )
+
+    async def _apply_migration(self, migration, module, db, batch=None):
+        """
+        Apply a single migration in a transaction and record it in the
+        metastore.
+
+        :param str migration: The name of the migration to apply.
+        :param module: The migration module, as returned by
+         :py:meth:`_import_module`.
+        :param db: The database session to run the migration transaction on.
+        :param str batch: Identifier of the release batch.
+        """
+        self._check_stopping(migration)
+
+        # Attempts made before the connection was lost, if resumed
+        attempts = self._attempts.get(migration, 0)
+
+        async def attempt():
+            nonlocal attempts
+            attempts += 1
+            if migration in self._attempts:
+                self._attempts[migration] = attempts
+
+            migration_obj = module.Migration(
+                self.config, session=db, pool=self.pool, name=migration,
+                throttle=self.throttle, retry=self.retry,
+            )
+            txn = await self._begin_transaction(migration_obj, db)
+            progress['attempt'] = attempts
+            progress['statements'] = lambda: txn.statements
             try:
-                log.info(f'-> {migration}')
-                module = self._import_module(migration)
+                await self._run_with_timeout(
+                    migration, migration_obj, migration_obj.upgrade(txn),
+                    deadline,
+                )
+                verification = await self._run_with_timeout(
+                    migration, migration_obj, migration_obj.verify(txn),
+                    deadline,
+                )
+                if migration_obj.jobs:
+                    await enqueue_jobs(
+                        txn, jobs_table(self.config), migration,
+                        migration_obj.jobs,
+                    )
 
-                # Execute migration
-                migration_obj = module.Migration(self.config)
-                txn = await self.db.begin_transaction()
-                try:
-                    await migration_obj.upgrade(txn)
-                    await txn.commit()
-                except Exception as e:
-                    log.error(
-                        'Upgrade function failed, canceling transaction '
-                        f'for migration {migration} ...'
+                # Insert migration record in metastore, in the migration
+                # transaction, so the migration is recorded if and only if it
+                # is committed. Inserts are serialized so the applied dates
+                # record a total order, even when migrations are applied
+                # concurrently
+                async with self._metastore_lock:
+                    await self._insert_migration(
+                        migration, migration_obj.phase,
+                        completed=not migration_obj.jobs, batch=batch,
+                        retries=attempts - 1, verification=verification,
+                        db=txn,
                     )
-                    await txn.cancel()
-                    raise e
 
-                # Insert migration record in metastore
-                await self._insert_migration(migration)
+                await txn.commit()
+            except Exception as e:
+                log.error(
+                    'Upgrade function failed, canceling transaction '
+                    f'for migration {migration} ...'
+                )
+                await self._cancel_transaction(txn)
+                raise e
+
+            self._event(StatementCount('upgrade', migration, txn.statements))
+            return migration_obj
+
+        try:
+            log.info(f'-> {migration}')
+            self._event(MigrationStarted('upgrade', migration))
+            start = monotonic()
+
+            # Execute migration, retrying on transient errors if it opted
+            # in, all attempts within the timeout of the migration
+            progress = {}
+            deadline = self._deadline(module.Migration)
+            retry = self._retry_policy(module.Migration)
+            async with self._track(migration, 'upgrade', progress):
+                await retry.run(attempt, f'migration {migration}')
+            await self._delete_checkpoints(migration)
+
+            self.durations[migration] = monotonic() - start
+            log.info(
+                f'<- {migration} applied in '
+                f'{self.durations[migration]:.2f}s'
+            )
+            self._event(MigrationCommitted(
+                'upgrade', migration, self.durations[migration],
+                retries=attempts - 1,
+            ))
+
+        except Exception as e:
+            log.error(
+                f'Failed to apply migration {migration}',
+                exc_info=True,
+            )
+            # The failure can not be recorded without a connection
+            if not is_connection_lost(e):
+                await self._record_failure(migration, 'upgrade', e)
+
+            raise e
+
+    async def _apply_pooled_migration(self, migration, module, batch=None):
+        """
+        Apply a single migration using a session from the migrations pool.
+
+        :param str migration: The name of the migration to apply.
+        :param module: The migration module, as returned by
+         :py:meth:`_import_module`.
+        :param str batch: Identifier of the release batch.
+        """
+        async with self.migrations_pool.acquire() as session:
+            await self._apply_migration(
+                migration, module, session, batch=batch,
+            )
+
+    async def _pending_migrations(self, to_datetime):
+        """
+        List the migrations that need to be applied.
+
+        :param datetime to_datetime: Datetime to migrate to. Migrations with a
+         timestamp older (less) than this datetime are pending.
+
+        :return: A tuple with the names of all the known migrations, and the
+         names of the pending migrations, sorted by name (older first).
+        :rtype: tuple[list[str], list[str]]
+        """
+        names = [
+            migration_file.name
+            for migration_file in self._list_fs_migrations()
+        ]
+        migrations_applied = await self._list_db_migrations()
+
+        # Filter migration files to apply only those that are not applied yet
+        applied_names = {
+            migration['name'] for migration in migrations_applied
+        }
+
+        # Archived migrations are older than the migrations of the directory,
+        # and only pending on databases that did not reach them yet, like
+        # fresh databases
+        archive = self._archive_path()
+        if archive is not None and (
+            not names or max(applied_names, default='') < names[0]
+        ):
+            log.info(f'Reading archived migrations from {archive} ...')
+            names = sorted(set(names) | set(list_archive(archive)))
+
+        known = sorted(set(names) | applied_names)
+        migrations_to_apply = [
+            migration for migration in names
+            if migration not in applied_names
+        ]
+
+        # Migrations are pending until recorded in the metastore, so
+        # concurrent migrations and contract migrations applied after newer
+        # expand migrations are not skipped. Older migrations added after
+        # newer ones were applied are applied too, out of order
+        if migrations_applied:
+            latest = max(applied_names)
+            out_of_order = [
+                migration for migration in migrations_to_apply
+                if migration < latest
+            ]
+            if out_of_order:
+                log.warning(
+                    f'Migrations {", ".join(out_of_order)} are older than '
+                    f'the latest applied migration {latest}, but were never '
+                    'applied and are pending'
+                )
+
+        # Further filter migration files to apply only those that are older
+        # (less) than the provided datetime
+        if to_datetime:
+            migrations_to_apply = [
+                migration
+                for migration in migrations_to_apply
+                if migration < to_datetime.isoformat()
+            ]
+
+        return known, migrations_to_apply
+
+    async def do_migrate(self, to_datetime=None, phase=None):
+        """
+        Apply all relevant migrations.
+
+        Migrations are applied following their dependency graph. If the
+        configured concurrency is greater than one, independent migrations are
+        applied concurrently, each one on its own session of the migrations
+        pool.
+
+        :param datetime to_datetime: Optional datetime to migrate to.
+         Migrations with a timestamp older (less) than this datetime will be
+         applied.
+        :param str phase: Optional deploy phase, ``expand`` or ``contract``.
+         Only the pending migrations of this phase will be applied.
+
+        :return list: A list of applied migrations names, in the order they
+         were committed.
+        :rtype: list[str]
+        """
+        return [
+            event.name
+            async for event in self.iter_migrate(
+                to_datetime=to_datetime, phase=phase,
+            )
+            if isinstance(event, MigrationCommitted)
+        ]
+
+    async def iter_migrate(self, to_datetime=None, phase=None):
+        """
+        Apply all relevant migrations, yielding their progress.
+
+        ::
+
+            async for event in mgr.iter_migrate():
+                if isinstance(event, MigrationCommitted):
+                    print(f'{event.name} applied in {event.duration:.2f}s')
+
+        :param datetime to_datetime: Optional datetime to migrate to, as in
+         :py:meth:`do_migrate`.
+        :param str phase: Optional deploy phase, as in :py:meth:`do_migrate`.
+
+        :return: An asynchronous iterator of
+         :py:class:`surrealdb_migrations.events.Event`: a
+         :py:class:`PlanComputed` event, unless no migration needs to be
+         applied, then for each migration a :py:class:`MigrationStarted`
+         event, followed by :py:class:`StatementCount` and
+         :py:class:`MigrationCommitted` events, or by a
+         :py:class:`MigrationFailed` event before the error is raised.
+        :rtype: AsyncIterator[Event]
+        """
+        async def run(listener):
+            self._listener = listener
+            try:
+                await self._migrate(to_datetime=to_datetime, phase=phase)
+            finally:
+                self._listener = None
+
+        async for event in stream_events(run):
+            yield event
+
+    async def _migrate(self, to_datetime=None, phase=None):
+        """
+        Apply all relevant migrations, see :py:meth:`do_migrate`.
+        """
+        if to_datetime is None:
+            to_datetime = datetime.now(tz=timezone.utc)
+
+        log.info(f'Executing migration up to {to_datetime.isoformat()} ...')
+
+        known, migrations_to_apply = await self._pending_migrations(
+            to_datetime,
+        )
 
+        if not migrations_to_apply:
+            log.info('No migrations need to be applied')
+            return migrations_to_apply
+
+        await self._create_metastore_table()
+
+        # Import all migrations to build their dependency graph
+        modules = {}
+        for migration in migrations_to_apply:
+            try:
+                modules[migration] = self._import_module(migration)
             except Exception as e:
                 log.error(
-                    f'Failed to apply migration {migration}',
+                    f'Failed to import migration {migration}',
                     exc_info=True,
                 )
+                raise e
+
+        if phase is not None:
+            selected = select_phase(
+                [
+                    (migration, module.Migration)
+                    for migration, module in modules.items()
+                ],
+                phase,
+                known=known,
+            )
+            modules = {
+                migration: modules[migration] for migration, _ in selected
+            }
+
+            if not modules:
+                log.info(f'No {phase} migrations need to be applied')
+                return []
+
+        # All the migrations applied by this invocation form a release batch
+        batch = datetime.now(tz=timezone.utc).isoformat()
+
+        concurrency = self.config.migrations.concurrency
+        log.info(
+            f'Applying {len(modules)} migrations in batch {batch} '
+            f'(concurrency {concurrency}) ...'
+        )
+
+        graph = build_graph(
+            [
+                (migration, module.Migration)
+                for migration, module in modules.items()
+            ],
+            known=known,
+        )
+        self._event(PlanComputed('upgrade', modules, batch=batch))
+
+        committed = []
+
+        async def apply_pooled(migration):
+            await self._resume(
+                migration,
+                lambda: self._apply_pooled_migration(
+                    migration, modules[migration], batch=batch,
+                ),
+            )
+            committed.append(migration)
+
+        try:
+            if concurrency > 1:
+                applied = await run_graph(
+                    graph, apply_pooled, concurrency=concurrency,
+                )
+            else:
+                for migration, module in modules.items():
+                    await self._resume(
+                        migration,
+                        lambda: self._apply_migration(
+                            migration, module, self.db, batch=batch,
+                        ),
+                    )
+                    committed.append(migration)
+                applied = committed
+
+        finally:
+            # The schema is fingerprinted once, after the last committed
+            # migration, even if another one failed
+            if committed:
+                await self._record_fingerprint()
+
+        log.info(
+            f'Successfully applied {len(applied)} migrations'
+        )
+
+        return applied
+
+    def _is_metastore_table(self, table):
+        """
+        Check if a table belongs to the metastore.
+
+        :param str table: The name of the table.
+
+        :return: True for the metastore table and its companion tables.
+        :rtype: bool
+        """
+        metastore = self.config.migrations.metastore
+        return table in {
+            metastore,
+            checkpoints_table(self.config),
+            jobs_table(self.config),
+            running_table(self.config),
+            f'{metastore}_failures',
+        }
+
+    async def _store_fingerprint(self, migration):
+        """
+        Compute the fingerprint of the schema of the database, and store it
+        in the record of a migration.
 
+        :param str migration: The name of the migration.
+
+        :return: The fingerprint.
+        :rtype: dict
+        """
+        fingerprint = await schema_fingerprint(
+            self.db, ignore=self._is_metastore_table,
+        )
+        await self.db.query(
+            f'UPDATE {self.config.migrations.metastore} '
+            'SET fingerprint = $fingerprint WHERE name = $name;',
+            {'name': migration, 'fingerprint': dumps(fingerprint)},
+        )
+        return fingerprint
+
+    async def _record_fingerprint(self):
+        """
+        Record the schema fingerprint in the record of the last applied
+        migration, if enabled.
+
+        The migrations are committed, so failing to record the fingerprint is
+        logged but does not fail them.
+        """
+        if not self.config.migrations.fingerprint:
+            return
+
+        migration = None
+        try:
+            migration = (await self._list_db_migrations())[0]['name']
+            await self._store_fingerprint(migration)
+        except Exception as e:
+            log.warning(
+                'Unable to record the schema fingerprint of migration '
+                f'{migration}: {e}'
+            )
+
+    async def do_drift(self, update=False):
+        """
+        Compare the live schema of the database with the fingerprint recorded
+        after the last applied migration.
+
+        If the last applied migration has no fingerprint, for example when the
+        process stopped after committing it, the fingerprint of the newest
+        migration that has one is compared instead.
+
+        The definitions of the database and a hash of each table are compared
+        in a single request, and the definitions of the tables whose hash
+        differs are compared next. Tables of the metastore are ignored.
+
+        :param bool update: Record the fingerprint of the live schema for the
+         last applied migration instead, accepting its differences.
+
+        :return list: The differences, with the ``table`` they belong to,
+         None for the definitions of the database, the ``definition``, as
+         ``<kind> <name>``, and the ``change``, either ``added``, ``removed``
+         or ``changed``.
+        :rtype: list[dict]
+
+        :raises RuntimeError: If no migration is applied, or no fingerprint
+         was recorded for any applied migration.
+        """
+        metastore = self.config.migrations.metastore
+
+        try:
+            result = await self.db.query(
+                f'SELECT name, fingerprint FROM {metastore} '
+                'ORDER BY applied_date DESC LIMIT 1;'
+            )
+        except NotFoundError as e:
+            if e.table_name is None:
                 raise e
+            result = []
+
+        if not result:
+            raise RuntimeError(
+                'No migrations are applied, there is no schema to compare'
+            )
+
+        migration = result[0]['name']
+
+        if update:
+            await self._store_fingerprint(migration)
+            log.info(f'Recorded the live schema for migration {migration}')
+            return []
+
+        if result[0].get('fingerprint') is None:
+            result = await self.db.query(
+                f'SELECT name, fingerprint FROM {metastore} '
+                'WHERE fingerprint != NONE '
+                'ORDER BY applied_date DESC LIMIT 1;'
+            )
+            if not result:
+                raise RuntimeError(
+                    'No schema fingerprint recorded for migration '
+                    f'{migration}, use --update to record the live schema'
+                )
+
+            log.warning(
+                f'No schema fingerprint recorded for migration {migration}, '
+                f'comparing with the one of migration {result[0]["name"]}'
+            )
+            migration = result[0]['name']
 
+        drift = await schema_drift(
+            self.db, loads(result[0]['fingerprint']),
+            ignore=self._is_metastore_table,
+        )
+
+        if self.reporter is not None:
+            for difference in drift:
+                self._report('drift', migration=migration, **difference)
+
+        elif drift:
+            table = tabulate(
+                [
+                    [
+                        difference['table'] or '-',
+                        difference['definition'],
+                        difference['change'],
+                    ]
+                    for difference in drift
+                ],
+                headers=['Table', 'Definition', 'Change'],
+                tablefmt='rounded_outline',
+            )
+            log.warning(
+                f'Schema drifted since migration {migration}:\n{table}'
+            )
+
+        else:
+            log.info(f'No schema drift since migration {migration}')
+
+        return drift
+
+    async def _record_migration(self, migration, record=False):
+        """
+        Run a migration against a recording session.
+
+        :param str migration: The name of the migration to record.
+        :param bool record: Also record the insertion of the migration in the
+         metastore, in the migration transaction.
+
+        :return: The recording session with the captured statements.
+        :rtype: RecordingSession
+        """
+        module = self._import_module(migration)
+
+        recorder = RecordingSession()
+        migration_obj = module.Migration(
+            self.config, session=recorder, pool=recorder, name=migration,
+        )
+        txn = await recorder.begin_transaction()
+        await migration_obj.upgrade(txn)
+
+        if record:
+            await txn.query(
+                f'CREATE {self.config.migrations.metastore} SET '
+                'name = $name, '
+                'applied_date = time::now();',
+                {'name': migration},
+            )
+
+        return recorder
+
+    async def do_plan(self, to_datetime=None, explain=False, count_limit=None):
+        """
+        List the migrations that would be applied, in order.
+
+        With ``explain``, each pending migration is run against a recording
+        session, and its captured statements are analyzed against the database
+        using ``EXPLAIN``, without modifying it. Statements doing full table
+        scans are flagged. With a ``count_limit``, the records each statement
+        touches are also counted, up to that limit per statement.
+
+        Reads of the recording session return no results, and statements on
+        tables created by pending migrations cannot be analyzed.
+
+        :param datetime to_datetime: Optional datetime to migrate to.
+         Migrations with a timestamp older (less) than this datetime are
+         planned.
+        :param bool explain: Analyze the cost of the statements of each
+         pending migration.
+        :param int count_limit: Optional maximum number of records to count
+         for each analyzed statement.
+
+        :return list: A list of planned migrations, sorted by name (older
+         first). Each item has the ``name`` of the migration and, with
+         ``explain``, the analyzed ``statements`` as returned by
+         :py:func:`surrealdb_migrations.explain.explain_statement`, the number
+         of ``full_scans`` and the ``rows`` touched, None if not counted.
+        :rtype: list[dict]
+        """
+        if to_datetime is None:
+            to_datetime = datetime.now(tz=timezone.utc)
+
+        log.info(f'Planning migration up to {to_datetime.isoformat()} ...')
+
+        _, migrations_to_plan = await self._pending_migrations(to_datetime)
+
+        if not migrations_to_plan:
+            log.info('No migrations need to be applied')
+            return []
+
+        def rows(count):
+            # Counts reaching the limit are lower bounds
+            if count is None:
+                return '-'
+            return f'{count}+' if count >= count_limit else count
+
+        plans = []
+        for migration in migrations_to_plan:
+            plan = {'name': migration}
+            plans.append(plan)
+
+            if explain:
+                recorder = await self._record_migration(migration)
+                plan['statements'] = [
+                    await explain_statement(
+                        self.db, statement, recorded.vars,
+                        count_limit=count_limit,
+                    )
+                    for recorded in recorder.statements
+                    for statement in split_statements(recorded.query)
+                ]
+                plan['full_scans'] = sum(
+                    1 for analysis in plan['statements']
+                    if analysis['full_scan']
+                )
+                plan['rows'] = None
+                if count_limit is not None:
+                    plan['rows'] = sum(
+                        analysis['rows'] or 0
+                        for analysis in plan['statements']
+                    )
+
+            if self.reporter is not None:
+                self._report('planned', **plan)
+                continue
+
+            if not explain or not log.isEnabledFor(INFO):
+                continue
+
+            table = tabulate(
+                [
+                    [
+                        ' '.join(analysis['statement'].split())[:60],
+                        analysis['target'] or '-',
+                        {True: 'YES', False: 'no'}.get(
+                            analysis['full_scan'], '-'
+                        ),
+                        rows(analysis['rows']),
+                        analysis['error'] or '',
+                    ]
+                    for analysis in plan['statements']
+                ],
+                headers=['Statement', 'Target', 'Full Scan', 'Rows', 'Error'],
+                tablefmt='rounded_outline',
+            )
+            touched = ''
+            if plan['rows'] is not None:
+                touched = f', ~{plan["rows"]} records touched'
+            log.info(
+                f'Plan for migration {migration} '
+                f'({plan["full_scans"]} full scans{touched}):\n{table}'
+            )
+
+        if not explain and self.reporter is None and log.isEnabledFor(INFO):
+            table = tabulate(
+                [[plan['name']] for plan in plans],
+                headers=['Pending Migrations'],
+                tablefmt='rounded_outline',
+            )
+            log.info(f'Migrations that would be applied:\n{table}')
+
+        return plans
+
+    async def do_rehearse(self, to_datetime=None, url=None):
+        """
+        Rehearse the pending migrations on a clone of the database, and report
+        how long each one took.
+
+        The database is cloned into a throwaway database of the same
+        namespace, or into the same namespace and database of another server
+        or embedded engine if an URL is given, as ``mem://``. Migrations are
+        applied to the clone, that is removed afterwards, whether they
+        succeeded or not. The database itself is not modified, except for the
+        creation and removal of the throwaway database.
+
+        :param datetime to_datetime: Optional datetime to migrate to.
+         Migrations with a timestamp older (less) than this datetime will be
+         applied.
+        :param str url: Optional URL of the server or embedded engine to clone
+         the database into.
+
+        :return: A mapping of applied migration name to the number of seconds
+         it took, in the order they were applied.
+        :rtype: dict
+        """
+        config = deepcopy(self.config)
+
+        if url is not None:
+            config.database.url = url
+            clone = None
+        else:
+            clone = '{}_rehearsal_{}'.format(
+                config.database.database,
+                datetime.now(tz=timezone.utc).strftime('%Y%m%dT%H%M%S'),
+            )
+            config.database.database = clone
+            await self.db.query(
+                f'DEFINE DATABASE IF NOT EXISTS {escape_ident(clone)};'
+            )
+
+        rehearsal = MigrationsManager(config)
+        try:
+            async with rehearsal:
+                log.info(
+                    f'Cloning database into {config.database.url} '
+                    f'{config.database.namespace!r} '
+                    f'{config.database.database!r} ...'
+                )
+                start = monotonic()
+                counts = await clone_database(
+                    self.db, rehearsal.db,
+                    chunk_size=self.config.loader.batch_size,
+                )
+                log.info(
+                    f'Cloned {sum(counts.values())} records of '
+                    f'{len(counts)} tables in {monotonic() - start:.2f}s'
+                )
+
+                start = monotonic()
+                await rehearsal.do_migrate(to_datetime=to_datetime)
+                total = monotonic() - start
+
+        finally:
+            if clone is not None:
+                log.info(f'Removing rehearsal database {clone!r} ...')
+                await self.db.query(
+                    f'REMOVE DATABASE IF EXISTS {escape_ident(clone)};'
+                )
+
+        if self.reporter is not None:
+            for migration, duration in rehearsal.durations.items():
+                self._report('rehearsed', name=migration, duration=duration)
+
+        elif rehearsal.durations and log.isEnabledFor(INFO):
+            table = tabulate(
+                [
+                    [migration, f'{duration:.2f}']
+                    for migration, duration in rehearsal.durations.items()
+                ],
+                headers=['Migration', 'Duration (s)'],
+                tablefmt='rounded_outline',
+            )
+            log.info(
+                f'Rehearsal applied {len(rehearsal.durations)} migrations '
+                f'in {total:.2f}s:\n{table}'
+            )
+
+        return rehearsal.durations
+
+    async def do_render(self, path, to_datetime=None):
+        """
+        Render all relevant migrations as a SurrealQL script, without
+        applying them.
+
+        Each pending migration is run against a recording session that
+        captures its statements and their parameters instead of sending them.
+        The script defines the metastore tables, and records each migration
+        in the metastore in the same transaction as its statements.
+
+        Reads of the recording session return no results, so migrations whose
+        statements depend on the data they read cannot be rendered
+        faithfully.
+
+        :param Path path: Path of the script to write.
+        :param datetime to_datetime: Optional datetime to migrate to.
+         Migrations with a timestamp older (less) than this datetime will be
+         rendered.
+
+        :return list: A list of rendered migrations names, sorted by name
+         (older first).
+        :rtype: list[str]
+        """
+        if to_datetime is None:
+            to_datetime = datetime.now(tz=timezone.utc)
+
+        log.info(f'Rendering migration up to {to_datetime.isoformat()} ...')
+
+        _, migrations_to_render = await self._pending_migrations(
+            to_datetime,
+        )
+
+        scripts = [
+            '-- Rendered by surrealdb_migrations on '
+            f'{datetime.now(tz=timezone.utc).isoformat()}',
+            self._metastore_table_query().replace('; ', ';\n').strip(),
+        ]
+
+        for migration in migrations_to_render:
+            log.info(f'-> {migration}')
+            recorder = await self._record_migration(migration, record=True)
+
+            scripts.append(f'\n-- Migration {migration}')
+            scripts.append(recorder.render())
+
+        path = Path(path)
+        path.write_text('\n'.join(scripts) + '\n', encoding='utf-8')
         log.info(
-            f'Successfully applied {len(migrations_to_apply)} migrations'
+            f'Rendered {len(migrations_to_render)} migrations to {path}'
         )
+        for migration in migrations_to_render:
+            self._report('rendered', name=migration, path=str(path))
 
-        return migrations_to_apply
+        return migrations_to_render
 
-    async def _delete_migration(self, migration):
+    async def _delete_migration(self, migration, db=None):
         """
         Delete a record of the applied migration from the metastore table.
 
         :param str migration: The name of the migration to delete.
+        :param db: Optional database session or transaction to delete the
+         record with, instead of the main session.
 
         :return: The record of the deleted migration.
         :rtype: dict
@@ -487,7 +2048,7 @@ class MigrationsManager:
             'WHERE name = $name RETURN BEFORE;'
         )
 
-        response = await self.db.query(query, {'name': migration})
+        response = await (db or self.db).query(query, {'name': migration})
 
         record = next(iter(response))
         log.info(
@@ -495,18 +2056,142 @@ class MigrationsManager:
         )
         return record
 
-    async def do_rollback(self, to_datetime=None):
+    async def _rollback_batch(self, migrations):
+        """
+        Roll back migrations in a single transaction.
+
+        The downgrades of all the migrations and the deletion of their
+        metastore records are committed together, or not at all.
+
+        :param list migrations: Names of the migrations to roll back, newer
+         first.
+        """
+        self._check_stopping(migrations[0])
+        migration = migrations[0]
+        statements = {}
+        deadlines = {}
+        start = monotonic()
+
+        async def attempt():
+            nonlocal migration
+
+            txn = await self.db.begin_transaction()
+            try:
+                for migration in migrations:
+                    log.info(f'-> {migration}')
+                    self._event(MigrationStarted('downgrade', migration))
+                    module = self._import_module(migration)
+
+                    migration_obj = module.Migration(
+                        self.config, session=self.db, pool=self.pool,
+                        name=migration, throttle=self.throttle,
+                        retry=self.retry,
+                    )
+                    session = self._wrap_transaction(migration_obj, txn)
+
+                    # Timeouts run from the first attempt
+                    deadline = deadlines.setdefault(
+                        migration, self._deadline(migration_obj),
+                    )
+                    await self._run_with_timeout(
+                        migration, migration_obj,
+                        migration_obj.downgrade(session), deadline,
+                    )
+                    await self._delete_migration(migration, db=session)
+
+                    if isinstance(session, CoalescingSession):
+                        await session.flush()
+                    statements[migration] = session.statements
+
+                await txn.commit()
+
+            except Exception as e:
+                log.error(
+                    'Batch rollback failed, canceling transaction, no '
+                    'migration was rolled back'
+                )
+                await self._cancel_transaction(txn)
+                raise e
+
+        try:
+            retry = self._retry_policy(*(
+                self._import_module(name).Migration for name in migrations
+            ))
+            await retry.run(
+                attempt, f'rollback of batch of {len(migrations)} migrations',
+            )
+        except Exception as e:
+            log.error(
+                f'Failed to roll back migration {migration}', exc_info=True,
+            )
+            await self._record_failure(migration, 'downgrade', e)
+            raise e
+
+        duration = monotonic() - start
+        for migration in migrations:
+            await self._delete_checkpoints(migration)
+            await self._delete_jobs(migration)
+            self._event(StatementCount(
+                'downgrade', migration, statements[migration],
+            ))
+            self._event(MigrationCommitted('downgrade', migration, duration))
+
+    async def do_rollback(self, to_datetime=None, last_batch=False):
         """
         Rollback all relevant migrations.
 
         :param datetime to_datetime: Optional datetime to rollback to.
          Migrations with a timestamp greater than this datetime will be rolled
          back.
+        :param bool last_batch: Roll back the migrations of the last release
+         batch instead, all of them in a single transaction.
 
         :return list: A list of rolled back migration names, sorted in
          descending order (newer first).
         :rtype: list[str]
         """
+        return [
+            event.name
+            async for event in self.iter_rollback(
+                to_datetime=to_datetime, last_batch=last_batch,
+            )
+            if isinstance(event, MigrationCommitted)
+        ]
+
+    async def iter_rollback(self, to_datetime=None, last_batch=False):
+        """
+        Rollback all relevant migrations, yielding their progress.
+
+        :param datetime to_datetime: Optional datetime to rollback to, as in
+         :py:meth:`do_rollback`.
+        :param bool last_batch: Roll back the migrations of the last release
+         batch instead, as in :py:meth:`do_rollback`.
+
+        :return: An asynchronous iterator of
+         :py:class:`surrealdb_migrations.events.Event`, as yielded by
+         :py:meth:`iter_migrate`. The migrations of a batch are all started
+         before they are committed together.
+        :rtype: AsyncIterator[Event]
+        """
+        async def run(listener):
+            self._listener = listener
+            try:
+                await self._rollback(
+                    to_datetime=to_datetime, last_batch=last_batch,
+                )
+            finally:
+                self._listener = None
+
+        async for event in stream_events(run):
+            yield event
+
+    async def _rollback(self, to_datetime=None, last_batch=False):
+        """
+        Rollback all relevant migrations, see :py:meth:`do_rollback`.
+        """
+        if last_batch:
+            return await self._rollback_last_batch()
+
         if to_datetime is None:
             to_datetime = datetime.now(tz=timezone.utc)
 
@@ -529,34 +2214,76 @@ class MigrationsManager:
             return []
 
         log.info(f'Rolling back {len(migrations_to_rollback)} migrations ...')
+        self._event(PlanComputed('downgrade', migrations_to_rollback))
 
         for migration in migrations_to_rollback:
+            self._check_stopping(migration)
+
             try:
                 log.info(f'-> {migration}')
+                self._event(MigrationStarted('downgrade', migration))
+                start = monotonic()
                 module = self._import_module(migration)
+                attempts = 0
 
-                # Execute rollback
-                migration_obj = module.Migration(self.config)
-                txn = await self.db.begin_transaction()
-                try:
-                    await migration_obj.downgrade(txn)
-                    await txn.commit()
-                except Exception as e:
-                    log.error(
-                        'Downgrade function failed, canceling transaction '
-                        f'for migration {migration} ...'
-                    )
-                    await txn.cancel()
-                    raise e
+                async def attempt():
+                    nonlocal attempts
+                    attempts += 1
 
-                # Delete migration record from metastore
-                await self._delete_migration(migration)
+                    migration_obj = module.Migration(
+                        self.config, session=self.db, pool=self.pool,
+                        name=migration, throttle=self.throttle,
+                        retry=self.retry,
+                    )
+                    txn = await self._begin_transaction(
+                        migration_obj, self.db,
+                    )
+                    progress['attempt'] = attempts
+                    progress['statements'] = lambda: txn.statements
+                    try:
+                        await self._run_with_timeout(
+                            migration, migration_obj,
+                            migration_obj.downgrade(txn), deadline,
+                        )
+
+                        # Delete migration record from metastore, in the
+                        # rollback transaction
+                        await self._delete_migration(migration, db=txn)
+
+                        await txn.commit()
+                    except Exception as e:
+                        log.error(
+                            'Downgrade function failed, canceling transaction '
+                            f'for migration {migration} ...'
+                        )
+                        await self._cancel_transaction(txn)
+                        raise e
+
+                    self._event(StatementCount(
+                        'downgrade', migration, txn.statements,
+                    ))
+
+                # Execute rollback, retrying on transient errors if the
+                # migration opted in, all attempts within its timeout
+                progress = {}
+                deadline = self._deadline(module.Migration)
+                retry = self._retry_policy(module.Migration)
+                async with self._track(migration, 'downgrade', progress):
+                    await retry.run(attempt, f'rollback of {migration}')
+
+                await self._delete_checkpoints(migration)
+                await self._delete_jobs(migration)
+                self._event(MigrationCommitted(
+                    'downgrade', migration, monotonic() - start,
+                    retries=attempts - 1,
+                ))
 
             except Exception as e:
                 log.error(
                     f'Failed to roll back migration {migration}',
                     exc_info=True,
                 )
+                await self._record_failure(migration, 'downgrade', e)
 
                 raise e
 
@@ -567,6 +2294,245 @@ class MigrationsManager:
 
         return migrations_to_rollback
 
+    async def _rollback_last_batch(self):
+        """
+        Roll back the migrations of the last release batch in a single
+        transaction.
+
+        :return list: A list of rolled back migration names, sorted in
+         descending order (newer first).
+        :rtype: list[str]
+
+        :raises RuntimeError: If the last applied migration was not recorded
+         with a batch.
+        """
+        migrations_applied = await self._list_db_migrations()
+
+        if not migrations_applied:
+            log.info('No migrations to rollback')
+            return []
+
+        batch = migrations_applied[0]['batch']
+        if batch is None:
+            raise RuntimeError(
+                f'Migration {migrations_applied[0]["name"]} was applied '
+                'without a batch, use a datetime to roll it back'
+            )
+
+        migrations_to_rollback = sorted(
+            (
+                migration['name']
+                for migration in migrations_applied
+                if migration['batch'] == batch
+            ),
+            reverse=True,
+        )
+
+        log.info(
+            f'Rolling back batch {batch} of {len(migrations_to_rollback)} '
+            'migrations in a single transaction ...'
+        )
+        self._event(PlanComputed(
+            'downgrade', migrations_to_rollback, batch=batch,
+        ))
+        await self._rollback_batch(migrations_to_rollback)
+
+        log.info(
+            f'Successfully rolled back {len(migrations_to_rollback)} '
+            'migrations'
+        )
+
+        return migrations_to_rollback
+
+    async def _run_job(self, job, worker):
+        """
+        Run a leased job, renewing its lease until it finishes.
+
+        :param dict job: The leased job.
+        :param str worker: Identifier of the worker.
+
+        :return: The number of records processed.
+        :rtype: int
+
+        :raises RuntimeError: If the lease was lost while running the job.
+        """
+        migration = job['migration']
+        lease = self.config.jobs.lease
+
+        async with self.pool.acquire() as session:
+            transform = job['transform']
+            if 'method' in transform:
+                module = self._import_module(migration)
+                migration_obj = module.Migration(
+                    self.config, session=session, pool=self.pool,
+                    name=migration, throttle=self.throttle, retry=self.retry,
+                )
+                transform = getattr(migration_obj, transform['method'])
+            else:
+                transform = transform['set']
+
+            work = create_task(backfill(
+                session, job['table'], transform, job['chunk_size'],
+                checkpoints_table(self.config), migration,
+                f'job:{job["key"]}#{job["index"]}',
+                start=job['start'], end=job['end'],
+                throttle=self.throttle, retry=self.retry,
+            ))
+
+            lost = False
+
+            # Renew the lease while the job runs, and stop it if the lease
+            # was lost, or could not be renewed before it expires, as another
+            # worker may lease the job again
+            async def heartbeat():
+                nonlocal lost
+                renewed = monotonic()
+                while True:
+                    await sleep(lease / 3)
+                    started = monotonic()
+                    try:
+                        if not await renew_lease(self.db, job, worker, lease):
+                            break
+                        renewed = started
+                    except Exception as e:
+                        log.warning(
+                            f'Unable to renew the lease of job {job["id"]}: '
+                            f'{e}'
+                        )
+                        if monotonic() + lease / 3 >= renewed + lease:
+                            break
+                lost = True
+                work.cancel()
+
+            heartbeats = create_task(heartbeat())
+            try:
+                return await work
+            except CancelledError as e:
+                if lost:
+                    raise RuntimeError(
+                        f'Lost the lease of job {job["id"]}'
+                    ) from e
+                raise e
+            finally:
+                heartbeats.cancel()
+                with suppress(CancelledError):
+                    await heartbeats
+
+    async def _complete_migration(self, migration):
+        """
+        Mark a migration as completed if all its deferred jobs are done.
+
+        :param str migration: The name of the migration.
+
+        :return: True if the migration was completed.
+        :rtype: bool
+        """
+        jobs = jobs_table(self.config)
+        result = await self.db.query(
+            f'SELECT count() AS count FROM {jobs} '
+            'WHERE migration = $name AND status != "done" GROUP ALL;',
+            {'name': migration},
+        )
+        if next(iter(result or []), {}).get('count', 0):
+            return False
+
+        await self.db.query(
+            f'UPDATE {self.config.migrations.metastore} '
+            'SET completed_date = time::now() '
+            'WHERE name = $name AND completed_date = NONE;',
+            {'name': migration},
+        )
+        await self._delete_checkpoints(migration)
+        log.info(f'All jobs of migration {migration} are done')
+        return True
+
+    async def do_worker(self, drain=False):
+        """
+        Process the deferred jobs enqueued by the applied migrations.
+
+        Workers can run on many nodes. Each one leases a job at a time, renews
+        its lease while processing it, and records its outcome. Failed jobs
+        are retried, by any worker, until they reach the maximum number of
+        attempts. Jobs whose worker stopped renewing their lease are leased
+        again once it expires, and resume from their last checkpoint. When all
+        the jobs of a migration are done, the migration is marked as
+        completed.
+
+        Workers stop before leasing another job once :py:meth:`stop` is
+        called.
+
+        :param bool drain: Return once no job is available, instead of
+         waiting for new jobs.
+
+        :return: The number of jobs processed by this worker.
+        :rtype: int
+        """
+        config = self.config.jobs
+        jobs = jobs_table(self.config)
+        worker = f'{gethostname()}:{getpid()}'
+        processed = 0
+
+        await self._create_metastore_table()
+        log.info(f'Worker {worker} waiting for jobs ...')
+
+        while not self.stopping:
+            job = await lease_job(
+                self.db, jobs, worker, config.lease, config.max_attempts,
+            )
+
+            if job is None:
+                if drain:
+                    log.info(
+                        f'No jobs available, worker {worker} processed '
+                        f'{processed} jobs'
+                    )
+                    return processed
+                await sleep(config.poll_interval)
+                continue
+
+            log.info(
+                f'Running job {job["key"]!r} #{job["index"]} of '
+                f'{job["migration"]} (attempt {job["attempts"]}) ...'
+            )
+            error = None
+            records = None
+            try:
+                records = await self._run_job(job, worker)
+                log.info(
+                    f'Job {job["key"]!r} #{job["index"]} of '
+                    f'{job["migration"]} done ({records} records)'
+                )
+            except Exception as e:
+                log.error(
+                    f'Job {job["key"]!r} #{job["index"]} of '
+                    f'{job["migration"]} failed',
+                    exc_info=True,
+                )
+                error = e
+
+            status = await finish_job(
+                self.db, job, worker,
+                error=error, max_attempts=config.max_attempts,
+            )
+            processed += 1
+            self._report(
+                'job', migration=job['migration'], key=job['key'],
+                index=job['index'], attempts=job['attempts'], status=status,
+                records=records, error=None if error is None else str(error),
+            )
+
+            if status == 'done':
+                await self._complete_migration(job['migration'])
+            elif status == 'failed':
+                log.error(
+                    f'Job {job["key"]!r} #{job["index"]} of '
+                    f'{job["migration"]} failed {job["attempts"]} times, '
+                    'giving up'
+                )
+
+        log.info(f'Worker {worker} stopped after {processed} jobs')
+        return processed
+
 
 __all__ = [
     'MigrationsManager',
@@ -0,0 +1,77 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to report the results of the commands in a machine-readable format.
+"""
+
+from sys import stdout
+from json import dumps
+from logging import getLogger
+from datetime import datetime, timezone
+
+
+log = getLogger(__name__)
+
+
+OUTPUTS = ('text', 'json')
+
+
+def _default(value):
+    """
+    Serialize values that are not JSON types.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class JsonReporter:
+    """
+    Reporter writing results as newline delimited JSON events.
+
+    Each event is written, and flushed, as soon as it is reported, with its
+    ``event`` type, its ``time`` and its fields. Values that are not JSON
+    types are written as strings, in ISO 8601 format for datetimes.
+
+    :param stream: Text stream to write the events to, by default the
+     standard output. Logs are written to the standard error, so they do not
+     mix with the events.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or stdout
+
+    def emit(self, event, **fields):
+        """
+        Write an event.
+
+        :param str event: The event type, for example ``applied``.
+        :param fields: The fields of the event.
+        """
+        self.stream.write(dumps(
+            {
+                'event': event,
+                'time': datetime.now(tz=timezone.utc).isoformat(),
+                **fields,
+            },
+            default=_default,
+        ) + '\n')
+        self.stream.flush()
+
+
+__all__ = [
+    'OUTPUTS',
+    'JsonReporter',
+]
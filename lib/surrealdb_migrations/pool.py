@@ -0,0 +1,99 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module for pooling database sessions over a single connection.
+"""
+
+from asyncio import Semaphore
+from logging import getLogger
+from contextlib import asynccontextmanager
+
+
+log = getLogger(__name__)
+
+
+class SessionPool:
+    """
+    Bounded pool of database sessions.
+
+    Sessions are created lazily using the given factory, up to the pool size,
+    and reused once released. All sessions share the same underlying
+    connection, but each one has its own authentication, namespace, database
+    and transaction state, so they can be used concurrently.
+
+    :param factory: Coroutine function that creates a new session, already
+     signed in and using the right namespace and database.
+    :param int size: Maximum number of sessions in the pool.
+    """
+
+    def __init__(self, factory, size):
+        if size < 1:
+            raise ValueError(f'Invalid session pool size {size}')
+
+        self._factory = factory
+        self._size = size
+        self._semaphore = Semaphore(size)
+        self._idle = []
+        self._sessions = []
+
+    @property
+    def size(self):
+        """
+        Maximum number of sessions in the pool.
+        """
+        return self._size
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Acquire a session from the pool, waiting for one to be released if
+        the pool is exhausted.
+
+        ::
+
+            async with pool.acquire() as session:
+                await session.query('...')
+        """
+        async with self._semaphore:
+            if self._idle:
+                session = self._idle.pop()
+            else:
+                log.debug(
+                    f'Creating pooled session {len(self._sessions) + 1} '
+                    f'of {self._size} ...'
+                )
+                session = await self._factory()
+                self._sessions.append(session)
+
+            try:
+                yield session
+            finally:
+                self._idle.append(session)
+
+    async def close(self):
+        """
+        Close all the sessions created by this pool.
+        """
+        for session in self._sessions:
+            await session.close_session()
+
+        log.debug(f'Closed {len(self._sessions)} pooled sessions')
+        self._sessions.clear()
+        self._idle.clear()
+
+
+__all__ = [
+    'SessionPool',
+]
@@ -0,0 +1,129 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to clone a database to rehearse migrations on it.
+"""
+
+from logging import getLogger
+from urllib.parse import urlparse
+
+from .surql import escape_ident
+
+
+log = getLogger(__name__)
+
+
+EMBEDDED_SCHEMES = {'mem', 'memory', 'file', 'surrealkv', 'rocksdb'}
+
+
+def is_embedded(url):
+    """
+    Check if a database URL points to an embedded engine.
+
+    Embedded engines run in the process, and do not require to sign in.
+
+    :param str url: The database URL.
+
+    :return: True if the URL uses an embedded engine scheme.
+    :rtype: bool
+    """
+    return urlparse(url).scheme in EMBEDDED_SCHEMES
+
+
+async def _copy_records(source, target, table, relation, chunk_size):
+    """
+    Copy the records of a table, in chunks ordered by record id.
+
+    :return: The number of records copied.
+    :rtype: int
+    """
+    insert = 'INSERT RELATION INTO' if relation else 'INSERT INTO'
+    cursor = None
+    copied = 0
+
+    while True:
+        where = '' if cursor is None else ' WHERE id > $cursor'
+        records = await source.query(
+            f'SELECT * FROM {table}{where} ORDER BY id LIMIT $limit;',
+            {'cursor': cursor, 'limit': chunk_size},
+        )
+        if not records:
+            return copied
+
+        await target.query(f'{insert} {table} $records;', {'records': records})
+        copied += len(records)
+        cursor = records[-1]['id']
+
+
+async def clone_database(source, target, chunk_size=1000):
+    """
+    Copy the definitions and records of a database into another one.
+
+    Analyzers, functions, params and tables are defined first, along with the
+    fields of the tables. Records are copied next, and the indexes and events
+    of the tables are defined last, so events do not fire on copied records
+    and each index is built once. Records of view tables are not copied, as
+    they are computed by the database.
+
+    :param source: The database session to clone.
+    :param target: The database session to clone into.
+    :param int chunk_size: Number of records copied per request.
+
+    :return: A mapping of table name to number of records copied.
+    :rtype: dict
+    """
+    info = await source.query('INFO FOR DB;') or {}
+
+    for kind in ('analyzers', 'functions', 'params'):
+        for definition in (info.get(kind) or {}).values():
+            await target.query(definition)
+
+    tables = info.get('tables') or {}
+    definitions = {}
+
+    for name, definition in tables.items():
+        table = escape_ident(name)
+        definitions[name] = await source.query(
+            f'INFO FOR TABLE {table};'
+        ) or {}
+
+        await target.query(definition)
+        for field in (definitions[name].get('fields') or {}).values():
+            await target.query(field)
+
+    counts = {}
+    for name, definition in tables.items():
+        if ' AS SELECT ' in definition.upper():
+            continue
+
+        log.info(f'Copying records of table {name!r} ...')
+        counts[name] = await _copy_records(
+            source, target, escape_ident(name),
+            relation='TYPE RELATION' in definition.upper(),
+            chunk_size=chunk_size,
+        )
+
+    for name in tables:
+        for kind in ('indexes', 'events'):
+            for definition in (definitions[name].get(kind) or {}).values():
+                await target.query(definition)
+
+    return counts
+
+
+__all__ = [
+    'is_embedded',
+    'clone_database',
+]
@@ -0,0 +1,186 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to retry transactions that failed with transient errors, and to
+detect lost database connections.
+"""
+
+from random import uniform
+from asyncio import sleep
+from time import monotonic
+from logging import getLogger
+
+from surrealdb import (
+    QueryError, ServerError, ConnectionUnavailableError, TransportTimeoutError,
+)
+
+
+log = getLogger(__name__)
+
+
+def is_retryable(error):
+    """
+    Check if an error is transient, and the failed operation can be retried.
+
+    Transaction conflicts, raised when concurrent transactions modified the
+    same records, are transient. Errors raised from a transient error, like
+    the ones of deferred statements, are transient too.
+
+    :param Exception error: The error.
+
+    :return: True if the error is transient.
+    :rtype: bool
+    """
+    while error is not None:
+        if isinstance(error, QueryError) and error.is_transaction_conflict:
+            return True
+
+        # Servers that do not send structured error details
+        if isinstance(error, ServerError) and 'conflict' in str(error).lower():
+            return True
+
+        error = error.__cause__
+
+    return False
+
+
+def is_connection_lost(error):
+    """
+    Check if an error was caused by the loss of the database connection.
+
+    :param Exception error: The error.
+
+    :return: True if the connection was closed, dropped or timed out.
+    :rtype: bool
+    """
+    while error is not None:
+        if isinstance(error, (
+            ConnectionUnavailableError, TransportTimeoutError, ConnectionError,
+        )):
+            return True
+
+        error = error.__cause__
+
+    return False
+
+
+class RetryPolicy:
+    """
+    Retry policy for operations failing with transient errors.
+
+    Failed attempts are retried after an exponential backoff with full
+    jitter: a random delay between zero and ``base_delay`` doubled on every
+    further attempt, bounded by ``max_delay``. Operations are retried until
+    they succeed, fail with a non transient error, reach ``max_attempts``, or
+    the next attempt would start after ``budget`` seconds since the first one.
+
+    :param int max_attempts: Maximum number of attempts, including the first
+     one.
+    :param float base_delay: Maximum delay before the first retry, in seconds.
+    :param float max_delay: Maximum delay before any retry, in seconds.
+    :param float budget: Maximum number of seconds spent retrying an
+     operation, or 0 for no limit.
+    """
+
+    def __init__(
+        self, max_attempts=3,
+        base_delay=0.5,
+        max_delay=30.0,
+        budget=300.0,
+    ):
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create a retry policy from the ``retry`` configuration.
+
+        :param Namespace config: runtime configuration.
+
+        :return: The retry policy.
+        :rtype: RetryPolicy
+        """
+        retry = config.retry
+        return cls(
+            max_attempts=retry.max_attempts,
+            base_delay=retry.base_delay,
+            max_delay=retry.max_delay,
+            budget=retry.budget,
+        )
+
+    def delay(self, attempt):
+        """
+        Compute the delay before retrying a failed attempt.
+
+        :param int attempt: Number of the failed attempt, starting at 1.
+
+        :return: The delay, in seconds.
+        :rtype: float
+        """
+        return uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)),
+        )
+
+    async def run(self, operation, description='operation'):
+        """
+        Run an operation, retrying it on transient errors.
+
+        :param operation: Coroutine function, without arguments, running one
+         attempt of the operation. It must be safe to call again after a
+         transient error, for example by running a new transaction.
+        :param str description: Description of the operation, for logging.
+
+        :return: A tuple with the result of the operation and the number of
+         retries.
+        :rtype: tuple
+
+        :raises Exception: The error of the last attempt.
+        """
+        start = monotonic()
+        attempt = 1
+
+        while True:
+            try:
+                return await operation(), attempt - 1
+
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_attempts:
+                    raise e
+
+                delay = self.delay(attempt)
+                elapsed = monotonic() - start
+                if self.budget and elapsed + delay > self.budget:
+                    log.error(
+                        f'Retry budget of {self.budget}s exhausted for '
+                        f'{description}'
+                    )
+                    raise e
+
+                log.warning(
+                    f'Attempt {attempt} of {description} failed with a '
+                    f'transient error ({e}), retrying in {delay:.2f}s ...'
+                )
+                await sleep(delay)
+                attempt += 1
+
+
+__all__ = [
+    'is_retryable',
+    'is_connection_lost',
+    'RetryPolicy',
+]
@@ -0,0 +1,135 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module with the records of the migrations in progress.
+
+While a migration is applied or rolled back, a running record in the
+metastore tells which host and process runs it, since when, and its progress.
+The record is updated by a heartbeat, and deleted once the migration is
+committed or cancelled. Records whose heartbeat expired belong to runs that
+were killed or hung.
+"""
+
+from logging import getLogger
+from datetime import datetime, timedelta, timezone
+
+from surrealdb import RecordID
+
+
+log = getLogger(__name__)
+
+
+def running_table(config):
+    """
+    Name of the table that stores the migrations in progress.
+
+    :param Namespace config: runtime configuration.
+
+    :return: The name of the running table.
+    :rtype: str
+    """
+    return f'{config.migrations.metastore}_running'
+
+
+def _now():
+    return datetime.now(tz=timezone.utc)
+
+
+async def start_running(db, running, migration, operation, host, pid):
+    """
+    Create the running record of a migration.
+
+    :param db: The database session, outside of the migration transaction.
+    :param str running: Name of the running table.
+    :param str migration: Name of the migration.
+    :param str operation: The operation, ``upgrade`` or ``downgrade``.
+    :param str host: Name of the host running the migration.
+    :param int pid: Identifier of the process running the migration.
+
+    :return: The id of the running record.
+    :rtype: RecordID
+    """
+    record_id = RecordID(running, [migration, host, pid])
+    now = _now()
+
+    await db.query(
+        'UPSERT $id CONTENT $record;',
+        {
+            'id': record_id,
+            'record': {
+                'migration': migration,
+                'operation': operation,
+                'host': host,
+                'pid': pid,
+                'started_at': now,
+                'last_heartbeat': now,
+                'progress': {},
+            },
+        },
+    )
+    return record_id
+
+
+async def heartbeat(db, record_id, progress):
+    """
+    Update the heartbeat and progress of a running record.
+
+    :param db: The database session, outside of the migration transaction.
+    :param RecordID record_id: The id of the running record.
+    :param dict progress: The progress counters of the migration.
+    """
+    await db.query(
+        'UPDATE $id SET last_heartbeat = $now, progress = $progress;',
+        {'id': record_id, 'now': _now(), 'progress': progress},
+    )
+
+
+async def clear_running(db, record_id):
+    """
+    Delete a running record.
+
+    :param db: The database session, outside of the migration transaction.
+    :param RecordID record_id: The id of the running record.
+    """
+    await db.query('DELETE $id;', {'id': record_id})
+
+
+async def list_running(db, running, timeout):
+    """
+    List the migrations in progress.
+
+    :param db: The database session.
+    :param str running: Name of the running table.
+    :param float timeout: Number of seconds after the last heartbeat after
+     which a run is considered stale.
+
+    :return: The running records, oldest first, with a ``stale`` flag.
+    :rtype: list[dict]
+    """
+    result = await db.query(
+        f'SELECT *, last_heartbeat < $expired AS stale FROM {running} '
+        'ORDER BY started_at;',
+        {'expired': _now() - timedelta(seconds=timeout)},
+    )
+    return list(result or [])
+
+
+__all__ = [
+    'running_table',
+    'start_running',
+    'heartbeat',
+    'clear_running',
+    'list_running',
+]
@@ -0,0 +1,222 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to schedule migrations as a dependency graph.
+
+Every migration depends on all the older migrations, unless both declare the
+tables they ``touches`` and those sets do not overlap. Explicit dependencies
+can be added with ``depends_on``. Migrations whose dependencies are satisfied
+can then be applied concurrently.
+
+Migrations can also be split in deploy ``phase``, ``expand`` migrations being
+applied before rolling out a new version of the application and ``contract``
+migrations after all its replicas are updated.
+"""
+
+from logging import getLogger
+from asyncio import wait, create_task, FIRST_COMPLETED
+
+
+log = getLogger(__name__)
+
+
+PHASES = ('expand', 'contract')
+
+
+def _resolve(reference, names):
+    """
+    Resolve a dependency reference to a migration file name.
+
+    :param str reference: A migration file name, with or without the ``.py``
+     suffix.
+    :param list names: All known migration file names.
+
+    :return: The migration file name or None if not found.
+    :rtype: str
+    """
+    for candidate in (reference, f'{reference}.py'):
+        if candidate in names:
+            return candidate
+    return None
+
+
+def build_graph(migrations, known=()):
+    """
+    Build the dependency graph of the given migrations.
+
+    :param list migrations: A list of ``(name, migration_class)`` tuples
+     sorted by name (older first).
+    :param known: Names of all the migrations known to exist, applied or not.
+     Dependencies to known migrations outside the graph are considered
+     already satisfied.
+
+    :return: A mapping of migration name to the set of names it depends on.
+    :rtype: dict[str, set[str]]
+    """
+    names = [name for name, _ in migrations]
+    known = set(known) | set(names)
+    graph = {}
+
+    for index, (name, cls) in enumerate(migrations):
+        dependencies = set()
+
+        # Explicit dependencies
+        for reference in getattr(cls, 'depends_on', None) or ():
+            dependency = _resolve(reference, known)
+            if dependency is None:
+                raise RuntimeError(
+                    f'Migration {name} depends on unknown migration '
+                    f'{reference!r}'
+                )
+            if dependency >= name:
+                raise RuntimeError(
+                    f'Migration {name} cannot depend on newer migration '
+                    f'{dependency}'
+                )
+            if dependency in graph:
+                dependencies.add(dependency)
+
+        # Implicit dependencies, migrations that do not declare the tables
+        # they touch are barriers
+        touches = getattr(cls, 'touches', None)
+        for previous, previous_cls in migrations[:index]:
+            previous_touches = getattr(previous_cls, 'touches', None)
+            if (
+                touches is None
+                or previous_touches is None
+                or set(touches) & set(previous_touches)
+            ):
+                dependencies.add(previous)
+
+        graph[name] = dependencies
+
+    return graph
+
+
+def select_phase(migrations, phase, known=()):
+    """
+    Select the migrations of a deploy phase.
+
+    :param list migrations: A list of ``(name, migration_class)`` tuples of
+     all the pending migrations, sorted by name (older first).
+    :param str phase: The deploy phase to select.
+    :param known: Names of all the migrations known to exist, applied or not.
+
+    :return: The ``(name, migration_class)`` tuples of the phase.
+    :rtype: list[tuple]
+
+    :raises RuntimeError: If a migration declares an unknown phase, or a
+     selected migration depends on a pending migration of another phase.
+    """
+    if phase not in PHASES:
+        raise RuntimeError(f'Unknown phase {phase!r}')
+
+    for name, cls in migrations:
+        if getattr(cls, 'phase', 'expand') not in PHASES:
+            raise RuntimeError(
+                f'Migration {name} declares unknown phase {cls.phase!r}'
+            )
+
+    selected = [
+        (name, cls) for name, cls in migrations
+        if getattr(cls, 'phase', 'expand') == phase
+    ]
+    names = set(name for name, _ in selected)
+    pending = set(name for name, _ in migrations)
+    known = set(known) | pending
+
+    for name, cls in selected:
+        for reference in getattr(cls, 'depends_on', None) or ():
+            dependency = _resolve(reference, known)
+            if dependency in pending and dependency not in names:
+                raise RuntimeError(
+                    f'Migration {name} of phase {phase!r} depends on '
+                    f'pending migration {dependency} of another phase'
+                )
+
+    return selected
+
+
+async def run_graph(graph, worker, concurrency=1):
+    """
+    Execute all the nodes of a dependency graph.
+
+    Nodes are started in name order as soon as all their dependencies are
+    completed, with at most ``concurrency`` nodes running at the same time.
+    On failure no new nodes are started, running nodes are awaited and the
+    first error is raised.
+
+    :param dict graph: Mapping of node name to the set of names it depends
+     on, as returned by :py:func:`build_graph`.
+    :param worker: Coroutine function called with the name of the node to
+     execute.
+    :param int concurrency: Maximum number of nodes running concurrently.
+
+    :return: The names of the executed nodes, in completion order.
+    :rtype: list[str]
+    """
+    pending = {name: set(dependencies) for name, dependencies in graph.items()}
+    running = {}
+    completed = []
+    error = None
+
+    while pending or running:
+
+        # Start all nodes that are ready, up to the concurrency limit
+        if error is None:
+            ready = sorted(
+                name for name, dependencies in pending.items()
+                if not dependencies
+            )
+            for name in ready[:max(concurrency - len(running), 0)]:
+                del pending[name]
+                log.debug(f'Scheduling {name} ...')
+                running[create_task(worker(name))] = name
+
+        if not running:
+            if error is None and pending:
+                raise RuntimeError(
+                    'Dependency cycle detected between migrations '
+                    f'{sorted(pending)}'
+                )
+            break
+
+        done, _ = await wait(running, return_when=FIRST_COMPLETED)
+
+        for task in sorted(done, key=running.get):
+            name = running.pop(task)
+            exception = task.exception()
+
+            if exception is not None:
+                if error is None:
+                    error = exception
+                continue
+
+            completed.append(name)
+            for dependencies in pending.values():
+                dependencies.discard(name)
+
+    if error is not None:
+        raise error
+
+    return completed
+
+
+__all__ = [
+    'PHASES',
+    'build_graph',
+    'select_phase',
+    'run_graph',
+]
@@ -0,0 +1,336 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module with database session wrappers used to run migrations.
+"""
+
+from re import compile, IGNORECASE
+from logging import getLogger
+from contextlib import asynccontextmanager
+
+from surrealdb.errors import parse_query_error
+
+from .surql import to_surql, split_statements, add_timeout
+
+
+log = getLogger(__name__)
+
+
+DEFERRABLE = {
+    'ALTER', 'CREATE', 'DEFINE', 'DELETE', 'INSERT', 'REBUILD', 'RELATE',
+    'REMOVE', 'UPDATE', 'UPSERT',
+}
+READ_ONLY = {'INFO', 'SELECT', 'SHOW'}
+RETURN_CLAUSE = compile(r'\bRETURN\s+(?!NONE\b)', IGNORECASE)
+
+
+class RecordedStatement:
+    """
+    A query captured by a :py:class:`RecordingSession`.
+
+    :param str query: The SurrealQL query.
+    :param dict vars: The parameters bound to the query.
+    :param bool transaction: Whether the query was sent in a transaction.
+    """
+
+    def __init__(self, query, vars, transaction):
+        self.query = query
+        self.vars = dict(vars or {})
+        self.transaction = transaction
+
+    def render(self):
+        """
+        Render the query as a script, with its parameters defined using
+        ``LET`` statements.
+
+        :return: The SurrealQL script.
+        :rtype: str
+        """
+        lines = [
+            f'LET ${name} = {to_surql(value)};'
+            for name, value in self.vars.items()
+        ]
+        query = self.query.strip()
+        if not query.endswith(';'):
+            query = f'{query};'
+        lines.append(query)
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return (
+            f'{type(self).__name__}({self.query!r}, {self.vars!r}, '
+            f'transaction={self.transaction!r})'
+        )
+
+
+class RecordingSession:
+    """
+    Database session that captures queries instead of sending them.
+
+    Queries return no results, so migrations are rendered as if all their
+    reads returned nothing. Queries only made of read-only statements, like
+    ``SELECT`` or ``INFO``, are not captured, so polls do not end up in the
+    rendered script. Transactions begun on this session record their
+    queries in the same list, flagged as transactional.
+
+    :param list statements: Optional list to append the captured statements
+     to.
+    """
+
+    def __init__(self, statements=None):
+        self.statements = [] if statements is None else statements
+        self._transaction = False
+
+    async def query(self, query, vars=None):
+        if all(
+            statement.split(None, 1)[0].upper() in READ_ONLY
+            for statement in split_statements(query)
+        ):
+            return []
+        self.statements.append(
+            RecordedStatement(query, vars, self._transaction)
+        )
+        return []
+
+    async def begin_transaction(self):
+        transaction = RecordingSession(self.statements)
+        transaction._transaction = True
+        return transaction
+
+    async def commit(self):
+        pass
+
+    async def cancel(self):
+        pass
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Use this session as a pool of sessions.
+        """
+        yield self
+
+    def render(self):
+        """
+        Render all captured statements as a script.
+
+        Consecutive transactional statements are wrapped in a ``BEGIN`` and
+        ``COMMIT`` block.
+
+        :return: The SurrealQL script.
+        :rtype: str
+        """
+        lines = []
+        transaction = False
+
+        for statement in self.statements:
+            if statement.transaction != transaction:
+                lines.append(
+                    'BEGIN TRANSACTION;' if statement.transaction
+                    else 'COMMIT TRANSACTION;'
+                )
+                transaction = statement.transaction
+            lines.append(statement.render())
+
+        if transaction:
+            lines.append('COMMIT TRANSACTION;')
+
+        return '\n'.join(lines)
+
+
+class CountingSession:
+    """
+    Database session wrapper that counts the statements sent.
+
+    :param session: The database session or transaction to wrap.
+    """
+
+    def __init__(self, session):
+        self._session = session
+        self.statements = 0
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def query(self, query, vars=None):
+        self.statements += len(split_statements(query))
+        return await self._session.query(query, vars)
+
+    async def query_raw(self, query, vars=None):
+        self.statements += len(split_statements(query))
+        return await self._session.query_raw(query, vars)
+
+
+class TimeoutSession:
+    """
+    Database session wrapper that bounds the duration of every statement.
+
+    A ``TIMEOUT`` clause is added to the statements that support it and do
+    not have one, so the database stops them once the timeout expires.
+
+    :param session: The database session or transaction to wrap.
+    :param float timeout: Maximum number of seconds per statement.
+    """
+
+    def __init__(self, session, timeout):
+        self._session = session
+        self.timeout = timeout
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def query(self, query, vars=None):
+        return await self._session.query(
+            add_timeout(query, self.timeout), vars,
+        )
+
+    async def query_raw(self, query, vars=None):
+        return await self._session.query_raw(
+            add_timeout(query, self.timeout), vars,
+        )
+
+
+class CoalescingSession:
+    """
+    Database session wrapper that sends consecutive writes in a single
+    request.
+
+    Queries made only of write statements (``CREATE``, ``UPDATE``,
+    ``DEFINE``, ``REMOVE``, etc.) without a ``RETURN`` clause are deferred:
+    they return ``None`` and are buffered. Buffered statements are sent as one
+    multi-statement request before the next query that is not deferred, on
+    :py:meth:`flush`, or on :py:meth:`commit`. Writes that need their results
+    can ask for them with a ``RETURN`` clause.
+
+    Statements of the buffered queries share the parameters of the request, so
+    a query binding a parameter already bound to a different value flushes the
+    buffer first.
+
+    If a buffered statement fails, a :py:exc:`RuntimeError` is raised with
+    the originating statement, from the error reported by the database.
+
+    :param session: The database session or transaction to wrap.
+    """
+
+    def __init__(self, session):
+        self._session = session
+        self._statements = []
+        self._vars = {}
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def _deferrable(self, statements):
+        """
+        Check if the given statements can be deferred.
+        """
+        return bool(statements) and all(
+            statement.split(None, 1)[0].upper() in DEFERRABLE
+            and not RETURN_CLAUSE.search(statement)
+            for statement in statements
+        )
+
+    def _conflicts(self, vars):
+        """
+        Check if the given parameters conflict with the buffered ones.
+        """
+        for name, value in vars.items():
+            if name in self._vars:
+                try:
+                    if self._vars[name] != value:
+                        return True
+                except Exception:
+                    return True
+        return False
+
+    async def flush(self):
+        """
+        Send the buffered statements in a single request.
+
+        :raises RuntimeError: If any of the statements failed.
+        """
+        if not self._statements:
+            return
+
+        statements, self._statements = self._statements, []
+        vars, self._vars = self._vars, {}
+
+        log.debug(f'Sending {len(statements)} deferred statements ...')
+        response = await self._session.query_raw(
+            '\n'.join(f'{statement};' for statement in statements), vars,
+        )
+
+        results = response.get('result') or []
+        failed = [
+            (index, parse_query_error(result))
+            for index, result in enumerate(results)
+            if result.get('status') == 'ERR'
+        ]
+        if not failed:
+            return
+
+        # In a transaction, the statements after the failed one report that
+        # they were not executed, so report the one that caused the failure
+        index, error = next(
+            (
+                (index, error) for index, error in failed
+                if not getattr(error, 'is_not_executed', False)
+                and 'not executed' not in str(error)
+            ),
+            failed[0],
+        )
+        statement = (
+            statements[index] if len(results) == len(statements)
+            else '\n'.join(statements)
+        )
+        raise RuntimeError(
+            f'Deferred statement failed: {error}\n{statement}'
+        ) from error
+
+    async def query(self, query, vars=None):
+        vars = vars or {}
+        statements = split_statements(query)
+
+        if not self._deferrable(statements):
+            await self.flush()
+            return await self._session.query(query, vars)
+
+        if self._conflicts(vars):
+            await self.flush()
+
+        self._statements.extend(statements)
+        self._vars.update(vars)
+
+    async def query_raw(self, query, vars=None):
+        await self.flush()
+        return await self._session.query_raw(query, vars)
+
+    async def commit(self):
+        await self.flush()
+        await self._session.commit()
+
+    async def cancel(self):
+        self._statements = []
+        self._vars = {}
+        await self._session.cancel()
+
+
+__all__ = [
+    'RecordedStatement',
+    'RecordingSession',
+    'CountingSession',
+    'TimeoutSession',
+    'CoalescingSession',
+]
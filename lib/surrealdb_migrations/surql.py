@@ -0,0 +1,240 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module with SurrealQL text utilities.
+"""
+
+from re import compile, IGNORECASE
+from json import dumps
+from math import isinf, isnan
+from uuid import UUID
+from decimal import Decimal
+from datetime import datetime, date
+
+from surrealdb import RecordID
+
+
+IDENTIFIER = compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+QUOTES = ('"', "'", '`', '⟨')
+
+TIMEOUT_STATEMENTS = {
+    'CREATE', 'DELETE', 'RELATE', 'SELECT', 'UPDATE', 'UPSERT',
+}
+TIMEOUT_CLAUSE = compile(r'\bTIMEOUT\b', IGNORECASE)
+TRAILING_CLAUSES = compile(
+    r'(?:\s+(?:PARALLEL|TEMPFILES|EXPLAIN(?:\s+FULL)?))+\s*$', IGNORECASE,
+)
+
+
+def escape_ident(name):
+    """
+    Escape an identifier, if needed, using angle brackets.
+
+    :param str name: The identifier.
+
+    :return: The identifier, usable in a SurrealQL statement.
+    :rtype: str
+    """
+    if IDENTIFIER.match(name):
+        return name
+    return '⟨{}⟩'.format(name.replace('⟩', '\\⟩'))
+
+
+def _skip_quoted(query, position):
+    """
+    Position after the quoted string or identifier starting at a position.
+    """
+    quote = '⟩' if query[position] == '⟨' else query[position]
+    position += 1
+    while position < len(query) and query[position] != quote:
+        position += 2 if query[position] == '\\' else 1
+    return min(position + 1, len(query))
+
+
+def _mask_quoted(statement):
+    """
+    Replace the quoted strings and identifiers of a statement with spaces,
+    keeping the position of the other characters.
+    """
+    masked = []
+    start = 0
+    position = 0
+
+    while position < len(statement):
+        if statement[position] in QUOTES:
+            end = _skip_quoted(statement, position)
+            masked.append(statement[start:position])
+            masked.append(' ' * (end - position))
+            start = position = end
+            continue
+        position += 1
+
+    masked.append(statement[start:])
+    return ''.join(masked)
+
+
+def split_statements(query):
+    """
+    Split a SurrealQL query in its statements.
+
+    Semicolons inside strings, identifiers escaped with backticks or angle
+    brackets, comments and blocks are not considered statement separators.
+    Comments are removed from the statements.
+
+    :param str query: The SurrealQL query.
+
+    :return: The statements, without their terminating semicolon.
+    :rtype: list[str]
+    """
+    closing = {'{': '}', '(': ')', '[': ']'}
+    statements = []
+    current = []
+    stack = []
+    start = 0
+    position = 0
+    length = len(query)
+
+    while position < length:
+        char = query[position]
+        pair = query[position:position + 2]
+
+        # Skip comments
+        if pair in ('--', '//') or char == '#':
+            current.append(query[start:position])
+            end = query.find('\n', position)
+            position = start = length if end < 0 else end
+            continue
+        if pair == '/*':
+            current.append(query[start:position])
+            end = query.find('*/', position + 2)
+            position = start = length if end < 0 else end + 2
+            continue
+
+        # Skip quoted strings and identifiers
+        if char in QUOTES:
+            position = _skip_quoted(query, position)
+            continue
+
+        if char in closing:
+            stack.append(closing[char])
+        elif stack and char == stack[-1]:
+            stack.pop()
+        elif char == ';' and not stack:
+            current.append(query[start:position])
+            statements.append(''.join(current).strip())
+            current = []
+            start = position + 1
+
+        position += 1
+
+    current.append(query[start:])
+    statements.append(''.join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+def add_timeout(query, timeout):
+    """
+    Add a ``TIMEOUT`` clause to the statements of a query that support it.
+
+    Statements that already have a ``TIMEOUT`` clause are left unchanged.
+    Quoted strings and identifiers are ignored when looking for the clause.
+
+    :param str query: The SurrealQL query.
+    :param float timeout: The timeout, in seconds.
+
+    :return: The query with the ``TIMEOUT`` clauses.
+    :rtype: str
+    """
+    duration = f'{max(int(timeout * 1000), 1)}ms'
+    statements = []
+
+    for statement in split_statements(query):
+        keyword = statement.split(None, 1)[0].upper()
+        masked = _mask_quoted(statement)
+
+        if (
+            keyword in TIMEOUT_STATEMENTS
+            and not TIMEOUT_CLAUSE.search(masked)
+        ):
+            # The clause goes before the PARALLEL, TEMPFILES and EXPLAIN
+            # clauses, if any
+            trailing = TRAILING_CLAUSES.search(masked)
+            position = trailing.start() if trailing else len(statement)
+            statement = (
+                f'{statement[:position]} TIMEOUT {duration}'
+                f'{statement[position:]}'
+            )
+
+        statements.append(f'{statement};')
+
+    return '\n'.join(statements)
+
+
+def to_surql(value):
+    """
+    Render a Python value as a SurrealQL literal.
+
+    :param value: The value to render.
+
+    :return: The SurrealQL literal.
+    :rtype: str
+
+    :raises TypeError: If the value cannot be rendered.
+    """
+    if value is None:
+        return 'NONE'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and isnan(value):
+        return 'math::nan'
+    if isinstance(value, float) and isinf(value):
+        return 'math::inf' if value > 0 else 'math::neg_inf'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, Decimal):
+        return f'{value}dec'
+    if isinstance(value, str):
+        return dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime, date)):
+        return f'd{dumps(value.isoformat())}'
+    if isinstance(value, UUID):
+        return f'u{dumps(str(value))}'
+    if isinstance(value, RecordID):
+        key = value.id
+        if isinstance(key, str):
+            key = escape_ident(key)
+        else:
+            key = to_surql(key)
+        return f'{escape_ident(value.table_name)}:{key}'
+    if isinstance(value, dict):
+        return '{{{}}}'.format(', '.join(
+            f'{dumps(str(key))}: {to_surql(item)}'
+            for key, item in value.items()
+        ))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return '[{}]'.format(', '.join(to_surql(item) for item in value))
+
+    raise TypeError(
+        f'Cannot render value of type {type(value).__name__} as SurrealQL'
+    )
+
+
+__all__ = [
+    'escape_ident',
+    'split_statements',
+    'add_timeout',
+    'to_surql',
+]
@@ -0,0 +1,189 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to throttle data migrations running against live traffic.
+"""
+
+from time import monotonic
+from logging import getLogger
+from asyncio import Event, sleep
+from contextlib import asynccontextmanager
+
+
+log = getLogger(__name__)
+
+
+class Throttle:
+    """
+    Load-aware throttle for data migration batches.
+
+    Batch size and concurrency are adapted with AIMD (additive increase,
+    multiplicative decrease) from the latency of each batch: while batches
+    complete under the latency target, the batch size grows by a fixed step,
+    and the concurrency by one each time the batch size reaches its maximum.
+    As soon as a batch is slower than the target, both are multiplied by the
+    decrease factor.
+
+    The throttle can also limit the number of records processed per second,
+    and be paused and resumed.
+
+    :param int batch_size: Initial batch size.
+    :param float latency_target: Maximum acceptable batch latency, in seconds.
+    :param int min_batch_size: Minimum batch size.
+    :param int max_batch_size: Maximum batch size.
+    :param int increase: Batch size increase after a fast batch.
+    :param float decrease: Factor applied to the batch size and concurrency
+     after a slow batch.
+    :param int max_concurrency: Maximum number of concurrent batches.
+    :param float max_rate: Maximum number of records per second, or 0 for no
+     limit.
+    """
+
+    def __init__(
+        self, batch_size,
+        latency_target=0.5,
+        min_batch_size=10,
+        max_batch_size=10000,
+        increase=100,
+        decrease=0.5,
+        max_concurrency=4,
+        max_rate=0,
+    ):
+        self.latency_target = latency_target
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.increase = increase
+        self.decrease = decrease
+        self.max_concurrency = max_concurrency
+        self.max_rate = max_rate
+
+        self.batch_size = min(
+            max(batch_size, min_batch_size), max_batch_size,
+        )
+        self.concurrency = 1
+        self.paused = False
+
+        self._active = 0
+        self._resumed = Event()
+        self._resumed.set()
+        self._freed = Event()
+        self._next = monotonic()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create a throttle from the ``throttle`` configuration.
+
+        :param Namespace config: runtime configuration.
+
+        :return: The throttle, or None if throttling is disabled.
+        :rtype: Throttle
+        """
+        throttle = config.throttle
+        if not throttle.enabled:
+            return None
+
+        return cls(
+            throttle.batch_size,
+            latency_target=throttle.latency_target,
+            min_batch_size=throttle.min_batch_size,
+            max_batch_size=throttle.max_batch_size,
+            increase=throttle.increase,
+            decrease=throttle.decrease,
+            max_concurrency=throttle.max_concurrency,
+            max_rate=throttle.max_rate,
+        )
+
+    def record(self, latency, records):
+        """
+        Record the latency of a completed batch and adapt the batch size and
+        concurrency.
+
+        :param float latency: Duration of the batch, in seconds.
+        :param int records: Number of records processed in the batch.
+        """
+        if latency > self.latency_target:
+            self.batch_size = max(
+                int(self.batch_size * self.decrease), self.min_batch_size,
+            )
+            self.concurrency = max(int(self.concurrency * self.decrease), 1)
+            log.debug(
+                f'Batch took {latency:.3f}s, throttling down to batch size '
+                f'{self.batch_size} and concurrency {self.concurrency}'
+            )
+
+        elif self.batch_size < self.max_batch_size:
+            self.batch_size = min(
+                self.batch_size + self.increase, self.max_batch_size,
+            )
+
+        elif self.concurrency < self.max_concurrency:
+            self.concurrency += 1
+            self._freed.set()
+            log.debug(f'Throttling up to concurrency {self.concurrency}')
+
+        if self.max_rate:
+            self._next = max(self._next, monotonic()) + records / self.max_rate
+
+    def pause(self):
+        """
+        Pause the batches not started yet.
+        """
+        log.info('Pausing data migrations ...')
+        self.paused = True
+        self._resumed.clear()
+
+    def resume(self):
+        """
+        Resume paused batches.
+        """
+        log.info('Resuming data migrations ...')
+        self.paused = False
+        self._resumed.set()
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Wait until a new batch can start, according to the current
+        concurrency, rate limit and pause status.
+
+        ::
+
+            async with throttle.slot():
+                started = monotonic()
+                ...
+                throttle.record(monotonic() - started, records)
+        """
+        while self.paused or self._active >= self.concurrency:
+            if self.paused:
+                await self._resumed.wait()
+            else:
+                self._freed.clear()
+                await self._freed.wait()
+        self._active += 1
+
+        try:
+            delay = self._next - monotonic()
+            if delay > 0:
+                await sleep(delay)
+            yield
+        finally:
+            self._active -= 1
+            self._freed.set()
+
+
+__all__ = [
+    'Throttle',
+]
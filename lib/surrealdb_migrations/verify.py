@@ -0,0 +1,165 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Module to verify the data of migrations with aggregates computed by the
+database.
+"""
+
+from hashlib import sha256
+from logging import getLogger
+
+
+log = getLogger(__name__)
+
+
+CHECKSUM_CHUNK_SIZE = 1000
+"""
+Default number of records hashed together by the database when computing a
+checksum.
+"""
+
+
+async def table_stats(
+    db, table, fields=(), where=None, vars=None,
+    chunk_size=CHECKSUM_CHUNK_SIZE,
+):
+    """
+    Compute the statistics of the records of a table in the database, without
+    fetching them.
+
+    Records are counted, and so are the records where each field is ``NONE``
+    or ``NULL``. For the checksum, the database hashes the records, with only
+    their id and fields if given, in chunks of ``chunk_size`` records ordered
+    by id, so it never holds more than a chunk in memory. The checksum is the
+    SHA-256 hash of the hashes of the chunks.
+
+    :param db: The database session.
+    :param str table: The name of the table.
+    :param list fields: The fields to count the missing values of, and to
+     include in the checksum. All the fields are included in the checksum if
+     empty.
+    :param str where: Optional condition selecting the records, for example
+     ``id >= $start AND id < $end`` to verify a range.
+    :param dict vars: The parameters bound to the condition.
+    :param int chunk_size: Number of records hashed together. Checksums
+     computed with different chunk sizes differ.
+
+    :return: A dictionary with the ``count`` of records, the ``nulls`` count
+     of each field and the ``checksum``.
+    :rtype: dict
+    """
+    condition = f' WHERE {where}' if where else ''
+
+    nulls = ''.join(
+        f', count({field} = NONE OR {field} = NULL) AS nulls_{index}'
+        for index, field in enumerate(fields)
+    )
+    result = await db.query(
+        f'SELECT count() AS count{nulls} FROM {table}{condition} GROUP ALL;',
+        vars,
+    )
+    counts = next(iter(result or []), {})
+
+    projection = ', '.join(['id', *fields]) if fields else '*'
+    checksum = sha256()
+    cursor = None
+
+    while True:
+        conditions = [f'({where})'] if where else []
+        if cursor is not None:
+            conditions.append('id > $checksum_cursor')
+        chunk_condition = (
+            f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        )
+
+        # A single statement selecting from the chunk, so its result is the
+        # result of the query
+        result = await db.query(
+            'SELECT array::len(chunk) AS size, '
+            'array::last(chunk).id AS last, '
+            'crypto::sha256(<string> chunk) AS hash '
+            f'FROM [{{chunk: (SELECT {projection} FROM {table}'
+            f'{chunk_condition} ORDER BY id LIMIT $checksum_limit)}}];',
+            {
+                **(vars or {}),
+                'checksum_cursor': cursor,
+                'checksum_limit': chunk_size,
+            },
+        )
+        chunk = next(iter(result or []), {})
+        if not chunk.get('size'):
+            break
+
+        checksum.update(chunk['hash'].encode('utf-8'))
+        cursor = chunk['last']
+        if chunk['size'] < chunk_size:
+            break
+
+    stats = {
+        'count': counts.get('count', 0),
+        'nulls': {
+            field: counts.get(f'nulls_{index}', 0)
+            for index, field in enumerate(fields)
+        },
+        'checksum': checksum.hexdigest(),
+    }
+    log.debug(f'Statistics of table {table}{condition}: {stats}')
+    return stats
+
+
+def check_stats(stats, count=None, nulls=None, checksum=None, label='table'):
+    """
+    Check the statistics of a table against their expected values.
+
+    ::
+
+        check_stats(after, count=before['count'], nulls={'email': 0})
+
+    :param dict stats: The statistics, as returned by :py:func:`table_stats`.
+    :param int count: Expected number of records, not checked if None.
+    :param dict nulls: Expected number of missing values of some fields.
+    :param str checksum: Expected checksum, not checked if None.
+    :param str label: Name of the verified data, for the error message.
+
+    :raises RuntimeError: If any statistic does not have its expected value.
+    """
+    mismatches = []
+
+    if count is not None and stats['count'] != count:
+        mismatches.append(f'count is {stats["count"]}, expected {count}')
+
+    for field, expected in (nulls or {}).items():
+        actual = stats['nulls'].get(field)
+        if actual != expected:
+            mismatches.append(
+                f'{field} has {actual} missing values, expected {expected}'
+            )
+
+    if checksum is not None and stats['checksum'] != checksum:
+        mismatches.append(
+            f'checksum is {stats["checksum"]}, expected {checksum}'
+        )
+
+    if mismatches:
+        raise RuntimeError(
+            f'Verification of {label} failed: {"; ".join(mismatches)}'
+        )
+
+
+__all__ = [
+    'CHECKSUM_CHUNK_SIZE',
+    'table_stats',
+    'check_stats',
+]
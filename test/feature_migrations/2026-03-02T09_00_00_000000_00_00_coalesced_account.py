@@ -0,0 +1,31 @@
+from surrealdb_migrations.base import BaseMigration
+from surrealdb_migrations.verify import check_stats
+
+
+class Migration(BaseMigration):
+    coalesce = True
+
+    async def upgrade(self, db):
+        await db.query("""
+            DEFINE TABLE account SCHEMAFULL;
+        """)
+
+        await db.query("""
+            DEFINE FIELD email ON account TYPE string;
+            DEFINE FIELD created_at ON account TYPE datetime;
+        """)
+
+        await db.query("""
+            CREATE account SET email = 'account_1@example.com',
+                       created_at = d'2026-03-02T00:00:00Z' ;
+        """)
+
+    async def verify(self, db):
+        stats = await self.table_stats(db, 'account', ['email'])
+        check_stats(stats, count=1, nulls={'email': 0}, label='account')
+        return {'account': stats}
+
+    async def downgrade(self, db):
+        await db.query("""
+            REMOVE TABLE account;
+        """)
@@ -0,0 +1,15 @@
+from surrealdb_migrations.base import BaseMigration
+
+
+class Migration(BaseMigration):
+    phase = 'contract'
+
+    async def upgrade(self, db):
+        await db.query("""
+            REMOVE FIELD created_at ON account;
+        """)
+
+    async def downgrade(self, db):
+        await db.query("""
+            DEFINE FIELD created_at ON account TYPE option<datetime>;
+        """)
@@ -0,0 +1,72 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test archiving migrations and importing them from the archive.
+"""
+
+from shutil import copy
+from pathlib import Path
+
+from pytest import raises
+
+from surrealdb_migrations.config import load_config
+from surrealdb_migrations.migrations import MigrationsManager
+from surrealdb_migrations.archive import (
+    ARCHIVE, archive_migrations, list_archive, import_archived,
+)
+
+
+HERE = Path(__file__).parent
+
+
+def test_archive_migrations(tmp_path):
+    source = HERE / 'migrations'
+    migrations = sorted(path.name for path in source.glob('*.py'))
+    for migration in migrations:
+        copy(source / migration, tmp_path / migration)
+
+    archive = archive_migrations(tmp_path, migrations[:2])
+    assert archive == tmp_path / ARCHIVE
+    assert list_archive(archive) == migrations[:2]
+    assert not (tmp_path / migrations[0]).exists()
+
+    # Archives grow with the next archived migrations
+    archive_migrations(tmp_path, migrations[2:3])
+    assert list_archive(archive) == migrations[:3]
+
+    with raises(RuntimeError, match='already archived'):
+        copy(source / migrations[0], tmp_path / migrations[0])
+        archive_migrations(tmp_path, migrations[:1])
+
+    module = import_archived(archive, migrations[1])
+    assert module.__file__.startswith(str(archive))
+    assert hasattr(module, 'Migration')
+
+    with raises(RuntimeError, match='not archived'):
+        import_archived(archive, migrations[-1])
+
+    # Only archived migrations whose file is gone are imported from the
+    # archive
+    config = load_config(HERE / 'config.toml')
+    config.migrations.directory = str(tmp_path)
+    mgr = MigrationsManager(config)
+
+    assert [migration.name for migration in mgr.do_list()] == (
+        [migrations[0]] + migrations[3:]
+    )
+    assert mgr._import_module(migrations[0]).__file__ == str(
+        tmp_path / migrations[0]
+    )
+    assert mgr._import_module(migrations[2]).__file__.startswith(str(archive))
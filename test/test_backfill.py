@@ -0,0 +1,124 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test chunked and resumable backfills.
+"""
+
+from logging import getLogger
+
+from pytest import mark
+from surrealdb import RecordID
+
+from surrealdb_migrations.backfill import (
+    checkpoints_table, load_checkpoint, save_checkpoint,
+    backfill, backfill_partitioned, partition_bounds,
+)
+
+
+log = getLogger(__name__)
+
+
+@mark.asyncio
+async def test_backfill(migrate_manager):
+    mgr = migrate_manager
+    checkpoints = checkpoints_table(mgr.config)
+
+    async with mgr:
+        await mgr._create_metastore_table()
+        await mgr.db.query(
+            'FOR $n IN 1..=25 { CREATE type::thing("item", $n) SET n = $n; };'
+        )
+
+        try:
+            # Simulate a backfill interrupted after the tenth record
+            await save_checkpoint(
+                mgr.db, checkpoints, 'test.py', 'item',
+                cursor=RecordID('item', 10), processed=10, done=False,
+            )
+
+            processed = await backfill(
+                mgr.db, 'item', 'double = n * 2', 4,
+                checkpoints, 'test.py', 'item',
+            )
+            log.info(f'Backfill processed {processed} records')
+            assert processed == 25
+
+            result = await mgr.db.query(
+                'SELECT VALUE n FROM item WHERE double IS NOT NONE '
+                'ORDER BY n;'
+            )
+            assert result == list(range(11, 26))
+
+            checkpoint = await load_checkpoint(
+                mgr.db, checkpoints, 'test.py', 'item',
+            )
+            log.info(f'Checkpoint after backfill: {checkpoint}')
+            assert checkpoint['done']
+
+            # A completed backfill is not executed again
+            processed = await backfill(
+                mgr.db, 'item', lambda record: {'triple': record['n'] * 3},
+                4, checkpoints, 'test.py', 'item',
+            )
+            assert processed == 25
+            result = await mgr.db.query(
+                'SELECT VALUE n FROM item WHERE triple IS NOT NONE;'
+            )
+            assert not result
+
+        finally:
+            await mgr.db.query(
+                f'REMOVE TABLE item; REMOVE TABLE {checkpoints};'
+            )
+
+
+@mark.asyncio
+async def test_backfill_partitioned(migrate_manager):
+    mgr = migrate_manager
+    checkpoints = checkpoints_table(mgr.config)
+
+    async with mgr:
+        await mgr._create_metastore_table()
+        await mgr.db.query(
+            'FOR $n IN 1..=100 { CREATE type::thing("item", $n) SET n = $n; };'
+        )
+
+        try:
+            bounds = await partition_bounds(mgr.db, 'item', 4)
+            log.info(f'Partition bounds: {bounds}')
+            assert bounds == [
+                (None, RecordID('item', 26)),
+                (RecordID('item', 26), RecordID('item', 51)),
+                (RecordID('item', 51), RecordID('item', 76)),
+                (RecordID('item', 76), None),
+            ]
+
+            processed = await backfill_partitioned(
+                mgr.pool.acquire, 'item', 'double = n * 2', 10, 4,
+                checkpoints, 'test.py', 'item',
+            )
+            log.info(f'Partitioned backfill processed {processed} records')
+            assert processed == 100
+
+            result = await mgr.db.query(
+                'SELECT count() AS count FROM item '
+                'WHERE double = n * 2 GROUP ALL;'
+            )
+            assert result == [{'count': 100}]
+
+        finally:
+            await mgr.db.query(
+                f'REMOVE TABLE item; REMOVE TABLE {checkpoints};'
+            )
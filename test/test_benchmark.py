@@ -0,0 +1,98 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test the load-impact benchmark statistics.
+"""
+
+from pathlib import Path
+
+import surrealdb
+from pytest import mark, raises
+
+from surrealdb_migrations.config import load_config
+from surrealdb_migrations.migrations import MigrationsManager
+from surrealdb_migrations.benchmark import (
+    BENCHMARK_MIGRATIONS, percentile, LatencyRecorder, run_benchmark,
+)
+
+
+HERE = Path(__file__).parent
+
+
+def test_percentile():
+    values = list(range(1, 101))
+
+    assert percentile([], 50) is None
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile(values, 0) == 1
+    assert percentile([7], 99) == 7
+
+
+def test_latency_recorder():
+    recorder = LatencyRecorder()
+
+    # Nothing is recorded outside of a phase
+    recorder.record(1.0)
+    recorder.fail()
+    assert recorder.summary() == []
+
+    recorder.start('before')
+    for latency in (0.001, 0.002, 0.003):
+        recorder.record(latency)
+
+    recorder.start('during')
+    recorder.record(0.010)
+    recorder.fail()
+    recorder.stop()
+
+    before, during = recorder.summary()
+
+    assert before['phase'] == 'before'
+    assert before['operations'] == 3
+    assert before['errors'] == 0
+    assert before['p50'] == 2.0
+    assert before['p99'] == 3.0
+    assert before['throughput'] == 3 / before['duration']
+
+    assert during['phase'] == 'during'
+    assert during['operations'] == 1
+    assert during['errors'] == 1
+    assert during['p50'] == during['p99'] == 10.0
+
+
+def test_benchmark_migrations():
+    config = load_config(HERE / 'config.toml')
+    config.migrations.directory = str(BENCHMARK_MIGRATIONS)
+
+    migrations = MigrationsManager(config).do_list()
+    assert [migration.name for migration in migrations] == [
+        '2000-01-01T00_00_00_000000_00_00_schema.py',
+        '2000-01-02T00_00_00_000000_00_00_data.py',
+    ]
+
+
+@mark.asyncio
+async def test_benchmark_requires_engine(monkeypatch):
+    config = load_config(HERE / 'config.toml')
+    monkeypatch.delattr(
+        surrealdb, 'AsyncEmbeddedSurrealConnection', raising=False,
+    )
+
+    # The extra to install is named
+    with raises(RuntimeError) as error:
+        await run_benchmark(config, url='mem://')
+    assert 'surrealdb_migrations[benchmark]' in str(error.value)
@@ -0,0 +1,76 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test suspension of events and indexes during bulk writes.
+"""
+
+from logging import getLogger
+
+from pytest import mark, raises
+
+from surrealdb_migrations.backfill import checkpoints_table
+from surrealdb_migrations.bulk import bulk_mode, capture_definitions
+
+
+log = getLogger(__name__)
+
+
+@mark.asyncio
+async def test_bulk_mode(migrate_manager):
+    mgr = migrate_manager
+    checkpoints = checkpoints_table(mgr.config)
+
+    async with mgr:
+        await mgr._create_metastore_table()
+        await mgr.db.query(
+            'DEFINE TABLE item SCHEMALESS; '
+            'DEFINE INDEX item_n ON TABLE item FIELDS n UNIQUE; '
+            'DEFINE EVENT item_created ON TABLE item WHEN $event = "CREATE" '
+            'THEN (CREATE log SET item = $after.id);'
+        )
+
+        try:
+            before = await capture_definitions(mgr.db, 'item')
+            log.info(f'Definitions before bulk mode: {before}')
+            assert list(before['indexes']) == ['item_n']
+            assert list(before['events']) == ['item_created']
+
+            with raises(ValueError):
+                async with bulk_mode(
+                    mgr.db, 'item', checkpoints, 'test.py', poll_interval=0.1,
+                ):
+                    suspended = await capture_definitions(mgr.db, 'item')
+                    assert suspended == {'events': {}, 'indexes': {}}
+
+                    await mgr.db.query(
+                        'FOR $n IN 1..=10 { CREATE item SET n = $n; };'
+                    )
+                    raise ValueError('Bulk work failed')
+
+            # Definitions are restored, and no event fired during bulk mode
+            after = await capture_definitions(mgr.db, 'item')
+            log.info(f'Definitions after bulk mode: {after}')
+            assert list(after['indexes']) == ['item_n']
+            assert list(after['events']) == ['item_created']
+
+            result = await mgr.db.query('SELECT * FROM log;')
+            assert not result
+
+        finally:
+            await mgr.db.query(
+                'REMOVE TABLE IF EXISTS item; '
+                'REMOVE TABLE IF EXISTS log; '
+                f'REMOVE TABLE IF EXISTS {checkpoints};'
+            )
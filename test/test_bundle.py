@@ -0,0 +1,75 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test bundling migrations and loading them from a zipapp.
+"""
+
+from shutil import copy
+from pathlib import Path
+from zipfile import ZipFile
+from logging import getLogger
+
+from surrealdb_migrations.bundle import MANIFEST
+from surrealdb_migrations.config import load_config
+from surrealdb_migrations.migrations import MigrationsManager
+
+
+log = getLogger(__name__)
+
+
+HERE = Path(__file__).parent
+
+
+def test_bundle_zipapp(tmp_path, monkeypatch):
+    source = HERE / 'migrations'
+    migrations = sorted(path.name for path in source.glob('*.py'))
+
+    # Make a package of the test migrations
+    package = tmp_path / 'bundled_migrations'
+    package.mkdir()
+    (package / '__init__.py').touch()
+    for migration in migrations:
+        copy(source / migration, package / migration)
+
+    config = load_config(HERE / 'config.toml')
+    config.migrations.directory = str(package)
+    mgr = MigrationsManager(config)
+
+    bundled = mgr.do_bundle(legacy=True)
+    assert bundled == migrations
+    assert (package / MANIFEST).read_text(encoding='utf-8').split() == (
+        migrations
+    )
+    assert all(
+        (package / f'{migration}c').is_file() for migration in migrations
+    )
+
+    # Ship only the bytecode and the manifest in the zipapp
+    app = tmp_path / 'app.pyz'
+    with ZipFile(app, 'w') as zipapp:
+        for path in package.iterdir():
+            if path.suffix != '.py':
+                zipapp.write(path, f'{package.name}/{path.name}')
+        zipapp.write(package / '__init__.py', f'{package.name}/__init__.py')
+    monkeypatch.syspath_prepend(str(app))
+
+    config.migrations.directory = str(tmp_path / 'missing')
+    config.migrations.package = package.name
+    assert [migration.name for migration in mgr.do_list()] == migrations
+
+    module = mgr._import_module(migrations[0])
+    log.info(f'Imported {module.__name__} from {module.__file__}')
+    assert module.__file__.startswith(str(app))
+    assert hasattr(module, 'Migration')
@@ -0,0 +1,130 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test coalescing of migration statements in fewer requests.
+"""
+
+from logging import getLogger
+
+from pytest import mark, raises
+
+from surrealdb_migrations.surql import split_statements
+from surrealdb_migrations.sessions import CoalescingSession
+
+
+log = getLogger(__name__)
+
+
+class Transaction:
+    """
+    Transaction that answers every statement, failing the ones containing
+    ``FAIL``.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.committed = False
+
+    async def query(self, query, vars=None):
+        self.requests.append((query, vars))
+        return [[{'n': 1}]]
+
+    async def query_raw(self, query, vars=None):
+        self.requests.append((query, vars))
+        results = []
+        failed = False
+        for statement in split_statements(query):
+            if 'FAIL' in statement:
+                failed = True
+                results.append({'status': 'ERR', 'result': 'Boom'})
+            elif failed:
+                results.append({
+                    'status': 'ERR',
+                    'result': 'The query was not executed due to a failed '
+                              'transaction',
+                })
+            else:
+                results.append({'status': 'OK', 'result': []})
+        return {'result': results}
+
+    async def commit(self):
+        self.committed = True
+
+
+def test_split_statements():
+    assert split_statements(
+        'DEFINE TABLE user; -- comment; with a semicolon\n'
+        'CREATE user SET email = "a;b", n = \'\\\';\'; '
+        'FOR $n IN [1, 2] { CREATE user SET n = $n; }; '
+        '/* ; */ REMOVE TABLE ⟨a;b⟩;'
+    ) == [
+        'DEFINE TABLE user',
+        'CREATE user SET email = "a;b", n = \'\\\';\'',
+        'FOR $n IN [1, 2] { CREATE user SET n = $n; }',
+        'REMOVE TABLE ⟨a;b⟩',
+    ]
+
+
+@mark.asyncio
+async def test_coalescing_session():
+    txn = Transaction()
+    session = CoalescingSession(txn)
+
+    assert await session.query('DEFINE TABLE user; DEFINE FIELD a ON user;') \
+        is None
+    assert await session.query(
+        'CREATE user SET email = $email', {'email': 'a@example.com'},
+    ) is None
+    assert not txn.requests
+
+    # Conflicting parameters flush the buffer
+    await session.query(
+        'CREATE user SET email = $email', {'email': 'b@example.com'},
+    )
+    assert txn.requests == [(
+        'DEFINE TABLE user;\nDEFINE FIELD a ON user;\n'
+        'CREATE user SET email = $email;',
+        {'email': 'a@example.com'},
+    )]
+
+    # Reads, and writes returning values, flush the buffer and are sent as is
+    result = await session.query('UPDATE user SET n = 1 RETURN AFTER;')
+    assert result == [[{'n': 1}]]
+    assert txn.requests[1:] == [
+        ('CREATE user SET email = $email;', {'email': 'b@example.com'}),
+        ('UPDATE user SET n = 1 RETURN AFTER;', {}),
+    ]
+
+    await session.query('DELETE user RETURN NONE;')
+    await session.commit()
+    assert txn.requests[3][0] == 'DELETE user RETURN NONE;'
+    assert txn.committed
+
+
+@mark.asyncio
+async def test_coalescing_session_error():
+    txn = Transaction()
+    session = CoalescingSession(txn)
+
+    await session.query('DEFINE TABLE user;')
+    await session.query('CREATE user SET email = "FAIL";')
+    await session.query('CREATE user SET email = "b@example.com";')
+
+    with raises(RuntimeError) as error:
+        await session.commit()
+
+    log.info(f'Coalesced error: {error.value}')
+    assert 'CREATE user SET email = "FAIL"' in str(error.value)
+    assert not txn.committed
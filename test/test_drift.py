@@ -0,0 +1,187 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test schema fingerprints and drift detection.
+"""
+
+from re import search
+from copy import deepcopy
+from hashlib import sha256
+from pathlib import Path
+
+from pytest import mark
+
+from surrealdb_migrations.config import load_config
+from surrealdb_migrations.surql import split_statements
+from surrealdb_migrations.migrations import MigrationsManager
+from surrealdb_migrations.drift import (
+    TABLE_KINDS, schema_fingerprint, schema_drift,
+)
+
+
+CONFIG_PATH = Path(__file__).parent / 'config.toml'
+
+
+SCHEMA = {
+    'database': {
+        'analyzers': {},
+        'functions': {},
+        'params': {},
+        'tables': {
+            '_migrations': 'DEFINE TABLE _migrations TYPE NORMAL SCHEMAFULL',
+            'user': 'DEFINE TABLE user TYPE NORMAL SCHEMAFULL',
+            'post': 'DEFINE TABLE post TYPE NORMAL SCHEMALESS',
+        },
+    },
+    'tables': {
+        '_migrations': {
+            'events': {}, 'fields': {}, 'indexes': {}, 'lives': {},
+            'tables': {},
+        },
+        'user': {
+            'events': {},
+            'fields': {
+                'email': 'DEFINE FIELD email ON user TYPE string',
+            },
+            'indexes': {
+                'email': 'DEFINE INDEX email ON user FIELDS email UNIQUE',
+            },
+            'lives': {},
+            'tables': {},
+        },
+        'post': {
+            'events': {}, 'fields': {}, 'indexes': {}, 'lives': {},
+            'tables': {},
+        },
+    },
+}
+
+
+class Database:
+    """
+    Database answering the ``INFO`` statements with a schema, and counting
+    the requests.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.requests = []
+
+    def _answer(self, statement):
+        if statement == 'INFO FOR DB':
+            return self.schema['database']
+
+        table = search(r'INFO FOR TABLE (\w+)', statement).group(1)
+        info = self.schema['tables'].get(table)
+        if info is None:
+            raise KeyError(table)
+
+        if statement.startswith('RETURN crypto::sha256'):
+            return sha256(
+                str([info[kind] for kind in TABLE_KINDS]).encode('utf-8')
+            ).hexdigest()
+        return info
+
+    async def query(self, query, vars=None):
+        self.requests.append(query)
+        return self._answer(split_statements(query)[0])
+
+    async def query_raw(self, query, vars=None):
+        self.requests.append(query)
+        results = []
+        for statement in split_statements(query):
+            try:
+                results.append({
+                    'status': 'OK', 'result': self._answer(statement),
+                })
+            except KeyError:
+                results.append({'status': 'ERR', 'result': 'No table'})
+        return {'result': results}
+
+
+def ignore(table):
+    return table.startswith('_migrations')
+
+
+@mark.asyncio
+async def test_schema_drift():
+    db = Database(deepcopy(SCHEMA))
+    fingerprint = await schema_fingerprint(db, ignore=ignore)
+
+    assert sorted(fingerprint['tables']) == ['post', 'user']
+    assert sorted(fingerprint['tables']['user']['definitions']) == [
+        'fields email', 'indexes email',
+    ]
+
+    # No drift, in a single request
+    db.requests.clear()
+    assert await schema_drift(db, fingerprint, ignore=ignore) == []
+    assert len(db.requests) == 1
+
+    # Live queries and metastore changes are not drift
+    db.schema['tables']['user']['lives']['query'] = 'LIVE SELECT * FROM user'
+    db.schema['database']['tables']['_migrations_jobs'] = (
+        'DEFINE TABLE _migrations_jobs TYPE ANY SCHEMALESS'
+    )
+    assert await schema_drift(db, fingerprint, ignore=ignore) == []
+
+    # Only the tables that differ are inspected
+    db.schema['tables']['user']['fields']['email'] = (
+        'DEFINE FIELD email ON user TYPE option<string>'
+    )
+    db.schema['tables']['user']['fields']['name'] = (
+        'DEFINE FIELD name ON user TYPE string'
+    )
+    del db.schema['tables']['user']['indexes']['email']
+    db.schema['database']['functions']['fn::hotfix'] = (
+        'DEFINE FUNCTION fn::hotfix() { RETURN 1; }'
+    )
+
+    db.requests.clear()
+    drift = await schema_drift(db, fingerprint, ignore=ignore)
+    assert drift == [
+        {
+            'table': None,
+            'definition': 'functions fn::hotfix',
+            'change': 'added',
+        },
+        {'table': 'user', 'definition': 'fields email', 'change': 'changed'},
+        {'table': 'user', 'definition': 'fields name', 'change': 'added'},
+        {'table': 'user', 'definition': 'indexes email', 'change': 'removed'},
+    ]
+    assert len(db.requests) == 2
+    assert 'post' not in db.requests[1]
+
+    # Removed tables are reported with the definitions of the database
+    del db.schema['database']['tables']['post']
+    del db.schema['tables']['post']
+    drift = await schema_drift(db, fingerprint, ignore=ignore)
+    assert {
+        'table': None, 'definition': 'tables post', 'change': 'removed',
+    } in drift
+
+
+def test_metastore_tables():
+    mgr = MigrationsManager(load_config(CONFIG_PATH))
+
+    assert mgr._is_metastore_table('_migrations')
+    assert mgr._is_metastore_table('_migrations_jobs')
+    assert mgr._is_metastore_table('_migrations_checkpoints')
+    assert mgr._is_metastore_table('_migrations_failures')
+    assert mgr._is_metastore_table('_migrations_running')
+
+    # Application tables sharing the prefix are part of the schema
+    assert not mgr._is_metastore_table('_migrations_archive')
+    assert not mgr._is_metastore_table('user')
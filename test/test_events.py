@@ -0,0 +1,78 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test streaming of the progress events of migrations.
+"""
+
+from asyncio import sleep
+
+from pytest import mark, raises
+
+from surrealdb_migrations.sessions import CountingSession, RecordingSession
+from surrealdb_migrations.events import (
+    PlanComputed, MigrationStarted, MigrationCommitted, MigrationFailed,
+    stream_events,
+)
+
+
+@mark.asyncio
+async def test_stream_events():
+    async def run(emit):
+        emit(PlanComputed('upgrade', ['a.py', 'b.py']))
+        for name in ('a.py', 'b.py'):
+            emit(MigrationStarted('upgrade', name))
+            await sleep(0)
+            emit(MigrationCommitted('upgrade', name, 0.1))
+
+    events = [event async for event in stream_events(run)]
+    assert [
+        (event.type, getattr(event, 'name', None)) for event in events
+    ] == [
+        ('plan', None),
+        ('started', 'a.py'),
+        ('committed', 'a.py'),
+        ('started', 'b.py'),
+        ('committed', 'b.py'),
+    ]
+    assert events[0].fields() == {
+        'operation': 'upgrade',
+        'migrations': ['a.py', 'b.py'],
+        'batch': None,
+    }
+
+
+@mark.asyncio
+async def test_stream_events_error():
+    async def run(emit):
+        emit(MigrationStarted('downgrade', 'a.py'))
+        emit(MigrationFailed('downgrade', 'a.py', 'RuntimeError: failed'))
+        raise RuntimeError('failed')
+
+    events = []
+    with raises(RuntimeError):
+        async for event in stream_events(run):
+            events.append(event)
+
+    # Events emitted before the error are yielded before it is raised
+    assert [event.type for event in events] == ['started', 'failed']
+
+
+@mark.asyncio
+async def test_counting_session():
+    session = CountingSession(RecordingSession())
+
+    await session.query('DEFINE TABLE user; DEFINE FIELD email ON user;')
+    await session.query('UPDATE user SET email = "a@example.com";')
+    assert session.statements == 3
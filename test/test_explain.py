@@ -0,0 +1,124 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test cost estimation of migration statements.
+"""
+
+from io import StringIO
+from json import loads
+from logging import getLogger
+
+from pytest import mark
+
+from surrealdb_migrations.explain import explain_statement
+from surrealdb_migrations.output import JsonReporter
+
+
+log = getLogger(__name__)
+
+
+class Database:
+    """
+    Database that uses an index on ``user.email`` and has 100 users.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    async def query(self, query, vars=None):
+        self.queries.append(query)
+        if 'count(' in query:
+            return 1 if 'email' in query else 100
+        if 'WHERE email' in query:
+            return [{'operation': 'Iterate Index', 'detail': {}}]
+        return [{'operation': 'Iterate Table', 'detail': {'table': 'user'}}]
+
+
+@mark.asyncio
+async def test_explain_statement():
+    db = Database()
+
+    analysis = await explain_statement(
+        db, 'UPDATE user SET active = true WHERE created_at < $date '
+            'RETURN NONE;',
+        {'date': '2026-01-01'},
+    )
+    log.info(f'Analysis: {analysis}')
+    assert analysis['kind'] == 'UPDATE'
+    assert analysis['target'] == 'user'
+    assert analysis['full_scan'] is True
+    assert analysis['rows'] is None
+
+    # Only the plan is queried without a count limit
+    assert db.queries == [
+        'SELECT * FROM user WHERE created_at < $date EXPLAIN;',
+    ]
+
+    analysis = await explain_statement(
+        db, 'DELETE user WHERE email = "a@example.com"', count_limit=1000,
+    )
+    assert analysis['full_scan'] is False
+    assert analysis['rows'] == 1
+    assert db.queries[-1] == (
+        'RETURN count((SELECT VALUE id FROM user '
+        'WHERE email = "a@example.com" LIMIT 1000));'
+    )
+
+    analysis = await explain_statement(
+        db, 'DEFINE INDEX user_name ON TABLE user FIELDS name',
+        count_limit=1000,
+    )
+    assert analysis['full_scan'] is True
+    assert analysis['rows'] == 100
+
+    queries = len(db.queries)
+    analysis = await explain_statement(db, 'CREATE user SET name = "a"')
+    assert analysis['full_scan'] is None
+    assert analysis['rows'] is None
+    assert len(db.queries) == queries
+
+
+@mark.asyncio
+async def test_do_plan(migrate_manager):
+    mgr = migrate_manager
+
+    async with mgr:
+        plans = await mgr.do_plan(explain=True, count_limit=1000)
+        log.info(f'Planned migrations: {plans}')
+        assert [plan['name'] for plan in plans] == [
+            migration.name for migration in mgr.do_list()
+        ]
+
+        # Nothing was applied
+        assert not await mgr.do_status()
+
+
+@mark.asyncio
+async def test_do_plan_json(migrate_manager):
+    mgr = migrate_manager
+    stream = StringIO()
+    mgr.reporter = JsonReporter(stream)
+
+    async with mgr:
+        plans = await mgr.do_plan(explain=True)
+
+    events = [loads(line) for line in stream.getvalue().splitlines()]
+    assert {event['event'] for event in events} == {'planned'}
+    assert [event['name'] for event in events] == [
+        plan['name'] for plan in plans
+    ]
+    assert [event['full_scans'] for event in events] == [
+        plan['full_scans'] for plan in plans
+    ]
@@ -0,0 +1,106 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test background index build helpers.
+"""
+
+from logging import getLogger
+
+from pytest import mark, raises
+
+from surrealdb_migrations.indexes import index_statement, wait_for_index
+from surrealdb_migrations.sessions import RecordingSession
+
+
+log = getLogger(__name__)
+
+
+class IndexStatusSession:
+    """
+    Session that reports a sequence of index build statuses of the
+    ``user_email`` index of the ``user`` table.
+    """
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.queries = []
+
+    async def query(self, query, vars=None):
+        self.queries.append(query)
+        if query.startswith('INFO FOR TABLE'):
+            return {'indexes': {
+                'user_email': 'DEFINE INDEX user_email ON user FIELDS email',
+            }}
+        status = self.statuses.pop(0)
+        return status if status is None else {'building': status}
+
+
+def test_index_statement():
+    assert index_statement('user_email', 'user', 'email', unique=True) == (
+        'DEFINE INDEX IF NOT EXISTS user_email ON TABLE user FIELDS email '
+        'UNIQUE CONCURRENTLY;'
+    )
+    assert index_statement('user_name', 'user', ['first', 'last']) == (
+        'DEFINE INDEX IF NOT EXISTS user_name ON TABLE user FIELDS '
+        'first, last CONCURRENTLY;'
+    )
+
+
+@mark.asyncio
+async def test_wait_for_index():
+    session = IndexStatusSession(
+        {'status': 'indexing', 'initial': 10, 'pending': 0, 'updated': 0},
+        {'status': 'indexing', 'initial': 20, 'pending': 0, 'updated': 0},
+        {'status': 'ready'},
+    )
+    await wait_for_index(session, 'user_email', 'user', poll_interval=0)
+
+    assert session.queries == ['INFO FOR TABLE user;'] + [
+        'INFO FOR INDEX user_email ON TABLE user;'
+    ] * 3
+
+
+@mark.asyncio
+async def test_wait_for_index_failure():
+    session = IndexStatusSession({'status': 'error', 'error': 'duplicate'})
+    with raises(RuntimeError):
+        await wait_for_index(session, 'user_email', 'user', poll_interval=0)
+
+    session = IndexStatusSession(*[{'status': 'indexing'}] * 10)
+    with raises(TimeoutError):
+        await wait_for_index(
+            session, 'user_email', 'user', timeout=0, poll_interval=0,
+        )
+
+
+@mark.asyncio
+async def test_wait_for_missing_index():
+    session = IndexStatusSession()
+    with raises(RuntimeError):
+        await wait_for_index(session, 'user_emial', 'user', poll_interval=0)
+    assert session.queries == ['INFO FOR TABLE user;']
+
+
+@mark.asyncio
+async def test_wait_for_built_index():
+    # Indexes built before a restart, or by another node, have no build state
+    for status in (None, {}):
+        session = IndexStatusSession(status)
+        await wait_for_index(session, 'user_email', 'user', poll_interval=0)
+
+    # Recording sessions are not polled
+    session = RecordingSession()
+    await wait_for_index(session, 'user_email', 'user', poll_interval=0)
+    assert session.statements == []
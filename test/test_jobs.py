@@ -0,0 +1,154 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test deferred jobs processed by workers.
+"""
+
+from asyncio import sleep
+from logging import getLogger
+from datetime import datetime, timedelta, timezone
+
+from pytest import mark, raises
+from surrealdb import RecordID
+
+from surrealdb_migrations import migrations
+from surrealdb_migrations.jobs import jobs_table, enqueue_jobs, lease_job
+
+
+log = getLogger(__name__)
+
+
+@mark.asyncio
+async def test_do_worker(migrate_manager):
+    mgr = migrate_manager
+    migration = '2026-03-01T00_00_00_000000_00_00_test_jobs.py'
+    jobs = jobs_table(mgr.config)
+
+    async with mgr:
+        await mgr._create_metastore_table()
+        await mgr.db.query('FOR $n IN 1..=10 { CREATE item SET n = $n; };')
+
+        try:
+            await mgr._insert_migration(migration, completed=False)
+            enqueued = await enqueue_jobs(mgr.db, jobs, migration, [{
+                'table': 'item',
+                'transform': {'set': 'doubled = n * 2'},
+                'chunk_size': 3,
+                'partitions': 2,
+                'key': 'item',
+            }])
+            assert enqueued == 2
+
+            status = await mgr.do_status()
+            assert status[0]['completed_date'] is None
+            assert status[0]['jobs'] == {'pending': 2}
+
+            processed = await mgr.do_worker(drain=True)
+            assert processed == 2
+
+            result = await mgr.db.query(
+                'SELECT VALUE doubled FROM item ORDER BY n;'
+            )
+            assert result == [n * 2 for n in range(1, 11)]
+
+            # The migration is completed once all its jobs are done
+            status = await mgr.do_status()
+            log.info(f'Status after the worker: {status}')
+            assert status[0]['completed_date'] is not None
+            assert status[0]['jobs'] == {'done': 2}
+
+        finally:
+            await mgr.db.query(
+                'REMOVE TABLE IF EXISTS item; '
+                f'REMOVE TABLE IF EXISTS {jobs};'
+            )
+
+
+@mark.asyncio
+async def test_lease_job_fails_exhausted(migrate_manager):
+    mgr = migrate_manager
+    jobs = jobs_table(mgr.config)
+    job_id = RecordID(jobs, ['2026-03-01_test_jobs.py', 'item', 0])
+
+    async with mgr:
+        await mgr._create_metastore_table()
+
+        try:
+            # A worker died while running the last attempt of a job
+            await mgr.db.query('CREATE $id CONTENT $job;', {
+                'id': job_id,
+                'job': {
+                    'migration': '2026-03-01_test_jobs.py',
+                    'key': 'item',
+                    'index': 0,
+                    'status': 'running',
+                    'worker': 'dead-worker',
+                    'attempts': 3,
+                    'leased_until': (
+                        datetime.now(tz=timezone.utc) - timedelta(minutes=1)
+                    ),
+                    'created': datetime.now(tz=timezone.utc),
+                },
+            })
+
+            job = await lease_job(mgr.db, jobs, 'worker', 60, 3)
+            assert job is None
+
+            result = await mgr.db.query('SELECT * FROM ONLY $id;', {
+                'id': job_id,
+            })
+            log.info(f'Job after the lease: {result}')
+            assert result['status'] == 'failed'
+            assert result.get('leased_until') is None
+            assert result['error']
+
+        finally:
+            await mgr.db.query(f'REMOVE TABLE IF EXISTS {jobs};')
+
+
+@mark.asyncio
+async def test_run_job_lost_lease(migrate_manager, monkeypatch):
+    mgr = migrate_manager
+    mgr.config.jobs.lease = 0.3
+    job = {
+        'id': RecordID(jobs_table(mgr.config), ['test_jobs.py', 'item', 0]),
+        'migration': 'test_jobs.py',
+        'table': 'item',
+        'transform': {'set': 'doubled = n * 2'},
+        'chunk_size': 3,
+        'key': 'item',
+        'index': 0,
+        'start': None,
+        'end': None,
+    }
+
+    async def slow_backfill(*args, **kwargs):
+        await sleep(10)
+
+    async def renew_failing(*args, **kwargs):
+        raise ConnectionError('Connection lost')
+
+    async def renew_lost(*args, **kwargs):
+        return False
+
+    monkeypatch.setattr(migrations, 'backfill', slow_backfill)
+
+    async with mgr:
+        # The job stops when its lease is lost, or cannot be renewed before
+        # it expires
+        for renew in (renew_failing, renew_lost):
+            monkeypatch.setattr(migrations, 'renew_lease', renew)
+            with raises(RuntimeError, match='Lost the lease'):
+                await mgr._run_job(job, 'worker')
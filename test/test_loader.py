@@ -0,0 +1,93 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test streaming of data files into the database.
+"""
+
+from logging import getLogger
+from contextlib import asynccontextmanager
+
+from pytest import mark, raises
+
+from surrealdb_migrations.loader import read_records, load_records
+
+
+log = getLogger(__name__)
+
+
+class InsertSession:
+    """
+    Session that records the inserted batches, failing the first attempts.
+    """
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    async def query(self, query, vars=None):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('Transient failure')
+        self.batches.append(vars['records'])
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+
+def test_read_records(tmp_path):
+    jsonl = tmp_path / 'records.jsonl'
+    jsonl.write_text('{"id": 1}\n\n{"id": 2}\n{"id": 3}', encoding='utf-8')
+    assert list(read_records(jsonl)) == [{'id': 1}, {'id': 2}, {'id': 3}]
+
+    csv = tmp_path / 'records.csv'
+    csv.write_text('id,name\n1,"multi\nline"\n2,two\n', encoding='utf-8')
+    assert list(read_records(csv)) == [
+        {'id': '1', 'name': 'multi\nline'},
+        {'id': '2', 'name': 'two'},
+    ]
+
+    empty = tmp_path / 'empty.jsonl'
+    empty.touch()
+    assert list(read_records(empty)) == []
+
+    with raises(ValueError):
+        list(read_records(tmp_path / 'records.txt'))
+
+
+@mark.asyncio
+async def test_load_records():
+    session = InsertSession(failures=1)
+    records = ({'id': number} for number in range(10))
+
+    loaded = await load_records(
+        session.acquire, 'user', records,
+        batch_size=4, concurrency=2, retries=1, retry_delay=0,
+    )
+
+    assert loaded == 10
+    assert sorted(len(batch) for batch in session.batches) == [2, 4, 4]
+
+
+@mark.asyncio
+async def test_load_records_failure():
+    session = InsertSession(failures=2)
+    records = ({'id': number} for number in range(10))
+
+    with raises(RuntimeError):
+        await load_records(
+            session.acquire, 'user', records,
+            batch_size=10, retries=1, retry_delay=0,
+        )
@@ -0,0 +1,63 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test machine-readable output of the commands.
+"""
+
+from io import StringIO
+from json import loads
+from pathlib import Path
+from datetime import datetime, timezone
+
+from surrealdb import RecordID
+
+from surrealdb_migrations.output import JsonReporter
+from surrealdb_migrations.config import load_config
+from surrealdb_migrations.migrations import MigrationsManager
+
+
+HERE = Path(__file__).parent
+
+
+def test_json_reporter():
+    stream = StringIO()
+    reporter = JsonReporter(stream)
+
+    reporter.emit(
+        'migration', name='2026-02-05_test.py', id=RecordID('_migrations', 1),
+        applied_date=datetime(2026, 2, 5, tzinfo=timezone.utc),
+    )
+    reporter.emit('applied', name='2026-02-05_test.py', duration=0.5)
+
+    events = [loads(line) for line in stream.getvalue().splitlines()]
+    assert [event['event'] for event in events] == ['migration', 'applied']
+    assert events[0]['id'] == '_migrations:1'
+    assert events[0]['applied_date'] == '2026-02-05T00:00:00+00:00'
+    assert events[1]['duration'] == 0.5
+
+
+def test_do_list_json():
+    config = load_config(HERE / 'config.toml')
+    config.migrations.directory = str(HERE / 'migrations')
+    stream = StringIO()
+
+    mgr = MigrationsManager(config, reporter=JsonReporter(stream))
+    migrations = mgr.do_list()
+
+    events = [loads(line) for line in stream.getvalue().splitlines()]
+    assert [event['name'] for event in events] == [
+        migration.name for migration in migrations
+    ]
+    assert {event['event'] for event in events} == {'migration_file'}
@@ -0,0 +1,99 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+
+"""
+Test replacing a lost database connection.
+"""
+
+from asyncio import Event, create_task, sleep
+from pathlib import Path
+
+from pytest import mark
+
+from surrealdb_migrations import migrations
+from surrealdb_migrations.config import load_config
+from surrealdb_migrations.migrations import MigrationsManager
+
+
+CONFIG_PATH = Path(__file__).parent / 'config.toml'
+
+
+class Session:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.closed = False
+
+    async def signin(self, credentials):
+        pass
+
+    async def use(self, namespace, database):
+        pass
+
+    async def close_session(self):
+        self.closed = True
+
+
+class Connection:
+    """
+    Connection that waits for ``ready`` to be set before connecting.
+    """
+
+    ready = None
+
+    def __init__(self, url, **options):
+        self.closed = False
+
+    async def connect(self):
+        await self.ready.wait()
+
+    async def new_session(self):
+        return Session(self)
+
+    async def close(self):
+        self.closed = True
+
+
+@mark.asyncio
+async def test_reconnect(monkeypatch):
+    monkeypatch.setenv('SURREALDB_PASSWORD', 'root')
+    monkeypatch.setattr(migrations, 'AsyncSurreal', Connection)
+    Connection.ready = Event()
+    Connection.ready.set()
+
+    mgr = MigrationsManager(load_config(CONFIG_PATH))
+    await mgr._connect()
+    lost = mgr.db
+
+    # The lost connection stays in place while reconnecting
+    Connection.ready.clear()
+    reconnect = create_task(mgr._reconnect(mgr._generation))
+    await sleep(0.01)
+    assert mgr.db is lost
+    assert mgr.pool is not None
+    assert mgr.migrations_pool is not None
+
+    # And is replaced at once, then closed
+    Connection.ready.set()
+    await reconnect
+    assert mgr.db is not lost
+    assert mgr.db.connection is mgr._connection
+    assert lost.closed
+    assert lost.connection.closed
+
+    async with mgr.pool.acquire() as session:
+        assert session.connection is mgr._connection
+
+    await mgr._close()
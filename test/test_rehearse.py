@@ -0,0 +1,42 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test rehearsal of migrations on a clone of the database.
+"""
+
+from logging import getLogger
+
+from pytest import mark
+
+
+log = getLogger(__name__)
+
+
+@mark.asyncio
+async def test_do_rehearse(migrate_manager):
+    mgr = migrate_manager
+
+    async with mgr:
+        durations = await mgr.do_rehearse()
+        log.info(f'Rehearsed migrations: {durations}')
+        assert list(durations) == [
+            migration.name for migration in mgr.do_list()
+        ]
+
+        # Nothing was applied, and the clone was removed
+        assert not await mgr.do_status()
+
+        info = await mgr.db.query('INFO FOR NS;')
+        assert list(info['databases']) == [mgr.config.database.database]
@@ -0,0 +1,95 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test rendering of migrations without applying them.
+"""
+
+from logging import getLogger
+from datetime import datetime, timezone
+
+from pytest import mark
+from surrealdb import RecordID
+
+from surrealdb_migrations.surql import to_surql
+from surrealdb_migrations.sessions import RecordingSession
+
+
+log = getLogger(__name__)
+
+
+def test_to_surql():
+    assert to_surql(None) == 'NONE'
+    assert to_surql(True) == 'true'
+    assert to_surql(42) == '42'
+    assert to_surql('it\'s "quoted"') == '"it\'s \\"quoted\\""'
+    assert to_surql(
+        datetime(2026, 2, 5, tzinfo=timezone.utc)
+    ) == 'd"2026-02-05T00:00:00+00:00"'
+    assert to_surql(RecordID('user', 1)) == 'user:1'
+    assert to_surql(RecordID('user', 'a-b')) == 'user:⟨a-b⟩'
+    assert to_surql(RecordID('user', ['a', 1])) == 'user:["a", 1]'
+    assert to_surql({'emails': ['a@example.com']}) == (
+        '{"emails": ["a@example.com"]}'
+    )
+    assert to_surql(float('nan')) == 'math::nan'
+    assert to_surql([float('inf'), float('-inf')]) == (
+        '[math::inf, math::neg_inf]'
+    )
+
+
+@mark.asyncio
+async def test_recording_session():
+    session = RecordingSession()
+
+    await session.query('DEFINE INDEX user_email ON user FIELDS email;')
+    await session.query('INFO FOR INDEX user_email ON user;')
+    await session.query('SELECT count() FROM user GROUP ALL;')
+    txn = await session.begin_transaction()
+    result = await txn.query(
+        'CREATE user SET email = $email', {'email': 'a@example.com'},
+    )
+    assert result == []
+    await txn.commit()
+
+    script = session.render()
+    log.info(f'Rendered script:\n{script}')
+    assert script == '\n'.join([
+        'DEFINE INDEX user_email ON user FIELDS email;',
+        'BEGIN TRANSACTION;',
+        'LET $email = "a@example.com";',
+        'CREATE user SET email = $email;',
+        'COMMIT TRANSACTION;',
+    ])
+
+
+@mark.asyncio
+async def test_do_render(migrate_manager, tmp_path):
+    mgr = migrate_manager
+    path = tmp_path / 'out.surql'
+
+    async with mgr:
+        rendered = await mgr.do_render(path)
+        log.info(f'Rendered migrations: {rendered}')
+        assert rendered == [
+            migration.name for migration in mgr.do_list()
+        ]
+
+        # Nothing was applied
+        assert not await mgr.do_status()
+
+        script = path.read_text(encoding='utf-8')
+        log.info(f'Rendered script:\n{script}')
+        assert script.count('BEGIN TRANSACTION;') == len(rendered)
+        assert "migration_5@example.com" in script
@@ -0,0 +1,119 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test retries of operations failing with transient errors.
+"""
+
+from pathlib import Path
+
+from pytest import mark, raises
+from surrealdb import QueryError, ConnectionUnavailableError
+
+from surrealdb_migrations.config import load_config
+from surrealdb_migrations.base import BaseMigration
+from surrealdb_migrations.migrations import MigrationsManager
+from surrealdb_migrations.retry import (
+    is_retryable, is_connection_lost, RetryPolicy,
+)
+
+
+CONFIG_PATH = Path(__file__).parent / 'config.toml'
+
+
+class RetryableMigration(BaseMigration):
+    retryable = True
+
+
+def conflict():
+    return QueryError(
+        'Query', 'Transaction conflict',
+        details={'kind': 'TransactionConflict'},
+    )
+
+
+def test_is_retryable():
+    assert is_retryable(conflict())
+    assert not is_retryable(QueryError('Query', 'Parse error'))
+    assert not is_retryable(ValueError('invalid'))
+
+    # Errors raised from a transient error are transient
+    try:
+        try:
+            raise conflict()
+        except QueryError as e:
+            raise RuntimeError('Deferred statement failed') from e
+    except RuntimeError as e:
+        assert is_retryable(e)
+
+
+def test_is_connection_lost():
+    assert is_connection_lost(ConnectionUnavailableError('Connection closed'))
+    assert is_connection_lost(ConnectionResetError())
+    assert not is_connection_lost(conflict())
+
+    try:
+        try:
+            raise ConnectionUnavailableError('Connection closed')
+        except ConnectionUnavailableError as e:
+            raise RuntimeError('Deferred statement failed') from e
+    except RuntimeError as e:
+        assert is_connection_lost(e)
+
+
+@mark.asyncio
+async def test_retry_policy():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01)
+    attempts = []
+
+    async def flaky():
+        attempts.append(True)
+        if len(attempts) < 3:
+            raise conflict()
+        return 'done'
+
+    assert await policy.run(flaky) == ('done', 2)
+
+    # Attempts are bounded
+    attempts.clear()
+
+    async def failing():
+        attempts.append(True)
+        raise conflict()
+
+    with raises(QueryError):
+        await policy.run(failing)
+    assert len(attempts) == 3
+
+    # Non transient errors are not retried
+    attempts.clear()
+
+    async def broken():
+        attempts.append(True)
+        raise ValueError('invalid')
+
+    with raises(ValueError):
+        await policy.run(broken)
+    assert len(attempts) == 1
+
+
+def test_migration_retry_policy():
+    mgr = MigrationsManager(load_config(CONFIG_PATH))
+
+    # Only migrations that opted in are retried
+    assert mgr._retry_policy(RetryableMigration) is mgr.retry
+    assert mgr._retry_policy(BaseMigration).max_attempts == 1
+    assert mgr._retry_policy(
+        RetryableMigration, BaseMigration,
+    ).max_attempts == 1
@@ -0,0 +1,107 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test running records of the migrations in progress.
+"""
+
+from pathlib import Path
+from asyncio import sleep, all_tasks
+from logging import getLogger
+
+from pytest import mark
+
+from surrealdb_migrations.config import load_config
+from surrealdb_migrations.migrations import MigrationsManager
+from surrealdb_migrations.running import running_table, start_running
+
+
+log = getLogger(__name__)
+
+
+CONFIG_PATH = Path(__file__).parent / 'config.toml'
+
+
+class Database:
+    """
+    Database recording its queries, answering without waiting.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    async def query(self, query, vars=None):
+        self.queries.append(query.split(None, 1)[0])
+        return []
+
+
+@mark.asyncio
+async def test_running_heartbeat(migrate_manager):
+    mgr = migrate_manager
+    mgr.config.migrations.heartbeat_interval = 0.1
+
+    async with mgr:
+        await mgr._create_metastore_table()
+        assert await mgr._list_running() == []
+
+        progress = {'statements': lambda: 3}
+        async with mgr._track('2026-02-05_test.py', 'upgrade', progress):
+            await sleep(0.5)
+
+            running = await mgr._show_running()
+            log.info(f'Migrations in progress: {running}')
+            assert len(running) == 1
+            assert running[0]['migration'] == '2026-02-05_test.py'
+            assert running[0]['progress'] == {'statements': 3}
+            assert not running[0]['stale']
+
+        # Cleared once the migration is done
+        assert await mgr._list_running() == []
+
+
+@mark.asyncio
+async def test_running_stale(migrate_manager):
+    mgr = migrate_manager
+    mgr.config.migrations.heartbeat_timeout = 0.1
+
+    async with mgr:
+        await mgr._create_metastore_table()
+
+        # A run killed before clearing its record
+        await start_running(
+            mgr.db, running_table(mgr.config), '2026-02-05_test.py',
+            'upgrade', 'host', 1,
+        )
+        await sleep(0.5)
+
+        running = await mgr._show_running()
+        assert [record['stale'] for record in running] == [True]
+
+
+@mark.asyncio
+async def test_running_heartbeat_stopped():
+    mgr = MigrationsManager(load_config(CONFIG_PATH))
+    mgr.config.migrations.heartbeat_interval = 0.01
+    mgr.db = Database()
+
+    async with mgr._track('2026-02-05_test.py', 'upgrade', {}):
+        await sleep(0.05)
+
+    # The heartbeat is stopped before the running record is cleared
+    assert not [
+        task for task in all_tasks()
+        if task.get_coro().__name__ == 'beat'
+    ]
+    assert mgr.db.queries[-1] == 'DELETE'
+    assert 'UPDATE' in mgr.db.queries
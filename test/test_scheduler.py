@@ -0,0 +1,149 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test dependency graph scheduling of migrations.
+"""
+
+from asyncio import sleep
+from logging import getLogger
+
+from pytest import mark, raises
+
+from surrealdb_migrations.base import BaseMigration
+from surrealdb_migrations.scheduler import (
+    build_graph, select_phase, run_graph,
+)
+
+
+log = getLogger(__name__)
+
+
+def migration(touches=None, depends_on=(), phase='expand'):
+    return type(
+        'Migration', (BaseMigration, ),
+        {'touches': touches, 'depends_on': depends_on, 'phase': phase},
+    )
+
+
+def test_build_graph():
+    graph = build_graph([
+        ('1_user.py', migration(touches=['user'])),
+        ('2_group.py', migration(touches=['group'])),
+        ('3_user.py', migration(touches=['user'])),
+        ('4_group.py', migration(touches=['group'], depends_on=['3_user'])),
+        ('5_all.py', migration()),
+    ])
+    log.info(f'Dependency graph: {graph}')
+
+    assert graph == {
+        '1_user.py': set(),
+        '2_group.py': set(),
+        '3_user.py': {'1_user.py'},
+        '4_group.py': {'2_group.py', '3_user.py'},
+        '5_all.py': {
+            '1_user.py', '2_group.py', '3_user.py', '4_group.py',
+        },
+    }
+
+
+def test_select_phase():
+    migrations = [
+        ('1_add_name.py', migration()),
+        ('2_drop_email.py', migration(phase='contract')),
+        ('3_add_group.py', migration()),
+    ]
+
+    expand = select_phase(migrations, 'expand')
+    assert [name for name, _ in expand] == ['1_add_name.py', '3_add_group.py']
+
+    contract = select_phase(migrations, 'contract')
+    assert [name for name, _ in contract] == ['2_drop_email.py']
+
+    # An expand migration cannot depend on a pending contract migration
+    with raises(RuntimeError):
+        select_phase(
+            migrations + [
+                ('4_add_index.py', migration(depends_on=['2_drop_email'])),
+            ],
+            'expand',
+        )
+
+    with raises(RuntimeError):
+        select_phase([('1_unknown.py', migration(phase='later'))], 'expand')
+
+
+def test_build_graph_invalid_dependencies():
+    with raises(RuntimeError):
+        build_graph([
+            ('1_user.py', migration(depends_on=['0_unknown'])),
+        ])
+
+    with raises(RuntimeError):
+        build_graph([
+            ('1_user.py', migration(depends_on=['2_group'])),
+            ('2_group.py', migration()),
+        ])
+
+    # Dependencies on known migrations outside the graph are satisfied
+    graph = build_graph(
+        [('2_group.py', migration(depends_on=['1_user']))],
+        known=['1_user.py'],
+    )
+    assert graph == {'2_group.py': set()}
+
+
+@mark.asyncio
+async def test_run_graph():
+    graph = {
+        'a': set(),
+        'b': set(),
+        'c': {'a'},
+        'd': {'b', 'c'},
+    }
+    running = set()
+    peak = 0
+
+    async def worker(name):
+        nonlocal peak
+        running.add(name)
+        peak = max(peak, len(running))
+        await sleep(0.01)
+        running.remove(name)
+
+    completed = await run_graph(graph, worker, concurrency=2)
+    log.info(f'Completion order: {completed}')
+
+    assert peak == 2
+    assert sorted(completed) == ['a', 'b', 'c', 'd']
+    assert completed.index('c') > completed.index('a')
+    assert completed[-1] == 'd'
+
+
+@mark.asyncio
+async def test_run_graph_failure():
+    graph = {
+        'a': set(),
+        'b': {'a'},
+    }
+    executed = []
+
+    async def worker(name):
+        executed.append(name)
+        raise ValueError(name)
+
+    with raises(ValueError):
+        await run_graph(graph, worker, concurrency=4)
+
+    assert executed == ['a']
@@ -0,0 +1,97 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test load-aware throttling of data migrations.
+"""
+
+from asyncio import Event, sleep, create_task, gather, wait_for
+
+from pytest import mark
+
+from surrealdb_migrations.throttle import Throttle
+
+
+def test_throttle_aimd():
+    throttle = Throttle(
+        100,
+        latency_target=0.5,
+        min_batch_size=10,
+        max_batch_size=300,
+        increase=100,
+        decrease=0.5,
+        max_concurrency=2,
+    )
+    assert (throttle.batch_size, throttle.concurrency) == (100, 1)
+
+    # Additive increase of the batch size, then of the concurrency
+    history = []
+    for _ in range(4):
+        throttle.record(0.1, throttle.batch_size)
+        history.append((throttle.batch_size, throttle.concurrency))
+    assert history == [(200, 1), (300, 1), (300, 2), (300, 2)]
+
+    # Multiplicative decrease of both
+    throttle.record(1.0, throttle.batch_size)
+    assert (throttle.batch_size, throttle.concurrency) == (150, 1)
+
+    for _ in range(10):
+        throttle.record(1.0, throttle.batch_size)
+    assert (throttle.batch_size, throttle.concurrency) == (10, 1)
+
+
+@mark.asyncio
+async def test_throttle_pause():
+    throttle = Throttle(100)
+    started = []
+
+    async def batch():
+        async with throttle.slot():
+            started.append(True)
+
+    throttle.pause()
+    task = create_task(batch())
+    await sleep(0.2)
+    assert not started
+
+    throttle.resume()
+    await wait_for(task, 1)
+    assert started
+
+
+@mark.asyncio
+async def test_throttle_concurrency():
+    throttle = Throttle(100, max_batch_size=100, max_concurrency=2)
+    release = Event()
+    started = []
+
+    async def batch(number):
+        async with throttle.slot():
+            started.append(number)
+            await release.wait()
+
+    tasks = [create_task(batch(number)) for number in range(3)]
+    await sleep(0)
+    assert started == [0]
+
+    # A slot freed by a completed batch, or by a higher concurrency, wakes
+    # up the waiting batches
+    throttle.record(0.1, 100)
+    assert throttle.concurrency == 2
+    await sleep(0)
+    assert started == [0, 1]
+
+    release.set()
+    await wait_for(gather(*tasks), 1)
+    assert started == [0, 1, 2]
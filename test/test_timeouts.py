@@ -0,0 +1,120 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test migration and statement timeouts, and stopping at safe points.
+"""
+
+from time import monotonic
+from asyncio import sleep
+from pathlib import Path
+from logging import getLogger
+
+from pytest import mark, raises
+
+from surrealdb_migrations.config import load_config
+from surrealdb_migrations.base import BaseMigration
+from surrealdb_migrations.surql import add_timeout
+from surrealdb_migrations.sessions import TimeoutSession, CoalescingSession
+from surrealdb_migrations.migrations import MigrationsManager
+
+
+log = getLogger(__name__)
+
+
+CONFIG_PATH = Path(__file__).parent / 'config.toml'
+
+
+class Migration(BaseMigration):
+    timeout = 0.1
+    statement_timeout = 5
+    coalesce = True
+
+    async def upgrade(self, db):
+        await sleep(10)
+
+
+class Transaction:
+
+    def __init__(self):
+        self.queries = []
+
+    async def query(self, query, vars=None):
+        self.queries.append(query)
+        return []
+
+
+def test_add_timeout():
+    assert add_timeout(
+        'DEFINE TABLE user; '
+        'UPDATE user SET n = 1 WHERE n = NONE RETURN NONE; '
+        'SELECT * FROM user PARALLEL EXPLAIN; '
+        'DELETE user TIMEOUT 1s',
+        2.5,
+    ) == '\n'.join([
+        'DEFINE TABLE user;',
+        'UPDATE user SET n = 1 WHERE n = NONE RETURN NONE TIMEOUT 2500ms;',
+        'SELECT * FROM user TIMEOUT 2500ms PARALLEL EXPLAIN;',
+        'DELETE user TIMEOUT 1s;',
+    ])
+
+    # Quoted strings and identifiers are not clauses
+    assert add_timeout(
+        'UPDATE user SET status = "TIMEOUT" WHERE `timeout` = true; '
+        'SELECT * FROM user WHERE note = \'run in PARALLEL\'',
+        1,
+    ) == '\n'.join([
+        'UPDATE user SET status = "TIMEOUT" WHERE `timeout` = true '
+        'TIMEOUT 1000ms;',
+        'SELECT * FROM user WHERE note = \'run in PARALLEL\' TIMEOUT 1000ms;',
+    ])
+
+
+@mark.asyncio
+async def test_migration_timeouts():
+    mgr = MigrationsManager(load_config(CONFIG_PATH))
+    migration_obj = Migration(mgr.config)
+
+    # Statement timeouts apply below statement coalescing
+    txn = Transaction()
+    session = mgr._wrap_transaction(migration_obj, txn)
+    assert isinstance(session, CoalescingSession)
+    assert isinstance(session._session, TimeoutSession)
+
+    await session._session.query('SELECT * FROM user;')
+    assert txn.queries == ['SELECT * FROM user TIMEOUT 5000ms;']
+
+    # Migration timeouts cancel the migration
+    with raises(TimeoutError):
+        await mgr._run_with_timeout(
+            'test.py', migration_obj, migration_obj.upgrade(txn),
+        )
+
+    # The deadline is shared by the functions and attempts of the migration
+    deadline = mgr._deadline(migration_obj)
+    with raises(TimeoutError):
+        await mgr._run_with_timeout(
+            'test.py', migration_obj, migration_obj.upgrade(txn), deadline,
+        )
+    start = monotonic()
+    with raises(TimeoutError):
+        await mgr._run_with_timeout(
+            'test.py', migration_obj, migration_obj.upgrade(txn), deadline,
+        )
+    assert monotonic() - start < 0.05
+
+    # Migrations are not started once stopping
+    mgr.stop()
+    with raises(RuntimeError):
+        mgr._check_stopping('test.py')
@@ -16,6 +16,10 @@
 Test migration upgrade for SurrealDB using surrealdb_migrations.
 """
 
+from json import dumps
+from hashlib import sha256
+from shutil import copy
+from asyncio import wait_for
 from pathlib import Path
 from random import randint
 from logging import getLogger
@@ -25,11 +29,21 @@ from pytest import mark, raises
 from surrealdb import NotFoundError
 
 from surrealdb_migrations.args import parse_args
+from surrealdb_migrations.drift import schema_fingerprint
+from surrealdb_migrations.archive import ARCHIVE
+from surrealdb_migrations.verify import table_stats
 
 
 log = getLogger(__name__)
 
 
+FEATURE_MIGRATIONS = Path(__file__).parent / 'feature_migrations'
+"""
+Migrations using optional features, a coalesced migration verifying its data
+and a contract migration.
+"""
+
+
 @mark.asyncio
 async def test_do_create(migrate_manager):
     mgr = migrate_manager
@@ -296,3 +310,357 @@ async def test_steps_datetime(migrate_manager):
             ],
             key=lambda x: x['email'],
         )
+
+
+@mark.asyncio
+async def test_do_migrate_phases(migrate_manager):
+    mgr = migrate_manager
+    mgr.config.migrations.directory = str(FEATURE_MIGRATIONS)
+
+    async with mgr:
+        migrations = [migration.name for migration in mgr.do_list()]
+
+        # Expand migrations are applied before the rollout
+        expanded = await mgr.do_migrate(phase='expand')
+        log.info(f'Expand migrations applied: {expanded}')
+        assert expanded == migrations[:-1]
+
+        # Contract migrations are applied after the rollout
+        contracted = await mgr.do_migrate(phase='contract')
+        log.info(f'Contract migrations applied: {contracted}')
+        assert contracted == migrations[-1:]
+
+        status = await mgr.do_status()
+        assert {
+            migration['name']: migration['phase'] for migration in status
+        } == {
+            migration: 'contract' if migration in contracted else 'expand'
+            for migration in migrations
+        }
+
+
+@mark.asyncio
+async def test_do_rollback_last_batch(migrate_manager):
+    mgr = migrate_manager
+
+    async with mgr:
+        migrations = [migration.name for migration in mgr.do_list()]
+
+        first = await mgr.do_migrate(to_datetime=datetime.fromisoformat(
+            '2026-02-12T00:00:00+00:00'
+        ))
+        second = await mgr.do_migrate()
+        assert first + second == migrations
+
+        status = await mgr.do_status()
+        batches = {migration['batch'] for migration in status}
+        assert len(batches) == 2
+
+        # Only the migrations of the last batch are rolled back
+        rolled_back = await mgr.do_rollback(last_batch=True)
+        log.info(f'Rolled back batch: {rolled_back}')
+        assert rolled_back == sorted(second, reverse=True)
+
+        status = await mgr.do_status()
+        assert sorted(migration['name'] for migration in status) == first
+
+
+@mark.asyncio
+async def test_do_migrate_reconnect(migrate_manager):
+    mgr = migrate_manager
+
+    async with mgr:
+        migrations = [migration.name for migration in mgr.do_list()]
+        apply_migration = mgr._apply_migration
+        lost = []
+
+        # Drop the connection before applying the second migration
+        async def apply_and_drop(migration, module, db, batch=None):
+            if migration == migrations[1] and not lost:
+                lost.append(migration)
+                await mgr._connection.close()
+            return await apply_migration(migration, module, db, batch=batch)
+
+        mgr._apply_migration = apply_and_drop
+
+        applied = await mgr.do_migrate()
+        log.info(f'Migrations applied: {applied}')
+        assert lost == migrations[1:2]
+        assert applied == migrations
+
+        # Each migration is applied once
+        status = await mgr.do_status()
+        assert sorted(migration['name'] for migration in status) == migrations
+
+        # The attempt lost with the connection is counted as a retry
+        assert {
+            migration['name']: migration['retries'] for migration in status
+        } == {
+            migration: 1 if migration in lost else 0
+            for migration in migrations
+        }
+
+
+@mark.asyncio
+async def test_iter_migrate(migrate_manager):
+    mgr = migrate_manager
+
+    async with mgr:
+        migrations = [migration.name for migration in mgr.do_list()]
+
+        events = [event async for event in mgr.iter_migrate()]
+        log.info(f'Migration events: {events}')
+        assert events[0].type == 'plan'
+        assert events[0].migrations == migrations
+        assert [
+            event.name for event in events if event.type == 'committed'
+        ] == migrations
+        assert all(
+            event.count > 0 for event in events if event.type == 'statements'
+        )
+
+        events = [event async for event in mgr.iter_rollback()]
+        assert [
+            event.name for event in events if event.type == 'committed'
+        ] == sorted(migrations, reverse=True)
+
+
+@mark.asyncio
+async def test_do_migrate_verification(migrate_manager):
+    mgr = migrate_manager
+    mgr.config.migrations.directory = str(FEATURE_MIGRATIONS)
+
+    async with mgr:
+        first = mgr.do_list()[0].name
+        await mgr.do_migrate()
+
+        status = {
+            migration['name']: migration for migration in await mgr.do_status()
+        }
+        verification = status[first]['verification']
+        log.info(f'Verification of {first}: {verification}')
+        assert verification['account']['count'] == 1
+        assert verification['account']['nulls'] == {'email': 0}
+        assert verification['account']['checksum']
+
+        # Checksums are computed from the data of the records
+        try:
+            for table, offset in (('checksum_a', 0), ('checksum_b', 10)):
+                await mgr.db.query(
+                    f'FOR $n IN 1..=5 {{ CREATE {table}:[$n] '
+                    'SET value = $n + $offset; };',
+                    {'offset': offset},
+                )
+            first = await table_stats(mgr.db, 'checksum_a', chunk_size=2)
+            other = await table_stats(mgr.db, 'checksum_b', chunk_size=2)
+            assert first['count'] == other['count'] == 5
+            assert first['checksum'] != other['checksum']
+            assert first['checksum'] != sha256(b'').hexdigest()
+
+            # Same data, same checksum
+            again = await table_stats(mgr.db, 'checksum_a', chunk_size=2)
+            assert again['checksum'] == first['checksum']
+
+            # Changing one record changes the checksum
+            await mgr.db.query('UPDATE checksum_a:[3] SET value = 42;')
+            changed = await table_stats(mgr.db, 'checksum_a', chunk_size=2)
+            assert changed['count'] == 5
+            assert changed['checksum'] != first['checksum']
+        finally:
+            await mgr.db.query(
+                'REMOVE TABLE IF EXISTS checksum_a; '
+                'REMOVE TABLE IF EXISTS checksum_b;'
+            )
+
+
+@mark.asyncio
+async def test_do_archive(migrate_manager, tmp_path):
+    mgr = migrate_manager
+
+    # Archive a copy of the migrations, archiving removes their files
+    source = Path(mgr.config.migrations.directory)
+    for path in source.glob('*.py'):
+        copy(path, tmp_path / path.name)
+    mgr.config.migrations.directory = str(tmp_path)
+
+    async with mgr:
+        migrations = [migration.name for migration in mgr.do_list()]
+        before = datetime.fromisoformat('2026-02-12T00:00:00+00:00')
+
+        # Only applied migrations are archived
+        assert await mgr.do_archive(before) == []
+
+        await mgr.do_migrate()
+        archived = await mgr.do_archive(before)
+        log.info(f'Archived migrations: {archived}')
+        assert archived == migrations[:2]
+        assert (tmp_path / ARCHIVE).is_file()
+        assert [migration.name for migration in mgr.do_list()] == (
+            migrations[2:]
+        )
+
+        # Archived migrations are rolled back from the archive
+        rolled_back = await mgr.do_rollback(to_datetime=datetime.fromisoformat(
+            '2026-02-01T00:00:00+00:00'
+        ))
+        assert rolled_back == sorted(migrations, reverse=True)
+
+        # And applied from the archive on a fresh database
+        assert await mgr.do_migrate() == migrations
+
+
+@mark.asyncio
+async def test_do_drift(migrate_manager):
+    mgr = migrate_manager
+
+    async with mgr:
+        await mgr.do_migrate()
+        assert await mgr.do_drift() == []
+
+        # A hand-applied hotfix
+        await mgr.db.query('DEFINE FIELD hotfix ON user TYPE option<string>;')
+
+        drift = await mgr.do_drift()
+        log.info(f'Schema drift: {drift}')
+        assert drift == [{
+            'table': 'user', 'definition': 'fields hotfix', 'change': 'added',
+        }]
+
+        # Accept the hotfix
+        await mgr.do_drift(update=True)
+        assert await mgr.do_drift() == []
+
+
+@mark.asyncio
+async def test_do_drift_fingerprints(migrate_manager):
+    mgr = migrate_manager
+    metastore = mgr.config.migrations.metastore
+
+    async with mgr:
+        migrations = await mgr.do_migrate()
+
+        # The schema is fingerprinted once, after the last migration
+        fingerprinted = await mgr.db.query(
+            f'SELECT VALUE name FROM {metastore} WHERE fingerprint != NONE;'
+        )
+        assert fingerprinted == migrations[-1:]
+
+        # The process stopped before fingerprinting the last migration
+        await mgr.db.query(
+            f'UPDATE {metastore} SET fingerprint = NONE WHERE name = $name;',
+            {'name': migrations[-1]},
+        )
+        await mgr.db.query(
+            f'UPDATE {metastore} SET fingerprint = $fingerprint '
+            'WHERE name = $name;',
+            {
+                'name': migrations[-2],
+                'fingerprint': dumps(await schema_fingerprint(
+                    mgr.db, ignore=mgr._is_metastore_table,
+                )),
+            },
+        )
+        assert await mgr.do_drift() == []
+
+
+LOADER_MIGRATION = """\
+from surrealdb_migrations.base import BaseMigration
+
+
+class Migration(BaseMigration):
+    touches = [{table!r}]
+
+    async def upgrade(self, db):
+        await self.load_records({table!r}, {path!r})
+
+    async def downgrade(self, db):
+        await db.query('DELETE {table};')
+"""
+
+
+@mark.asyncio
+async def test_do_migrate_pooled_loaders(migrate_manager, tmp_path):
+    mgr = migrate_manager
+
+    # Two independent migrations, each loading records with the pool
+    for index, table in enumerate(('country', 'city')):
+        data = tmp_path / f'{table}.jsonl'
+        data.write_text(
+            ''.join(f'{{"id": {n}, "n": {n}}}\n' for n in range(10)),
+            encoding='utf-8',
+        )
+        (tmp_path / f'2026-01-0{index + 1}T00_00_00_{table}.py').write_text(
+            LOADER_MIGRATION.format(table=table, path=str(data)),
+            encoding='utf-8',
+        )
+
+    mgr.config.migrations.directory = str(tmp_path)
+    mgr.config.migrations.concurrency = 2
+    mgr.config.database.pool_size = 2
+
+    async with mgr:
+        # Migrations hold their sessions while the loaders acquire theirs
+        applied = await wait_for(mgr.do_migrate(), timeout=60)
+        assert len(applied) == 2
+
+        for table in ('country', 'city'):
+            count = await mgr.db.query(
+                f'SELECT count() FROM {table} GROUP ALL;'
+            )
+            assert count[0]['count'] == 10
+
+
+INDEPENDENT_MIGRATION = """\
+from asyncio import sleep
+
+from surrealdb_migrations.base import BaseMigration
+
+
+class Migration(BaseMigration):
+    touches = [{table!r}]
+
+    async def upgrade(self, db):
+        await sleep(1)
+        await db.query('CREATE {table} SET n = 1;')
+
+    async def downgrade(self, db):
+        await db.query('REMOVE TABLE {table};')
+"""
+
+
+@mark.asyncio
+async def test_do_migrate_concurrent(migrate_manager, tmp_path):
+    mgr = migrate_manager
+    tables = ('country', 'city', 'street')
+
+    # Migrations touching distinct tables are independent
+    for index, table in enumerate(tables):
+        (tmp_path / f'2026-01-0{index + 1}T00_00_00_{table}.py').write_text(
+            INDEPENDENT_MIGRATION.format(table=table), encoding='utf-8',
+        )
+
+    mgr.config.migrations.directory = str(tmp_path)
+    mgr.config.migrations.concurrency = len(tables)
+
+    async with mgr:
+        migrations = [migration.name for migration in mgr.do_list()]
+        events = [event async for event in mgr.iter_migrate()]
+        types = [event.type for event in events]
+        log.info(f'Migration events: {types}')
+
+        # All of them started before the first one was committed
+        assert types.index('committed') > max(
+            index for index, kind in enumerate(types) if kind == 'started'
+        )
+        assert sorted(
+            event.name for event in events if event.type == 'committed'
+        ) == migrations
+
+        # And all of them are recorded in the metastore
+        status = await mgr.do_status()
+        assert sorted(migration['name'] for migration in status) == migrations
+        for table in tables:
+            count = await mgr.db.query(
+                f'SELECT count() FROM {table} GROUP ALL;'
+            )
+            assert count[0]['count'] == 1
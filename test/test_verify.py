@@ -0,0 +1,99 @@
+# Copyright (C) 2024-2026 Hewlett Packard Enterprise Development LP.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Test verification of migrations with database side aggregates.
+"""
+
+from hashlib import sha256
+
+from pytest import mark, raises
+
+from surrealdb_migrations.verify import table_stats, check_stats
+
+
+class QueriesSession:
+    """
+    Session recording the queries it receives, with a table of 5 records.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    async def query(self, query, vars=None):
+        self.queries.append((query, dict(vars or {})))
+        if 'GROUP ALL' in query:
+            return [{'count': 5, 'nulls_0': 1, 'nulls_1': 0}]
+
+        # Chunks of records 1 to 5, hashed by the database
+        after = vars['checksum_cursor'] or 0
+        ids = list(range(after + 1, 6))[:vars['checksum_limit']]
+        return [{
+            'size': len(ids),
+            'last': ids[-1] if ids else None,
+            'hash': f'hash-{ids}',
+        }]
+
+
+@mark.asyncio
+async def test_table_stats_queries():
+    session = QueriesSession()
+
+    stats = await table_stats(
+        session, 'user', ['email', 'name'],
+        where='id >= $start', vars={'start': 1}, chunk_size=2,
+    )
+    assert stats['count'] == 5
+    assert stats['nulls'] == {'email': 1, 'name': 0}
+
+    # Aggregates are computed by the database
+    assert session.queries[0] == (
+        'SELECT count() AS count, '
+        'count(email = NONE OR email = NULL) AS nulls_0, '
+        'count(name = NONE OR name = NULL) AS nulls_1 '
+        'FROM user WHERE id >= $start GROUP ALL;',
+        {'start': 1},
+    )
+
+    # Records are hashed by chunks, resuming after the last one
+    assert session.queries[1][0] == (
+        'SELECT array::len(chunk) AS size, array::last(chunk).id AS last, '
+        'crypto::sha256(<string> chunk) AS hash '
+        'FROM [{chunk: (SELECT id, email, name FROM user '
+        'WHERE (id >= $start) ORDER BY id LIMIT $checksum_limit)}];'
+    )
+    assert session.queries[2][0].endswith(
+        'FROM [{chunk: (SELECT id, email, name FROM user '
+        'WHERE (id >= $start) AND id > $checksum_cursor ORDER BY id '
+        'LIMIT $checksum_limit)}];'
+    )
+    assert [vars['checksum_cursor'] for _, vars in session.queries[1:]] == [
+        None, 2, 4,
+    ]
+    assert stats['checksum'] == sha256(
+        b'hash-[1, 2]hash-[3, 4]hash-[5]'
+    ).hexdigest()
+
+
+def test_check_stats():
+    stats = {'count': 10, 'nulls': {'email': 0}, 'checksum': 'abc'}
+
+    check_stats(stats, count=10, nulls={'email': 0}, checksum='abc')
+
+    with raises(RuntimeError) as error:
+        check_stats(stats, count=12, nulls={'email': 1}, label='user')
+    assert str(error.value) == (
+        'Verification of user failed: count is 10, expected 12; '
+        'email has 0 missing values, expected 1'
+    )